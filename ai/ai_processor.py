@@ -2,7 +2,7 @@
 Module for sending text to AI models and receiving responses.
 """
 
-import requests
+import os
 import time
 import logging
 import json
@@ -12,18 +12,36 @@ from utils.config import (
     OPENAI_API_KEY, ANTHROPIC_API_KEY, DEEPSEEK_API_KEY,
     AI_PROVIDER, CHATGPT_MODEL, CLAUDE_MODEL, DEEPSEEK_MODEL,
     SYSTEM_PROMPT, USE_LOCAL_LLM, OLLAMA_URL, LOCAL_LLM_MODEL,
-    LOCAL_LLM_TEMPERATURE, LOCAL_LLM_MAX_TOKENS
+    LOCAL_LLM_TEMPERATURE, LOCAL_LLM_MAX_TOKENS,
+    LLM_ROUTER, LLM_ROUTER_STATE, LLM_ROUTER_FAILURES, LLM_ROUTER_COOLDOWN, LLM_ROUTER_COST_WEIGHT,
+    LLM_PROVIDER_COSTS
 )
+from utils.http_transport import get_transport
+from .provider_router import ProviderRouter
 
 logger = logging.getLogger(__name__)
 
 class AIProcessor:
-    def __init__(self):
+    def __init__(self, router=None):
+        """
+        Initialize the AI processor.
+        
+        Args:
+            router: ProviderRouter skipping failing providers (default: one if LLM_ROUTER is enabled;
+                its statistics are complete response times, kept apart from the streaming ones)
+        """
         self.openai_client = None
         self.anthropic_client = None
         self.deepseek_api_url = "https://api.deepseek.com/v1/chat/completions"
         self.local_llm_processor = None
         self._initialize_clients()
+        self.router = router
+        if self.router is None and LLM_ROUTER:
+            state_path = os.path.splitext(LLM_ROUTER_STATE)[0] + "_batch.json"
+            self.router = ProviderRouter(["chatgpt", "claude", "deepseek", "local_llm"],
+                                         failure_threshold=LLM_ROUTER_FAILURES, cooldown=LLM_ROUTER_COOLDOWN,
+                                         probe=self._probe, state_path=state_path,
+                                         cost_weight=LLM_ROUTER_COST_WEIGHT)
         
     def _initialize_clients(self):
         """Initialize API clients based on available API keys."""
@@ -79,6 +97,12 @@ class AIProcessor:
             logger.error("No AI models configured. Please add at least one API key or enable local LLM in config.py")
             return None, "Error: No AI models configured"
             
+        if self.router:
+            # Fastest expected response first; providers with an open circuit are skipped
+            ranked = self.router.rank([name for _, name in model_processors], LLM_PROVIDER_COSTS)
+            model_processors = sorted([(self._timed(processor, name), name) for processor, name in model_processors
+                                       if name in ranked], key=lambda item: ranked.index(item[1]))
+            
         # Use only the specified provider if set
         if AI_PROVIDER != "fastest":
             for processor, name in model_processors:
@@ -205,7 +229,7 @@ class AIProcessor:
                 "max_tokens": 500
             }
             
-            response = requests.post(
+            response = get_transport().post(
                 self.deepseek_api_url,
                 headers=headers,
                 data=json.dumps(payload)
@@ -240,6 +264,34 @@ class AIProcessor:
             logger.error(f"Error with local LLM: {e}")
             return None
             
+    def _timed(self, processor, name):
+        """Wrap a _process_with_* function so its response time and failures reach the router."""
+        def timed(text, conversation_history=None):
+            start = time.perf_counter()
+            response = processor(text, conversation_history)
+            if response:
+                # Nothing can be spoken before the complete response arrives
+                self.router.record_first_token(name, time.perf_counter() - start)
+            else:
+                self.router.record_failure(name)
+            return response
+        return timed
+    
+    def _probe(self, name):
+        """Send a tiny request to a provider with an open circuit; True if it answered."""
+        processors = {
+            "chatgpt": self._process_with_chatgpt,
+            "claude": self._process_with_claude,
+            "deepseek": self._process_with_deepseek,
+            "local_llm": self._process_with_local_llm
+        }
+        return bool(processors[name]("Responde solo: ok"))
+    
+    def close(self):
+        """Stop the router's prober and save its statistics."""
+        if self.router:
+            self.router.close()
+            
     def get_available_models(self):
         """Get information about available models."""
         models_info = {}
@@ -7,7 +7,8 @@ import time
 import logging
 import json
 from typing import Optional, List, Dict, Any
-from utils.config import SYSTEM_PROMPT
+from utils.config import SYSTEM_PROMPT, LOCAL_LLM_KEEP_ALIVE
+from utils.http_transport import get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ class LocalLLMProcessor:
     def _check_ollama_connection(self):
         """Check if Ollama is running and get available models."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = get_transport().get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 models_data = response.json()
                 self.available_models = [model["name"] for model in models_data.get("models", [])]
@@ -94,6 +95,7 @@ class LocalLLMProcessor:
                 "model": model_name,
                 "messages": messages,
                 "stream": False,
+                "keep_alive": LOCAL_LLM_KEEP_ALIVE,
                 "options": {
                     "temperature": temperature,
                     "num_predict": max_tokens
@@ -101,10 +103,9 @@ class LocalLLMProcessor:
             }
             
             # Make the request to Ollama
-            response = requests.post(
+            response = get_transport().post(
                 f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=30
+                json=payload
             )
             
             if response.status_code == 200:
@@ -124,6 +125,31 @@ class LocalLLMProcessor:
             logger.error(f"Unexpected error in local LLM processing: {e}")
             return None
             
+    def load_model(self, model_name: str = "mistral:7b", keep_alive: str = LOCAL_LLM_KEEP_ALIVE) -> bool:
+        """
+        Load a model into memory without generating anything.
+        
+        Args:
+            model_name: The name of the model to load
+            keep_alive: How long Ollama keeps it loaded (e.g. "10m", "-1" for always)
+            
+        Returns:
+            True if the model is loaded, False otherwise
+        """
+        try:
+            # A request without a prompt only loads the model (and restarts its keep-alive timer)
+            response = get_transport().post(
+                f"{self.base_url}/api/generate",
+                json={"model": model_name, "keep_alive": keep_alive}
+            )
+            if response.status_code == 200:
+                return True
+            logger.error(f"Failed to load model {model_name}: {response.status_code}")
+            return False
+        except Exception as e:
+            logger.error(f"Error loading model {model_name}: {e}")
+            return False
+            
     def pull_model(self, model_name: str = "mistral:7b") -> bool:
         """
         Pull a model from Ollama's model library.
@@ -136,7 +162,7 @@ class LocalLLMProcessor:
         """
         try:
             logger.info(f"Pulling model {model_name}...")
-            response = requests.post(
+            response = get_transport().post(
                 f"{self.base_url}/api/pull",
                 json={"name": model_name},
                 timeout=300  # 5 minutes timeout for model download
@@ -166,9 +192,9 @@ class LocalLLMProcessor:
             Model information dictionary or None if not found
         """
         try:
-            response = requests.get(f"{self.base_url}/api/show", 
-                                  json={"name": model_name}, 
-                                  timeout=10)
+            response = get_transport().get(f"{self.base_url}/api/show", 
+                                           json={"name": model_name}, 
+                                           timeout=10)
             
             if response.status_code == 200:
                 return response.json()
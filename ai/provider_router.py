@@ -0,0 +1,275 @@
+"""
+Module for choosing LLM providers from their observed latency and errors.
+
+Every request reports its time to first token (TTFT), its generation speed
+and whether it failed. The router keeps exponentially weighted moving
+averages (EWMA) of these plus recent TTFT percentiles, and ranks providers by
+the expected time until the streaming TTS can start speaking. A provider
+that fails several times in a row gets its circuit opened: it is skipped
+until a background probe (or, without a probe, one live request after the
+cooldown) succeeds again. The statistics are saved to a JSON file so a
+restarted assistant routes well from its first turn.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.3  # Weight of the newest observation
+DEFAULT_TTFT = 1.0  # Seconds assumed for a provider without observations, so it still gets tried
+DEFAULT_TOKENS_PER_SECOND = 30.0
+FIRST_AUDIO_TOKENS = 12  # Tokens before the streaming TTS has its first chunk (about 50 characters)
+MAX_ERROR_RATE = 0.95  # Bound for the retry penalty 1 / (1 - error rate)
+MAX_COOLDOWN = 600.0  # Longest wait between probes of a failing provider
+SAVE_INTERVAL = 5.0  # Seconds between writes of the statistics file
+
+def _ewma(current: Optional[float], value: float) -> float:
+    return value if current is None else EWMA_ALPHA * value + (1 - EWMA_ALPHA) * current
+
+@dataclass
+class ProviderStats:
+    """Observed behaviour of one provider."""
+    ttft: Optional[float] = None  # EWMA of the time to first token, seconds
+    tokens_per_second: Optional[float] = None  # EWMA of the generation speed after the first token
+    error_rate: float = 0.0  # EWMA of failures (1) and successes (0)
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ttft_history: deque = field(default_factory=lambda: deque(maxlen=100))
+    # Circuit breaker
+    circuit_open: bool = False
+    retry_at: float = 0.0  # time.monotonic() after which the provider is probed again
+    cooldown: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {"ttft": self.ttft, "tokens_per_second": self.tokens_per_second, "error_rate": self.error_rate,
+                "requests": self.requests, "failures": self.failures, "ttft_history": list(self.ttft_history)}
+
+    @classmethod
+    def from_dict(cls, data: dict, history: int) -> "ProviderStats":
+        stats = cls(ttft=data.get("ttft"), tokens_per_second=data.get("tokens_per_second"),
+                    error_rate=data.get("error_rate", 0.0), requests=data.get("requests", 0),
+                    failures=data.get("failures", 0))
+        stats.ttft_history = deque(data.get("ttft_history", []), maxlen=history)
+        return stats
+
+class ProviderRouter:
+    def __init__(self, providers: List[str], failure_threshold: int = 3, cooldown: float = 30.0,
+                 probe: Optional[Callable[[str], bool]] = None, probe_interval: float = 5.0,
+                 state_path: Optional[str] = None, history: int = 100, cost_weight: float = 0.25):
+        """
+        Track provider latency and errors and rank providers by expected time to first audio.
+
+        Args:
+            providers: Provider names
+            failure_threshold: Consecutive failures that open a provider's circuit
+            cooldown: Seconds before an open circuit is probed; doubles after each failed probe
+            probe: Function sending a tiny request to a provider, True if it answered; without
+                one, the first live request after the cooldown is the probe
+            probe_interval: Seconds between checks of the prober thread
+            state_path: JSON file the statistics are loaded from and saved to (None keeps them in memory)
+            history: Number of recent TTFTs kept for the percentiles
+            cost_weight: Latency traded for cost in rank(): a provider's expected time to first
+                audio is multiplied by (1 + cost_weight * cost), so 0 ranks by latency alone
+        """
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.state_path = state_path
+        self.history = history
+        self.cost_weight = cost_weight
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self.stats: Dict[str, ProviderStats] = {name: ProviderStats(ttft_history=deque(maxlen=history))
+                                                for name in providers}
+        self._load()
+
+        self._stop_event = threading.Event()
+        self._prober = None
+        if probe is not None:
+            self._prober = threading.Thread(target=self._probe_loop, name="llm-router-prober")
+            self._prober.daemon = True
+            self._prober.start()
+
+    def expected_time_to_first_audio(self, name: str) -> float:
+        """Seconds until the TTS can start on this provider's answer, including the expected retries."""
+        with self._lock:
+            stats = self.stats[name]
+            ttft = DEFAULT_TTFT if stats.ttft is None else stats.ttft
+            speed = stats.tokens_per_second or DEFAULT_TOKENS_PER_SECOND
+            error_rate = min(stats.error_rate, MAX_ERROR_RATE)
+        return (ttft + FIRST_AUDIO_TOKENS / speed) / (1.0 - error_rate)
+
+    def is_available(self, name: str) -> bool:
+        """False while the provider's circuit is open (and, without a prober, its cooldown is running)."""
+        with self._lock:
+            stats = self.stats[name]
+            if not stats.circuit_open:
+                return True
+            # Without a prober a live request after the cooldown decides (half-open)
+            return self.probe is None and time.monotonic() >= stats.retry_at
+
+    def score(self, name: str, cost: float = 0.0) -> float:
+        """Ranking score (lower is better): the expected time to first audio weighted by cost."""
+        return self.expected_time_to_first_audio(name) * (1.0 + self.cost_weight * cost)
+
+    def rank(self, candidates: List[str], costs: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Order providers from the best to the worst score.
+
+        Providers with an open circuit are left out; if all of them are open,
+        they are returned with the one due for a retry soonest first, so the
+        turn is still attempted.
+
+        Args:
+            candidates: Configured providers, in the order used to break ties
+            costs: Relative cost per provider (missing ones cost 1.0; None ranks by latency alone)
+        """
+        available = [name for name in candidates if self.is_available(name)]
+        if not available:
+            with self._lock:
+                return sorted(candidates, key=lambda name: self.stats[name].retry_at)
+        if costs is None:
+            return sorted(available, key=self.expected_time_to_first_audio)
+        return sorted(available, key=lambda name: self.score(name, costs.get(name, 1.0)))
+
+    def record_first_token(self, name: str, ttft: float):
+        """A request produced its first token after ttft seconds (counts as a success)."""
+        with self._lock:
+            stats = self.stats[name]
+            stats.requests += 1
+            stats.ttft = _ewma(stats.ttft, ttft)
+            stats.ttft_history.append(ttft)
+            stats.error_rate = _ewma(stats.error_rate, 0.0)
+            stats.consecutive_failures = 0
+            if stats.circuit_open:
+                logger.info(f"{name} answered again, closing its circuit")
+                stats.circuit_open = False
+                stats.cooldown = 0.0
+        self._maybe_save()
+
+    def record_completion(self, name: str, tokens: int, generation_time: float):
+        """A stream finished; tokens were generated in generation_time seconds after the first one."""
+        if tokens < 2 or generation_time <= 0:
+            return
+        with self._lock:
+            stats = self.stats[name]
+            stats.tokens_per_second = _ewma(stats.tokens_per_second, (tokens - 1) / generation_time)
+        self._maybe_save()
+
+    def record_failure(self, name: str, error: Optional[Exception] = None):
+        """A request failed; opens the circuit after failure_threshold failures in a row."""
+        with self._lock:
+            stats = self.stats[name]
+            stats.requests += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.error_rate = _ewma(stats.error_rate, 1.0)
+            if stats.circuit_open or stats.consecutive_failures >= self.failure_threshold:
+                self._open_circuit(name, stats, error)
+        self._maybe_save()
+
+    def _open_circuit(self, name: str, stats: ProviderStats, error: Optional[Exception]):
+        """Open (or keep open, backing off) a circuit; called with the lock held."""
+        if stats.circuit_open:
+            stats.cooldown = min(stats.cooldown * 2, MAX_COOLDOWN)
+        else:
+            stats.cooldown = self.base_cooldown
+            logger.warning(f"Opening circuit for {name} after {stats.consecutive_failures} failures"
+                           + (f" (last: {error})" if error else ""))
+        stats.circuit_open = True
+        stats.retry_at = time.monotonic() + stats.cooldown
+
+    def _probe_loop(self):
+        while not self._stop_event.wait(self.probe_interval):
+            now = time.monotonic()
+            with self._lock:
+                due = [name for name, stats in self.stats.items() if stats.circuit_open and now >= stats.retry_at]
+            for name in due:
+                start = time.perf_counter()
+                try:
+                    answered = self.probe(name)
+                except Exception as e:
+                    logger.debug(f"Probe of {name} failed: {e}")
+                    answered = False
+                if answered:
+                    self.record_first_token(name, time.perf_counter() - start)
+                else:
+                    with self._lock:
+                        self._open_circuit(name, self.stats[name], None)
+                    logger.info(f"{name} probe failed, next probe in {self.stats[name].cooldown:.0f}s")
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the statistics per provider.
+
+        Returns:
+            Dictionary per provider with the TTFT EWMA and p50/p90, the generation speed,
+            the error rate, the circuit state and the expected time to first audio
+        """
+        metrics = {}
+        for name in list(self.stats):
+            expected = self.expected_time_to_first_audio(name)
+            with self._lock:
+                stats = self.stats[name]
+                history = list(stats.ttft_history)
+                metrics[name] = {
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "error_rate": stats.error_rate,
+                    "ttft_ms_ewma": stats.ttft * 1000 if stats.ttft is not None else None,
+                    "ttft_ms_p50": float(np.percentile(history, 50)) * 1000 if history else None,
+                    "ttft_ms_p90": float(np.percentile(history, 90)) * 1000 if history else None,
+                    "tokens_per_second": stats.tokens_per_second,
+                    "circuit_open": stats.circuit_open,
+                    "expected_first_audio_ms": expected * 1000
+                }
+        return metrics
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                saved = json.load(f)
+            for name, data in saved.get("providers", {}).items():
+                if name in self.stats:
+                    self.stats[name] = ProviderStats.from_dict(data, self.history)
+            logger.info(f"Loaded LLM provider statistics from {self.state_path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load LLM provider statistics from {self.state_path}: {e}")
+
+    def _maybe_save(self):
+        if self.state_path and time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """Write the statistics (not the circuit states: a restart tries every provider again)."""
+        if not self.state_path:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            data = {"providers": {name: stats.to_dict() for name, stats in self.stats.items()}}
+        try:
+            temp_path = self.state_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not save LLM provider statistics to {self.state_path}: {e}")
+
+    def close(self):
+        """Stop the prober and save the statistics."""
+        self._stop_event.set()
+        if self._prober is not None:
+            self._prober.join(timeout=2.0)
+        self.save()
@@ -2,29 +2,94 @@
 Module for streaming text from LLM models as they generate responses.
 """
 
-import requests
 import time
+import queue
 import logging
+import threading
 import json
 import anthropic
 import openai
+from collections import deque
 from typing import Generator, Optional, List, Dict, Any
 from utils.config import (
     OPENAI_API_KEY, ANTHROPIC_API_KEY, DEEPSEEK_API_KEY,
     AI_PROVIDER, CHATGPT_MODEL, CLAUDE_MODEL, DEEPSEEK_MODEL,
     SYSTEM_PROMPT, USE_LOCAL_LLM, OLLAMA_URL, LOCAL_LLM_MODEL,
-    LOCAL_LLM_TEMPERATURE, LOCAL_LLM_MAX_TOKENS
+    LOCAL_LLM_TEMPERATURE, LOCAL_LLM_MAX_TOKENS, LOCAL_LLM_KEEP_ALIVE, LLM_RACE_WIDTH, LLM_PROVIDER_COSTS,
+    LLM_ROUTER, LLM_ROUTER_STATE, LLM_ROUTER_FAILURES, LLM_ROUTER_COOLDOWN, LLM_ROUTER_COST_WEIGHT
 )
+from utils.http_transport import get_transport
+from .provider_router import ProviderRouter
 
 logger = logging.getLogger(__name__)
 
-class StreamingLLMProcessor:
+PROVIDERS = ["chatgpt", "claude", "deepseek", "local_llm"]  # Preference order when costs are equal
+FALLBACK_RESPONSE = "Lo siento, no pude procesar tu solicitud en este momento. Por favor, intenta de nuevo."
+
+class StreamCancelled(Exception):
+    """Raised in a provider stream that lost the race before its response was opened."""
+
+class StreamHandle:
     def __init__(self):
+        """
+        The open HTTP stream of one provider, closable from another thread.
+
+        Racing providers register their response here, so a loser's connection
+        is closed as soon as another provider wins, even while its thread is
+        blocked waiting for data.
+        """
+        self.closed = False
+        self._response = None
+        self._lock = threading.Lock()
+
+    def attach(self, response):
+        """Register the provider's response (anything with close()); closes it at once if the race is over."""
+        with self._lock:
+            self._response = response
+            closed = self.closed
+        if closed:
+            response.close()
+            raise StreamCancelled()
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except Exception as e:
+                logger.debug(f"Error closing stream: {e}")
+
+class StreamingLLMProcessor:
+    def __init__(self, race_width: Optional[int] = None, provider_costs: Optional[Dict[str, float]] = None,
+                 router: Optional[ProviderRouter] = None):
+        """
+        Initialize the streaming LLM processor.
+        
+        Args:
+            race_width: Providers streamed at the same time with provider="fastest"; the first one to
+                yield content is kept and the others are closed (1 tries them one after another)
+            provider_costs: Relative cost per provider; cheaper providers are raced and tried first
+                (missing providers count as 1.0)
+            router: Router ranking the providers by observed latency and errors (default: one
+                persisted to LLM_ROUTER_STATE if LLM_ROUTER is enabled)
+        """
         self.openai_client = None
         self.anthropic_client = None
         self.deepseek_api_url = "https://api.deepseek.com/v1/chat/completions"
         self.local_llm_processor = None
+        self.race_width = LLM_RACE_WIDTH if race_width is None else race_width
+        self.provider_costs = LLM_PROVIDER_COSTS if provider_costs is None else provider_costs
+        self.metrics = {"races": 0, "all_failed": 0, "wins": {}}
+        self._metrics_lock = threading.Lock()
+        self._first_token_latencies = deque(maxlen=100)
         self._initialize_clients()
+        self.router = router
+        if self.router is None and LLM_ROUTER:
+            self.router = ProviderRouter(PROVIDERS, failure_threshold=LLM_ROUTER_FAILURES, cooldown=LLM_ROUTER_COOLDOWN,
+                                         probe=self._probe, state_path=LLM_ROUTER_STATE,
+                                         cost_weight=LLM_ROUTER_COST_WEIGHT)
         
     def _initialize_clients(self):
         """Initialize API clients based on available API keys."""
@@ -63,6 +128,12 @@ class StreamingLLMProcessor:
         """
         Stream text from LLM models as they generate responses.
         
+        With provider="fastest" the race_width cheapest available providers are
+        streamed concurrently and the first one to yield content is used; if all
+        of them fail before their first token, the others are tried in order.
+        A provider failing after its first token raises, since the partial
+        response may already be spoken.
+        
         Args:
             text: The text to process
             conversation_history: List of previous messages in the conversation
@@ -75,46 +146,229 @@ class StreamingLLMProcessor:
         logger.info(f"Input text: {text[:100]}...")
         
         if provider == "fastest":
-            # Try providers in order of preference
-            providers = ["chatgpt", "claude", "deepseek", "local_llm"]
+            providers = [name for name in self._provider_order() if self._is_available(name)]
+            if self.router:
+                # Best expected time to first audio, weighted by cost, first; providers with an open circuit are skipped
+                providers = self.router.rank(providers, self.provider_costs)
+                logger.info(f"Provider ranking: {', '.join(providers)}")
+            if self.race_width > 1 and len(providers) > 1:
+                won = yield from self._race(text, conversation_history, providers[:self.race_width])
+                if won:
+                    return
+                # Every racer failed before its first token: try the remaining providers one by one
+                providers = providers[self.race_width:]
         else:
             providers = [provider]
             
         for provider_name in providers:
             logger.info(f"Trying provider: {provider_name}")
+            if not self._is_available(provider_name):
+                logger.warning(f"Provider {provider_name} is not available")
+                continue
+            yielded = False
             try:
-                if provider_name == "chatgpt" and self.openai_client:
-                    logger.info("Attempting ChatGPT streaming...")
-                    yield from self._stream_from_chatgpt(text, conversation_history)
-                    logger.info("ChatGPT streaming completed successfully")
-                    return
-                elif provider_name == "claude" and self.anthropic_client:
-                    logger.info("Attempting Claude streaming...")
-                    yield from self._stream_from_claude(text, conversation_history)
-                    logger.info("Claude streaming completed successfully")
-                    return
-                elif provider_name == "deepseek" and DEEPSEEK_API_KEY and DEEPSEEK_API_KEY != "your_deepseek_api_key_here":
-                    logger.info("Attempting DeepSeek streaming...")
-                    yield from self._stream_from_deepseek(text, conversation_history)
-                    logger.info("DeepSeek streaming completed successfully")
-                    return
-                elif provider_name == "local_llm" and self.local_llm_processor and self.local_llm_processor.is_available():
-                    logger.info("Attempting Local LLM streaming...")
-                    yield from self._stream_from_local_llm(text, conversation_history)
-                    logger.info("Local LLM streaming completed successfully")
-                    return
-                else:
-                    logger.warning(f"Provider {provider_name} is not available")
+                logger.info(f"Attempting {provider_name} streaming...")
+                for chunk in self._stream_from(provider_name, text, conversation_history):
+                    if chunk:
+                        yielded = True
+                    yield chunk
+                logger.info(f"{provider_name} streaming completed successfully")
+                return
             except Exception as e:
                 logger.error(f"Error streaming from {provider_name}: {e}")
+                if yielded:
+                    # Part of the response was already used, so no other provider can take over
+                    raise
                 continue
                 
         # If all providers fail, yield an error message and fallback response
         logger.error("All LLM providers failed to generate a response")
-        error_msg = "Lo siento, no pude procesar tu solicitud en este momento. Por favor, intenta de nuevo."
-        yield error_msg
+        yield FALLBACK_RESPONSE
+    
+    def _provider_order(self) -> List[str]:
+        """Providers from cheapest to most expensive (ties keep the default preference order)."""
+        return sorted(PROVIDERS, key=lambda name: self.provider_costs.get(name, 1.0))
+    
+    def _is_available(self, provider_name: str) -> bool:
+        if provider_name == "chatgpt":
+            return self.openai_client is not None
+        if provider_name == "claude":
+            return self.anthropic_client is not None
+        if provider_name == "deepseek":
+            return bool(DEEPSEEK_API_KEY) and DEEPSEEK_API_KEY != "your_deepseek_api_key_here"
+        if provider_name == "local_llm":
+            return self.local_llm_processor is not None and self.local_llm_processor.is_available()
+        return False
+    
+    def _stream_from(self, provider_name: str, text: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                     handle: Optional[StreamHandle] = None, measured: bool = True) -> Generator[str, None, None]:
+        """Stream from one provider by name; raises on errors. Measured streams report to the router."""
+        stream_functions = {
+            "chatgpt": self._stream_from_chatgpt,
+            "claude": self._stream_from_claude,
+            "deepseek": self._stream_from_deepseek,
+            "local_llm": self._stream_from_local_llm
+        }
+        stream = stream_functions[provider_name](text, conversation_history, handle=handle)
+        if not measured or self.router is None:
+            return stream
+        return self._measured(provider_name, stream, handle)
+    
+    def _measured(self, provider_name: str, stream: Generator[str, None, None],
+                  handle: Optional[StreamHandle]) -> Generator[str, None, None]:
+        """Pass a provider stream through, reporting its TTFT, speed and failures to the router."""
+        start_time = time.perf_counter()
+        first_token_time = None
+        tokens = 0
+        try:
+            for chunk in stream:
+                if chunk:
+                    tokens += 1
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter()
+                        self.router.record_first_token(provider_name, first_token_time - start_time)
+                yield chunk
+        except Exception as e:
+            # A stream closed because it lost a race is not the provider's fault
+            if handle is None or not handle.closed:
+                self.router.record_failure(provider_name, e)
+            raise
+        finally:
+            stream.close()
+        if first_token_time is not None:
+            self.router.record_completion(provider_name, tokens, time.perf_counter() - first_token_time)
+        elif handle is None or not handle.closed:
+            self.router.record_failure(provider_name)
+    
+    def _probe(self, provider_name: str) -> bool:
+        """Ask a provider with an open circuit for a short answer; True once its first token arrives."""
+        if not self._is_available(provider_name):
+            return False
+        handle = StreamHandle()
+        stream = self._stream_from(provider_name, "Responde solo: ok", handle=handle, measured=False)
+        try:
+            for chunk in stream:
+                if chunk:
+                    return True
+            return False
+        finally:
+            # Only the first token is needed
+            stream.close()
+            handle.close()
     
-    def _stream_from_chatgpt(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Generator[str, None, None]:
+    def close(self):
+        """Stop the router's prober and save its statistics."""
+        if self.router:
+            self.router.close()
+    
+    def _race(self, text: str, conversation_history: Optional[List[Dict[str, str]]],
+              providers: List[str]) -> Generator[str, None, bool]:
+        """
+        Stream from several providers at once and keep the first one that yields content.
+        
+        Each provider streams on its own thread. The first content token decides
+        the winner; the other streams are closed right away, so they stop
+        generating (and being billed) early.
+        
+        Args:
+            text: The text to process
+            conversation_history: List of previous messages in the conversation
+            providers: Providers to race
+            
+        Yields:
+            The winner's text chunks
+            
+        Returns:
+            True if a provider won and finished, False if all failed before their first token
+        """
+        events = queue.Queue()
+        handles = {name: StreamHandle() for name in providers}
+        start_time = time.perf_counter()
+        
+        def run(name):
+            handle = handles[name]
+            stream = self._stream_from(name, text, conversation_history, handle=handle)
+            try:
+                for chunk in stream:
+                    if handle.closed:
+                        break
+                    if chunk:
+                        events.put((name, "token", chunk))
+                events.put((name, "done", None))
+            except Exception as e:
+                if handle.closed:
+                    logger.debug(f"{name} stream closed: {e}")
+                events.put((name, "error", e))
+            finally:
+                stream.close()
+        
+        logger.info(f"Racing providers: {', '.join(providers)}")
+        for name in providers:
+            thread = threading.Thread(target=run, args=(name,), name=f"llm-race-{name}")
+            thread.daemon = True
+            thread.start()
+        
+        winner = None
+        failed = 0
+        try:
+            while True:
+                name, kind, value = events.get()
+                if winner is None:
+                    if kind == "token":
+                        winner = name
+                        latency = time.perf_counter() - start_time
+                        for other, handle in handles.items():
+                            if other != winner:
+                                handle.close()
+                        self._record_win(winner, latency)
+                        logger.info(f"{winner} won the race with its first token after {latency * 1000:.0f}ms")
+                        yield value
+                    else:
+                        failed += 1
+                        logger.error(f"Error streaming from {name}: {value if kind == 'error' else 'empty response'}")
+                        if failed == len(providers):
+                            with self._metrics_lock:
+                                self.metrics["races"] += 1
+                                self.metrics["all_failed"] += 1
+                            return False
+                elif name == winner:
+                    if kind == "token":
+                        yield value
+                    elif kind == "done":
+                        logger.info(f"{winner} streaming completed successfully")
+                        return True
+                    else:
+                        # Part of the response was already used, so no other provider can take over
+                        raise value
+        finally:
+            for handle in handles.values():
+                handle.close()
+    
+    def _record_win(self, provider_name: str, latency: float):
+        with self._metrics_lock:
+            self.metrics["races"] += 1
+            self.metrics["wins"][provider_name] = self.metrics["wins"].get(provider_name, 0) + 1
+            self._first_token_latencies.append(latency)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get provider race counters.
+        
+        Returns:
+            Dictionary with the number of races, the wins per provider, the races every
+            provider failed, the median time to the first token of the winner, and the
+            HTTP connection reuse per host
+        """
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+            metrics["wins"] = dict(self.metrics["wins"])
+            latencies = sorted(self._first_token_latencies)
+        metrics["first_token_ms_median"] = latencies[len(latencies) // 2] * 1000 if latencies else None
+        metrics["http"] = get_transport().get_metrics()
+        return metrics
+    
+    def _stream_from_chatgpt(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                             handle: Optional[StreamHandle] = None) -> Generator[str, None, None]:
         """Stream text from ChatGPT."""
         try:
             # Prepare messages with conversation history
@@ -136,6 +390,8 @@ class StreamingLLMProcessor:
                 max_tokens=500,
                 stream=True
             )
+            if handle:
+                handle.attach(response)
             
             chunk_count = 0
             for chunk in response:
@@ -147,11 +403,11 @@ class StreamingLLMProcessor:
                     
             logger.info(f"ChatGPT streaming completed with {chunk_count} chunks")
                     
-        except Exception as e:
-            logger.error(f"Error streaming from ChatGPT: {e}")
-            yield f"Error: {str(e)}"
+        except StreamCancelled:
+            logger.info("ChatGPT stream cancelled before it started")
     
-    def _stream_from_claude(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Generator[str, None, None]:
+    def _stream_from_claude(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                            handle: Optional[StreamHandle] = None) -> Generator[str, None, None]:
         """Stream text from Claude."""
         try:
             # Prepare messages with conversation history
@@ -172,6 +428,8 @@ class StreamingLLMProcessor:
                 messages=messages,
                 system=SYSTEM_PROMPT
             ) as stream:
+                if handle:
+                    handle.attach(stream)
                 chunk_count = 0
                 for text_chunk in stream.text_stream:
                     chunk_count += 1
@@ -180,11 +438,11 @@ class StreamingLLMProcessor:
                     
             logger.info(f"Claude streaming completed with {chunk_count} chunks")
                     
-        except Exception as e:
-            logger.error(f"Error streaming from Claude: {e}")
-            yield f"Error: {str(e)}"
+        except StreamCancelled:
+            logger.info("Claude stream cancelled before it started")
     
-    def _stream_from_deepseek(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Generator[str, None, None]:
+    def _stream_from_deepseek(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                              handle: Optional[StreamHandle] = None) -> Generator[str, None, None]:
         """Stream text from DeepSeek."""
         try:
             headers = {
@@ -212,12 +470,15 @@ class StreamingLLMProcessor:
             
             logger.info(f"Sending request to DeepSeek with {len(messages)} messages")
             
-            response = requests.post(
+            response = get_transport().post(
                 self.deepseek_api_url,
                 headers=headers,
                 json=payload,
                 stream=True
             )
+            if handle:
+                handle.attach(response)
+            response.raise_for_status()
             
             chunk_count = 0
             for line in response.iter_lines():
@@ -226,7 +487,8 @@ class StreamingLLMProcessor:
                     if line.startswith('data: '):
                         data = line[6:]  # Remove 'data: ' prefix
                         if data == '[DONE]':
-                            break
+                            # Read to the end so the connection goes back to the pool
+                            continue
                         try:
                             chunk = json.loads(data)
                             if 'choices' in chunk and len(chunk['choices']) > 0:
@@ -241,11 +503,11 @@ class StreamingLLMProcessor:
                             
             logger.info(f"DeepSeek streaming completed with {chunk_count} chunks")
                             
-        except Exception as e:
-            logger.error(f"Error streaming from DeepSeek: {e}")
-            yield f"Error: {str(e)}"
+        except StreamCancelled:
+            logger.info("DeepSeek stream cancelled before it started")
     
-    def _stream_from_local_llm(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> Generator[str, None, None]:
+    def _stream_from_local_llm(self, text: str, conversation_history: Optional[List[Dict[str, str]]] = None,
+                               handle: Optional[StreamHandle] = None) -> Generator[str, None, None]:
         """Stream text from local LLM using Ollama."""
         try:
             # Prepare messages with conversation history
@@ -272,6 +534,7 @@ class StreamingLLMProcessor:
                 "model": LOCAL_LLM_MODEL,
                 "messages": messages,
                 "stream": True,
+                "keep_alive": LOCAL_LLM_KEEP_ALIVE,
                 "options": {
                     "temperature": LOCAL_LLM_TEMPERATURE,
                     "num_predict": LOCAL_LLM_MAX_TOKENS
@@ -281,12 +544,14 @@ class StreamingLLMProcessor:
             logger.info(f"Sending request to Local LLM with {len(messages)} messages")
             
             # Make the streaming request to Ollama
-            response = requests.post(
+            response = get_transport().post(
                 f"{self.local_llm_processor.base_url}/api/chat",
                 json=payload,
-                stream=True,
-                timeout=30
+                stream=True
             )
+            if handle:
+                handle.attach(response)
+            response.raise_for_status()
             
             chunk_count = 0
             for line in response.iter_lines():
@@ -303,9 +568,8 @@ class StreamingLLMProcessor:
                         
             logger.info(f"Local LLM streaming completed with {chunk_count} chunks")
                         
-        except Exception as e:
-            logger.error(f"Error streaming from local LLM: {e}")
-            yield f"Error: {str(e)}"
+        except StreamCancelled:
+            logger.info("local LLM stream cancelled before it started")
     
     def get_available_providers(self) -> Dict[str, Dict[str, Any]]:
         """Get information about available streaming providers."""
@@ -371,4 +635,4 @@ class StreamingLLMProcessor:
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return "Lo siento, no pude procesar tu solicitud en este momento. Por favor, intenta de nuevo." 
\ No newline at end of file
+            return FALLBACK_RESPONSE 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Module for writing recorded utterances to disk in the background.
+"""
+
+import os
+import time
+import wave
+import queue
+import logging
+import numpy as np
+from threading import Thread, Event
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class AudioArchiver:
+    def __init__(self, directory: str, max_queue: int = 16):
+        """
+        Initialize the audio archiver.
+
+        Utterances are handed over with archive(), which never blocks; a worker
+        thread writes them as 16-bit WAV files so disk I/O stays off the path
+        between end of speech and speech recognition.
+
+        Args:
+            directory: Directory the WAV files are written to
+            max_queue: Utterances waiting to be written before new ones are dropped
+        """
+        self.directory = directory
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stop_event = Event()
+        self.thread = None
+        self.metrics = {
+            "archived": 0,
+            "dropped": 0,
+            "errors": 0,
+            "write_ms_total": 0.0
+        }
+
+    def start(self):
+        """Start the writer thread."""
+        if self.thread and self.thread.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.stop_event.clear()
+        self.thread = Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info(f"Archiving utterances to {self.directory}")
+
+    def stop(self, timeout: float = 2.0):
+        """Write what is still queued (within the timeout) and stop the writer thread."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def archive(self, utterance, name: Optional[str] = None) -> bool:
+        """
+        Queue an utterance for writing.
+
+        Args:
+            utterance: Utterance to write (its audio must not be modified afterwards)
+            name: File name (default: derived from the utterance's start time)
+
+        Returns:
+            True if queued, False if the queue was full and the utterance was dropped
+        """
+        if name is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(utterance.start_time))
+            millis = int((utterance.start_time % 1) * 1000)
+            name = f"utterance_{timestamp}_{millis:03d}.wav"
+        try:
+            self.queue.put_nowait((utterance, name))
+            return True
+        except queue.Full:
+            self.metrics["dropped"] += 1
+            logger.warning(f"Archive queue full, not saving {name}")
+            return False
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Get archiving counters."""
+        metrics = dict(self.metrics)
+        archived = metrics["archived"]
+        metrics["queue_depth"] = self.queue.qsize()
+        metrics["write_ms_avg"] = metrics["write_ms_total"] / archived if archived else 0.0
+        return metrics
+
+    def _run(self):
+        """Writer thread: drain the queue until stopped and empty."""
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            try:
+                utterance, name = self.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            start = time.perf_counter()
+            try:
+                # The full recording, so archived files keep the silence around the speech
+                audio = utterance.untrimmed_audio if utterance.untrimmed_audio is not None else utterance.audio
+                write_wav(os.path.join(self.directory, name), audio, utterance.sample_rate)
+                self.metrics["archived"] += 1
+                self.metrics["write_ms_total"] += (time.perf_counter() - start) * 1000
+            except Exception as e:
+                self.metrics["errors"] += 1
+                logger.error(f"Error archiving {name}: {e}")
+
+def write_wav(path: str, audio: np.ndarray, sample_rate: int):
+    """Write mono float32 audio as a 16-bit WAV file."""
+    audio_int16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)  # 16-bit
+        wf.setframerate(sample_rate)
+        wf.writeframes(audio_int16.tobytes())
@@ -2,186 +2,181 @@
 Module for audio recording and speech detection using Silero VAD.
 """
 
-import wave
 import numpy as np
 import time
 import os
+import queue
 from threading import Thread, Event
 import logging
-import sounddevice as sd
-import torch
-from collections import deque
 from utils.config import (
-    SAMPLE_RATE, CHANNELS, MIN_PHRASE_DURATION, TEMP_AUDIO_PATH,
-    SILENCE_TIMEOUT, MIN_SPEECH_DURATION
+    SAMPLE_RATE, PROCESSING_SAMPLE_RATE, CHANNELS, AUDIO_SOURCE, AUDIO_SOURCE_REALTIME, MIN_PHRASE_DURATION,
+    SILENCE_TIMEOUT, MIN_SPEECH_DURATION, VAD_MODE, VAD_THRESHOLD, VAD_NEG_THRESHOLD,
+    VAD_QUEUE_SIZE, VAD_BACKEND, VAD_NUM_THREADS, VAD_ONNX_MODEL_PATH,
+    VAD_ENERGY_GATE, VAD_GATE_MARGIN_DB, ENDPOINTER_MODE, ENDPOINTER_MIN_HANGOVER,
+    ENDPOINTER_MAX_HANGOVER, ARCHIVE_UTTERANCES, ARCHIVE_DIR,
+    AEC_ENABLED, AEC_FILTER_MS, AEC_MAX_DELAY_MS, STT_TRIM, STT_TRIM_MARGIN_BEFORE,
+    STT_TRIM_MARGIN_AFTER, STT_TRIM_MAX_PAUSE, STREAMING_STT, STREAMING_STT_URL, LANGUAGE
 )
 from audio.audio_player import AudioPlayer
+from audio.streaming_vad import StreamingVAD
+from audio.energy_gate import EnergyGate
+from audio.endpointer import Endpointer, create_endpointer
+from audio.utterance import Utterance
+from audio.audio_archiver import AudioArchiver
+from audio.echo_canceller import EchoCanceller
+from audio.resampler import PolyphaseResampler
+from audio.speech_trimmer import SpeechTrimmer, speech_spans, pause_points
+from audio.streaming_stt import create_streaming_stt
+from audio.audio_source import create_audio_source
+from audio.vad_backends import create_vad_backend
+from audio.ring_buffer import RingBuffer, UtteranceBuffer
 
 logger = logging.getLogger(__name__)
 
 # Constants
 MAX_RECORDING_TIME = 10.0  # Maximum time to record after speech is detected
-CHUNK_SIZE = 16000  # 1 second chunks for VAD processing
+CHUNK_SIZE = 16000  # 1 second chunks for VAD processing (chunk mode)
 PRE_BUFFER_SIZE = 2  # Number of seconds to keep in pre-buffer
+METRICS_LOG_INTERVAL = 30.0  # Seconds between VAD metrics log lines
+MAX_QUEUED_UTTERANCES = 8  # Completed utterances kept while the pipeline is busy
 
 class AudioRecorder:
-    def __init__(self):
+    def __init__(self, device=None, streaming_vad=None, archiver=None, echo_canceller=None, source=None,
+                 streaming_stt=None, speculative_stt=None):
+        """
+        Initialize the audio recorder.
+        
+        Args:
+            device: Input device index or name (default: system default input)
+            streaming_vad: Optional VAD stream shared with other recorders
+                (e.g. from MultiStreamVAD.add_stream); a model is loaded otherwise
+            archiver: Optional AudioArchiver that saves utterances in the background
+                (created from ARCHIVE_UTTERANCES/ARCHIVE_DIR if not given)
+            echo_canceller: Optional EchoCanceller that removes the avatar's speech before the VAD
+                (created from AEC_ENABLED if not given; feed it with push_reference)
+            source: Optional AudioSource to listen to (created from AUDIO_SOURCE if not given:
+                the microphone, or a file/socket/pipe for headless runs)
+            streaming_stt: Optional StreamingSTTEngine that recognizes each turn while it is spoken
+                (created from STREAMING_STT if not given; the session is attached to the Utterance)
+            speculative_stt: Optional SpeculativeRecognizer that starts recognition at each VAD offset
+                (used only without streaming recognition and in streaming VAD mode; pass one built on
+                the assistant's SpeechToText so no second recognizer is loaded)
+        """
         print("DEBUG: AudioRecorder __init__ started")
-        self.rate = SAMPLE_RATE
         self.channels = CHANNELS
+        self.device = device
+        self.source = source or create_audio_source(AUDIO_SOURCE, sample_rate=SAMPLE_RATE, channels=CHANNELS,
+                                                    device=device, realtime=AUDIO_SOURCE_REALTIME)
+        self.device_rate = self.source.sample_rate  # The input is read at its native rate
+        self.rate = PROCESSING_SAMPLE_RATE  # Everything after capture runs at this rate
         self.min_phrase_duration = MIN_PHRASE_DURATION
         self.stop_event = Event()
-        self.audio_detected_event = Event()
         self.recording_thread = None
         self.audio_player = AudioPlayer()
         print("DEBUG: AudioRecorder basic initialization complete")
         
         # Silero VAD model
-        self.model = None
-        self.utils = None
-        print("DEBUG: About to load VAD model")
-        self._load_vad_model()
-        print("DEBUG: VAD model loaded successfully")
+        self.vad_backend = None
+        self.vad_mode = VAD_MODE
+        self.streaming_vad = streaming_vad
+        if self.streaming_vad is not None:
+            # Frames are scored by a shared (batched) VAD service
+            self.vad_mode = "streaming"
+        else:
+            print("DEBUG: About to load VAD model")
+            self._load_vad_model()
+            print("DEBUG: VAD model loaded successfully")
+        
+        # Streaming VAD keeps the model state between 32ms frames
+        if self.vad_mode == "chunk" and not hasattr(self.vad_backend, "get_speech_segments"):
+            logger.warning(f"Chunk VAD mode needs the torch backend, using streaming mode with {VAD_BACKEND}")
+            self.vad_mode = "streaming"
+        if self.vad_mode == "streaming" and self.streaming_vad is None:
+            self.streaming_vad = StreamingVAD(
+                self.vad_backend,
+                threshold=VAD_THRESHOLD,
+                neg_threshold=VAD_NEG_THRESHOLD,
+                energy_gate=EnergyGate(margin_db=VAD_GATE_MARGIN_DB) if VAD_ENERGY_GATE else None
+            )
+            logger.info(f"Using streaming VAD with {self.streaming_vad.frame_size}-sample frames")
         
-        # Audio buffers
-        self.audio_buffer = deque(maxlen=int(SAMPLE_RATE * PRE_BUFFER_SIZE))
-        self.recording_frames = []
+        # Blocks are converted from the device rate in the VAD worker, never in the audio callback
+        frame_size = self.streaming_vad.frame_size if self.streaming_vad else CHUNK_SIZE
+        self.blocksize = int(round(frame_size * self.device_rate / self.rate))
+        self.resampler = None
+        if self.device_rate != self.rate:
+            self.resampler = PolyphaseResampler(self.device_rate, self.rate, max_block=self.blocksize)
+            logger.info(f"Capturing at {self.device_rate}Hz, resampling to {self.rate}Hz")
+        
+        # Audio buffers: fixed pre-roll ring and one contiguous buffer per utterance
+        self.audio_buffer = RingBuffer(int(self.rate * PRE_BUFFER_SIZE))
+        self.utterance_capacity = int(self.rate * (PRE_BUFFER_SIZE + MAX_RECORDING_TIME + SILENCE_TIMEOUT))
+        self.utterance_buffer = None
         self.is_recording = False
-        print("DEBUG: AudioRecorder initialization complete")
+        endpointer_options = {}
+        if ENDPOINTER_MODE == "adaptive":
+            endpointer_options = {"min_hangover": ENDPOINTER_MIN_HANGOVER, "max_hangover": ENDPOINTER_MAX_HANGOVER}
+        self.endpointer = create_endpointer(ENDPOINTER_MODE, self.rate, SILENCE_TIMEOUT, **endpointer_options)
         
-    def _load_vad_model(self):
-        """Load the Silero VAD model."""
-        try:
-            print("DEBUG: _load_vad_model started")
-            logger.info("Loading Silero VAD model...")
-            
-            # Check if model is already cached
-            cache_dir = torch.hub.get_dir()
-            model_path = f"{cache_dir}/snakers4_silero-vad_master"
-            if os.path.exists(model_path):
-                logger.info("Using cached Silero VAD model")
-                print("DEBUG: Using cached model")
+        # Completed utterances; capture keeps running while consumers process them
+        self.utterance_queue = queue.Queue(maxsize=MAX_QUEUED_UTTERANCES)
+        self._current_utterance = None
+        self._block_events = []
+        self._utterance_events = []
+        self._interruption = False
+        
+        # Utterances live in memory; saving them to disk is optional and asynchronous
+        self.archiver = archiver
+        if self.archiver is None and ARCHIVE_UTTERANCES:
+            self.archiver = AudioArchiver(ARCHIVE_DIR)
+        
+        # Echo cancellation between capture and VAD so the avatar's own voice
+        # does not trigger barge-in
+        self.echo_canceller = echo_canceller
+        if self.echo_canceller is None and AEC_ENABLED:
+            self.echo_canceller = EchoCanceller(self.rate, filter_ms=AEC_FILTER_MS, max_delay_ms=AEC_MAX_DELAY_MS)
+        
+        # Only the speech spans (plus margins) of an utterance are sent to recognition
+        self.trimmer = None
+        if STT_TRIM and self.streaming_vad is not None:
+            self.trimmer = SpeechTrimmer(self.rate, margin_before=STT_TRIM_MARGIN_BEFORE,
+                                         margin_after=STT_TRIM_MARGIN_AFTER, max_pause=STT_TRIM_MAX_PAUSE)
+        self.stream_position = 0  # Samples handed to the VAD, to place its events in the utterance audio
+        
+        # Streaming recognition runs during the turn so the transcript is ready soon after it ends
+        self.streaming_stt = streaming_stt
+        if self.streaming_stt is None:
+            self.streaming_stt = create_streaming_stt(STREAMING_STT, url=STREAMING_STT_URL, language=LANGUAGE)
+        self.stt_session = None
+        
+        # Without streaming recognition, batch recognition can still overlap the hang-over
+        self.speculative_stt = None
+        if speculative_stt is not None:
+            if self.streaming_stt is not None:
+                logger.info("Streaming recognition is on, speculative recognition not used")
+            elif self.streaming_vad is None:
+                logger.warning("Speculative recognition needs VAD offsets, disabled in chunk mode")
             else:
-                logger.info("Downloading Silero VAD model (this may take a few minutes on first run)...")
-                print("DEBUG: Will download model")
-            
-            # Windows-specific workaround for torch.hub.load issues
-            import platform
-            if platform.system() == "Windows":
-                print("DEBUG: Windows detected, using workaround for torch.hub.load")
-                # Set environment variables to help with Windows file handling
-                os.environ['TORCH_HOME'] = cache_dir
-                os.environ['HF_HOME'] = cache_dir
-                
-                # Try to clear any existing file handles
-                import gc
-                gc.collect()
-                
-                # Add a small delay to let Windows file system settle
-                import time
-                time.sleep(1)
-            
-            print("DEBUG: About to call torch.hub.load")
-            
-            # Try multiple approaches for loading the model
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    self.model, self.utils = torch.hub.load(
-                        repo_or_dir='snakers4/silero-vad', 
-                        model='silero_vad', 
-                        force_reload=False,  # Use cached model if available
-                        trust_repo=True  # Trust the repository
-                    )
-                    print(f"DEBUG: torch.hub.load completed successfully on attempt {attempt + 1}")
-                    break
-                except Exception as e:
-                    print(f"DEBUG: Attempt {attempt + 1} failed: {e}")
-                    if attempt < max_retries - 1:
-                        print(f"DEBUG: Retrying in 2 seconds...")
-                        time.sleep(2)
-                        # Force garbage collection before retry
-                        gc.collect()
-                    else:
-                        # If all torch.hub.load attempts fail, try alternative method
-                        print("DEBUG: All torch.hub.load attempts failed, trying alternative method")
-                        self._load_vad_model_alternative()
-                        return
-            
-            self.get_speech_timestamps = self.utils[0]
-            print("DEBUG: get_speech_timestamps assigned")
-            logger.info("Silero VAD model loaded successfully")
-            print("DEBUG: _load_vad_model completed successfully")
-            
-        except Exception as e:
-            print(f"DEBUG: Error in _load_vad_model: {e}")
-            logger.error(f"Failed to load Silero VAD model: {e}")
-            
-            # Provide helpful error message and suggestions
-            error_msg = f"Failed to load Silero VAD model: {e}"
-            if "Controlador no válido" in str(e) or "Invalid handle" in str(e):
-                error_msg += "\n\nThis is a Windows-specific file handle issue. Try the following:"
-                error_msg += "\n1. Restart your Python environment"
-                error_msg += "\n2. Clear the model cache: python utils/check_cache.py clear"
-                error_msg += "\n3. Run as administrator if the issue persists"
-                error_msg += "\n4. Check if antivirus software is blocking the download"
-            
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+                self.speculative_stt = speculative_stt
+        self._speculation = None
         
-    def _load_vad_model_alternative(self):
-        """Alternative method to load Silero VAD model using direct import."""
-        try:
-            print("DEBUG: Using alternative VAD model loading method")
-            logger.info("Loading Silero VAD model using alternative method...")
-            
-            # Try to import silero-vad directly
-            try:
-                from silero_vad import load_model, get_speech_timestamps
-                self.model = load_model()
-                self.get_speech_timestamps = get_speech_timestamps
-                print("DEBUG: Successfully loaded using direct silero_vad import")
-                logger.info("Silero VAD model loaded using direct import")
-                return
-            except ImportError:
-                print("DEBUG: silero_vad package not available, trying manual download")
-            
-            # Manual download and setup
-            import urllib.request
-            import zipfile
-            import tempfile
-            
-            # Download the model files manually
-            model_url = "https://github.com/snakers4/silero-vad/archive/refs/heads/master.zip"
-            cache_dir = torch.hub.get_dir()
-            model_path = f"{cache_dir}/snakers4_silero-vad_master"
-            
-            if not os.path.exists(model_path):
-                print("DEBUG: Downloading model manually...")
-                with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
-                    urllib.request.urlretrieve(model_url, temp_file.name)
-                    
-                    # Extract the zip file
-                    with zipfile.ZipFile(temp_file.name, 'r') as zip_ref:
-                        zip_ref.extractall(cache_dir)
-                
-                # Clean up temp file
-                os.unlink(temp_file.name)
-            
-            # Now try to load using torch.hub.load with local path
-            self.model, self.utils = torch.hub.load(
-                repo_or_dir=model_path,
-                model='silero_vad',
-                source='local'
-            )
-            
-            self.get_speech_timestamps = self.utils[0]
-            print("DEBUG: Alternative method completed successfully")
-            logger.info("Silero VAD model loaded using alternative method")
-            
-        except Exception as e:
-            print(f"DEBUG: Alternative method also failed: {e}")
-            raise RuntimeError(f"All methods to load Silero VAD model failed: {e}")
+        # Capture/inference split: the audio callback only enqueues blocks,
+        # a dedicated worker runs the VAD on them
+        self.frame_queue = queue.Queue(maxsize=VAD_QUEUE_SIZE)
+        self.vad_thread = None
+        self._reset_vad_metrics()
+        print("DEBUG: AudioRecorder initialization complete")
+        
+    def _load_vad_model(self):
+        """Load the Silero VAD model with the configured backend."""
+        logger.info(f"Loading Silero VAD model ({VAD_BACKEND} backend)...")
+        self.vad_backend = create_vad_backend(
+            VAD_BACKEND,
+            sample_rate=self.rate,
+            num_threads=VAD_NUM_THREADS,
+            model_path=VAD_ONNX_MODEL_PATH or None
+        )
+        logger.info("Silero VAD model loaded successfully")
         
     def start_listening(self):
         """Start listening for audio in a background thread."""
@@ -190,7 +185,13 @@ class AudioRecorder:
             return False
             
         self.stop_event.clear()
-        self.audio_detected_event.clear()
+        if self.streaming_vad:
+            self.streaming_vad.reset()
+        self.stream_position = 0
+        if self.resampler:
+            self.resampler.reset()
+        if self.archiver:
+            self.archiver.start()
         self.recording_thread = Thread(target=self._listen_for_speech)
         self.recording_thread.daemon = True
         self.recording_thread.start()
@@ -206,184 +207,406 @@ class AudioRecorder:
             return True
         return False
         
+    def get_utterance(self, timeout=None):
+        """
+        Wait for the next completed utterance.
+        
+        Args:
+            timeout: Seconds to wait (None waits until one is available)
+            
+        Returns:
+            Utterance, or None if the timeout expired
+        """
+        try:
+            return self.utterance_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+            
     def wait_for_speech(self, timeout=None):
-        """Wait until speech is detected and recorded."""
-        return self.audio_detected_event.wait(timeout=timeout)
+        """Wait until speech is detected and recorded (see get_utterance)."""
+        if self._current_utterance is None:
+            self._current_utterance = self.get_utterance(timeout=timeout)
+        return self._current_utterance is not None
         
     def _listen_for_speech(self):
         """Background thread that listens for speech using Silero VAD."""
         logger.info("Starting Silero VAD speech detection...")
         
-        def audio_callback(indata, frames, time, status):
-            if status:
-                logger.warning(f"Audio callback status: {status}")
-                
-            # Convert to mono and float
-            if indata.shape[1] > 1:
-                audio_data = np.mean(indata, axis=1)
-            else:
-                audio_data = indata.flatten()
+        def audio_callback(audio_data):
+            if self.source.paced:
+                # Hand the block to the VAD worker; never block the audio thread
+                try:
+                    self.frame_queue.put_nowait(audio_data)
+                except queue.Full:
+                    self.vad_metrics["dropped_frames"] += 1
+                return
+            # Files and sockets wait for the VAD worker instead of losing audio
+            while not self.stop_event.is_set():
+                try:
+                    self.frame_queue.put(audio_data, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
                 
-            # Add to rolling buffer
-            self.audio_buffer.extend(audio_data)
-            
-            # Process for VAD
-            self._process_audio_chunk(audio_data)
+        self._reset_vad_metrics()
+        self.vad_thread = Thread(target=self._vad_worker)
+        self.vad_thread.daemon = True
+        self.vad_thread.start()
         
         try:
-            with sd.InputStream(
-                samplerate=self.rate,
-                channels=self.channels,
-                callback=audio_callback,
-                blocksize=CHUNK_SIZE,
-                dtype=np.float32
-            ):
-                logger.info("Microphone is open and listening with Silero VAD...")
-                
-                while not self.stop_event.is_set():
-                    time.sleep(0.1)
+            self.source.start(audio_callback, self.blocksize)
+            logger.info(f"Audio source ({self.source.name}) is open and listening with Silero VAD...")
+            
+            while not self.stop_event.wait(timeout=METRICS_LOG_INTERVAL):
+                self._log_vad_metrics()
                     
         except Exception as e:
             logger.error(f"Error in audio stream: {e}")
+        finally:
+            self.source.stop()
+            self.stop_event.set()
+            self.vad_thread.join(timeout=2.0)
+            
+    def wait_for_source(self, timeout=None):
+        """
+        Wait until a finite source (e.g. a replayed file) is exhausted and all of it went through the VAD.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            
+        Returns:
+            True if the source finished and was fully processed, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self.source.finished.wait(timeout):
+            return False
+        while self.frame_queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+            
+    def _vad_worker(self):
+        """Background thread that runs VAD inference on captured blocks, draining the queue on stop."""
+        while not (self.stop_event.is_set() and self.frame_queue.empty()):
+            try:
+                audio_data = self.frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+                
+            metrics = self.vad_metrics
+            metrics["max_queue_depth"] = max(metrics["max_queue_depth"], self.frame_queue.qsize() + 1)
+            
+            start = time.perf_counter()
+            if self.resampler:
+                audio_data = self.resampler.process(audio_data)
+            if self.echo_canceller:
+                audio_data = self.echo_canceller.process(audio_data)
+            self.stream_position += len(audio_data)
+            self._process_audio_chunk(audio_data)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            metrics["frames_processed"] += 1
+            metrics["inference_ms_total"] += elapsed_ms
+            metrics["inference_ms_max"] = max(metrics["inference_ms_max"], elapsed_ms)
+            
+            # Add to rolling buffer after processing so a new recording's
+            # pre-roll does not already contain the current block
+            self.audio_buffer.write(audio_data)
+            self.frame_queue.task_done()
+            
+    def _reset_vad_metrics(self):
+        """Reset the capture/inference counters."""
+        self.vad_metrics = {
+            "frames_processed": 0,
+            "dropped_frames": 0,
+            "max_queue_depth": 0,
+            "inference_ms_total": 0.0,
+            "inference_ms_max": 0.0
+        }
+        
+    def get_vad_metrics(self):
+        """
+        Get capture/inference counters.
+        
+        Returns:
+            Dictionary with the current queue depth, dropped frames and per-frame inference time
+        """
+        metrics = dict(self.vad_metrics)
+        processed = metrics["frames_processed"]
+        metrics["queue_depth"] = self.frame_queue.qsize()
+        metrics["inference_ms_avg"] = metrics["inference_ms_total"] / processed if processed else 0.0
+        energy_gate = getattr(self.streaming_vad, "energy_gate", None)
+        if energy_gate:
+            metrics.update(energy_gate.get_metrics())
+        metrics["endpointer"] = self.endpointer.get_metrics()
+        if self.echo_canceller:
+            metrics["aec"] = self.echo_canceller.get_metrics()
+        if self.trimmer:
+            metrics["trim"] = self.trimmer.get_metrics()
+        if self.streaming_stt:
+            metrics["stt"] = self.streaming_stt.get_metrics()
+        if self.speculative_stt:
+            metrics["speculation"] = self.speculative_stt.get_metrics()
+        return metrics
+        
+    def _log_vad_metrics(self):
+        """Log VAD metrics, warning when the CPU cannot keep up with capture."""
+        metrics = self.get_vad_metrics()
+        message = (f"VAD metrics: processed={metrics['frames_processed']} dropped={metrics['dropped_frames']} "
+                   f"queue={metrics['queue_depth']} (max {metrics['max_queue_depth']}) "
+                   f"inference avg={metrics['inference_ms_avg']:.2f}ms max={metrics['inference_ms_max']:.2f}ms")
+        if "skip_ratio" in metrics:
+            message += f" gate skip={metrics['skip_ratio']:.0%} floor={metrics['noise_floor_db']:.1f}dB"
+        endpointer = metrics["endpointer"]
+        if endpointer["hangover_median"] is not None:
+            message += (f" endpointer={endpointer['mode']} hang-over median={endpointer['hangover_median']:.2f}s "
+                        f"({endpointer['decisions']} turns)")
+        if "aec" in metrics:
+            message += f" aec erle={metrics['aec']['erle_db']:.1f}dB delay={metrics['aec']['delay_ms']:.0f}ms"
+        if "trim" in metrics and metrics["trim"]["turns"]:
+            message += (f" trim kept={metrics['trim']['kept_ratio']:.0%} "
+                        f"saved={metrics['trim']['bytes_saved_total'] / 1024:.0f}KB")
+        if "stt" in metrics and metrics["stt"]["final_latency_ms_median"] is not None:
+            message += (f" stt final median={metrics['stt']['final_latency_ms_median']:.0f}ms "
+                        f"failures={metrics['stt']['failures']}")
+        if "speculation" in metrics and metrics["speculation"]["speculations"]:
+            speculation = metrics["speculation"]
+            message += f" speculation hit rate={speculation['hit_rate']:.0%}"
+            if speculation["latency_saved_ms_median"] is not None:
+                message += f" saved median={speculation['latency_saved_ms_median']:.0f}ms"
+        if metrics["dropped_frames"]:
+            logger.warning(message)
+        else:
+            logger.info(message)
             
     def _process_audio_chunk(self, audio_data):
         """Process audio chunk for speech detection."""
-        try:
-            # Convert to tensor
-            tensor_audio = torch.from_numpy(audio_data).float()
+        if self.streaming_vad:
+            self._process_audio_frame(audio_data)
+            return
             
+        self._block_events = []
+        try:
             # Get speech timestamps
-            speech_segments = self.get_speech_timestamps(
-                tensor_audio, 
-                self.model, 
-                sampling_rate=self.rate,
+            speech_segments = self.vad_backend.get_speech_segments(
+                audio_data,
                 min_speech_duration_ms=int(MIN_SPEECH_DURATION * 1000),
                 min_silence_duration_ms=int(SILENCE_TIMEOUT * 1000)
             )
             
             # Check if avatar is speaking
             if self.audio_player.is_playing_audio():
-                self._handle_interruption_detection(speech_segments, audio_data)
+                self._handle_interruption_detection(bool(speech_segments), audio_data)
             else:
-                self._handle_speech_detection(speech_segments, audio_data)
+                self._handle_speech_detection(bool(speech_segments), audio_data)
                 
         except Exception as e:
             logger.error(f"Error processing audio chunk: {e}")
             
-    def _handle_interruption_detection(self, speech_segments, audio_data):
+    def _process_audio_frame(self, audio_data):
+        """Process a block of 32ms frames with the stateful streaming VAD."""
+        try:
+            events = self.streaming_vad.process(audio_data)
+            self._block_events = events
+            for event in events:
+                logger.debug(f"VAD {event.event_type} at sample {event.sample} (p={event.probability:.2f})")
+                
+            # A block counts as speech if it contains an onset or ends inside a speech segment
+            speech_detected = self.streaming_vad.is_speech or any(e.event_type == "start" for e in events)
+            
+            if self.audio_player.is_playing_audio():
+                self._handle_interruption_detection(speech_detected, audio_data)
+            else:
+                self._handle_speech_detection(speech_detected, audio_data)
+                
+        except Exception as e:
+            logger.error(f"Error processing audio frame: {e}")
+            
+    def _handle_interruption_detection(self, speech_detected, audio_data):
         """Handle speech detection when avatar is speaking (interruption)."""
-        if speech_segments:
+        if speech_detected:
             logger.info("User interruption detected, stopping avatar speech")
             self.audio_player.stop_audio()
             
             # Start recording the interruption
-            self._start_recording()
+            self.endpointer.start()
+            self.endpointer.update(True, len(audio_data))
+            self._start_recording(interruption=True)
             
             # Add current audio data to recording
-            self.recording_frames.append(audio_data.tobytes())
+            self._append_to_utterance(audio_data)
             
-    def _handle_speech_detection(self, speech_segments, audio_data):
+    def _handle_speech_detection(self, speech_detected, audio_data):
         """Handle normal speech detection."""
-        if speech_segments and not self.is_recording:
+        # Silence is counted in processed samples, see audio.endpointer
+        probability = self.streaming_vad.last_probability if self.streaming_vad else None
+        action = self.endpointer.update(speech_detected, len(audio_data), probability)
+        if action == Endpointer.START and not self.is_recording:
             logger.info("Speech detected, starting recording...")
             self._start_recording()
             
         if self.is_recording:
-            self.recording_frames.append(audio_data.tobytes())
-            
-            # Check if we should stop recording
-            if not speech_segments:
-                # No speech detected, check timeout
-                if hasattr(self, 'last_speech_time'):
-                    if time.time() - self.last_speech_time > SILENCE_TIMEOUT:
-                        print("VAD detected user stopped speaking")
-                        self._stop_recording()
-            else:
-                # Update last speech time
-                self.last_speech_time = time.time()
+            self._append_to_utterance(audio_data)
+            
+            if action == Endpointer.END:
+                print("VAD detected user stopped speaking")
+                self._stop_recording()
+            elif self.speculative_stt:
+                self._update_speculation()
                 
-    def _start_recording(self):
+    def _start_recording(self, interruption=False):
         """Start recording speech."""
         self.is_recording = True
-        self.recording_frames = []
-        self.last_speech_time = time.time()
-        self.recording_start_time = time.time()
+        # A fresh buffer per utterance keeps views handed out in earlier utterances valid
+        self.utterance_buffer = UtteranceBuffer(self.utterance_capacity)
+        self.recording_detected_time = time.time()
+        self.recording_onset_sample = self.streaming_vad.position if self.streaming_vad else None
+        self._utterance_events = []
+        self._interruption = interruption
+        self._discard_speculation()
         
         # Add pre-buffer content
-        if self.audio_buffer:
-            pre_buffer_audio = np.array(list(self.audio_buffer))
-            self.recording_frames.append(pre_buffer_audio.tobytes())
+        if len(self.audio_buffer):
+            self.utterance_buffer.append_ring(self.audio_buffer)
+            
+        if self.streaming_stt:
+            self._cancel_stt_session()
+            self.stt_session = self.streaming_stt.start_session(self.rate, on_transcript=self._on_transcript)
+            self.stt_session.push(self.utterance_buffer.view())
             
         logger.info("Started recording speech")
         
+    def _append_to_utterance(self, audio_data):
+        """Add a processed block and its VAD events to the current recording."""
+        self.utterance_buffer.append(audio_data)
+        self._utterance_events.extend(self._block_events)
+        if self.stt_session:
+            self.stt_session.push(audio_data)
+            
+    def _on_transcript(self, transcript):
+        """Log hypotheses from the streaming recognizer."""
+        if transcript.is_final:
+            logger.info(f"Streaming transcript: '{transcript.text}'")
+        else:
+            logger.debug(f"Partial transcript: '{transcript.text}'")
+            
+    def _update_speculation(self):
+        """Start recognition at a VAD offset; drop it when speech resumes."""
+        if not self._block_events:
+            return
+        if self._speculation and any(e.event_type == "start" for e in self._block_events):
+            self.speculative_stt.discard(self._speculation)
+            self._speculation = None
+        if self._block_events[-1].event_type == "end":
+            audio = self.utterance_buffer.view()
+            if self.trimmer:
+                audio = self.trimmer.trim(audio, self._utterance_events, self.stream_position - len(audio),
+                                          record=False).audio
+            self._speculation = self.speculative_stt.submit(audio, self.rate)
+            
+    def _discard_speculation(self):
+        """Drop the speculation of a turn that will not be queued."""
+        if self._speculation:
+            self.speculative_stt.discard(self._speculation)
+            self._speculation = None
+            
+    def _cancel_stt_session(self):
+        """Abandon the streaming recognition of a turn that will not be queued."""
+        if self.stt_session:
+            self.stt_session.cancel()
+            self.stt_session = None
+        
     def _stop_recording(self):
-        """Stop recording and save audio."""
+        """Stop recording and queue the utterance."""
         if not self.is_recording:
             return
             
         self.is_recording = False
-        recording_duration = time.time() - self.recording_start_time
+        recording_duration = self.endpointer.duration
+        self.endpointer.reset()
         
         if recording_duration < self.min_phrase_duration:
             logger.info(f"Speech too short ({recording_duration:.2f}s), ignoring")
+            self._cancel_stt_session()
+            self._discard_speculation()
             return
             
-        # Save the recorded audio
-        self._save_audio()
-        logger.info(f"Recording saved ({recording_duration:.2f}s)")
+        # Only the audio since the last push is left for the recognizer
+        stt_session, self.stt_session = self.stt_session, None
+        if stt_session:
+            stt_session.end()
+        # No onset since the last offset: the speculative transcript covers the whole turn
+        speculation, self._speculation = self._speculation, None
+        if speculation:
+            self.speculative_stt.confirm(speculation)
+            
+        logger.info(f"Recording finished ({recording_duration:.2f}s)")
         
-        # Signal that audio is ready for processing
-        self.audio_detected_event.set()
+        # Hand the utterance to consumers without blocking capture
+        audio = self.utterance_buffer.view()
+        # The recording ends with the block just processed
+        audio_start = self.stream_position - len(audio)
+        pauses = []
+        if self.streaming_vad:
+            pauses = pause_points(speech_spans(self._utterance_events, audio_start, len(audio)))
+        untrimmed_audio = None
+        if self.trimmer:
+            trimmed = self.trimmer.trim(audio, self._utterance_events, audio_start)
+            if trimmed.samples_saved:
+                logger.info(f"Trimmed silence: {len(audio) / self.rate:.2f}s -> {len(trimmed.audio) / self.rate:.2f}s, "
+                            f"{trimmed.bytes_saved / 1024:.1f}KB less to upload")
+                untrimmed_audio = audio
+                audio = trimmed.audio
+                pauses = [trimmed.map_position(p) for p in pauses]
+        end_time = time.time()
+        utterance = Utterance(
+            audio=audio,
+            sample_rate=self.rate,
+            start_time=end_time - len(self.utterance_buffer) / self.rate,
+            detected_time=self.recording_detected_time,
+            end_time=end_time,
+            onset_sample=self.recording_onset_sample,
+            end_sample=self.streaming_vad.position if self.streaming_vad else None,
+            vad_events=self._utterance_events,
+            interruption=self._interruption,
+            untrimmed_audio=untrimmed_audio,
+            stt_session=stt_session,
+            speculation=speculation,
+            pauses=pauses
+        )
+        self._queue_utterance(utterance)
+        if self.archiver:
+            self.archiver.archive(utterance)
         
-        # Wait for the event to be cleared before continuing to listen
-        while self.audio_detected_event.is_set() and not self.stop_event.is_set():
-            time.sleep(0.1)
-            
-    def _save_audio(self):
-        """Save recorded audio frames to a WAV file."""
-        try:
-            # Convert bytes back to numpy array
-            audio_data = []
-            for frame_bytes in self.recording_frames:
-                frame_data = np.frombuffer(frame_bytes, dtype=np.float32)
-                audio_data.extend(frame_data)
-                
-            audio_array = np.array(audio_data)
-            
-            # Convert to int16 for WAV file
-            audio_int16 = (audio_array * 32767).astype(np.int16)
-            
-            with wave.open(TEMP_AUDIO_PATH, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(self.rate)
-                wf.writeframes(audio_int16.tobytes())
-                
-        except Exception as e:
-            logger.error(f"Error saving audio: {e}")
+    def _queue_utterance(self, utterance):
+        """Queue an utterance, dropping the oldest one if consumers fall behind."""
+        while True:
+            try:
+                self.utterance_queue.put_nowait(utterance)
+                return
+            except queue.Full:
+                try:
+                    dropped = self.utterance_queue.get_nowait()
+                    logger.warning(f"Utterance queue full, dropping a {dropped.duration:.2f}s utterance")
+                except queue.Empty:
+                    pass
             
     def reset_detection_event(self):
-        """Reset the audio detection event to listen for new speech."""
-        self.audio_detected_event.clear()
+        """Release the utterance returned by wait_for_speech so the next one can be taken."""
+        self._current_utterance = None
         
     def get_audio_data(self):
-        """Get the recorded audio data as numpy array."""
-        try:
-            if not self.recording_frames:
-                return None
-                
-            # Convert bytes back to numpy array
-            audio_data = []
-            for frame_bytes in self.recording_frames:
-                frame_data = np.frombuffer(frame_bytes, dtype=np.float32)
-                audio_data.extend(frame_data)
-                
-            return np.array(audio_data)
-            
-        except Exception as e:
-            logger.error(f"Error getting audio data: {e}")
+        """Get the audio of the utterance returned by wait_for_speech as a float32 numpy array."""
+        if self._current_utterance is None:
             return None
+        return self._current_utterance.audio
             
     def stop(self):
         """Stop the audio recorder."""
-        return self.stop_listening()
+        stopped = self.stop_listening()
+        self._cancel_stt_session()
+        self._discard_speculation()
+        if self.archiver:
+            self.archiver.stop()
+        return stopped
@@ -0,0 +1,317 @@
+"""
+Module for the audio inputs the recorder can listen to: a live device, a file or a local socket/pipe.
+"""
+
+import os
+import sys
+import time
+import socket
+import logging
+import numpy as np
+from threading import Thread, Event
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+BlockCallback = Callable[[np.ndarray], None]
+
+STOP_POLL_INTERVAL = 0.5  # Seconds between stop checks while a socket waits for data
+
+def _to_mono(block: np.ndarray) -> np.ndarray:
+    """Downmix a (frames, channels) block to a mono float32 copy."""
+    if block.ndim > 1 and block.shape[1] > 1:
+        return np.mean(block, axis=1, dtype=np.float32)
+    return np.array(block, dtype=np.float32).reshape(-1)
+
+class AudioSource:
+    """
+    Base class for audio inputs.
+
+    A source delivers mono float32 blocks of `blocksize` samples at
+    `sample_rate` to a callback. Paced sources (a live device) deliver them at
+    the speed of real audio and the consumer must never block; unpaced
+    sources (files read as fast as possible, sockets) may be slowed down by a
+    consumer that waits.
+    """
+    name = "base"
+
+    def __init__(self, sample_rate: int, paced: bool = True):
+        self.sample_rate = sample_rate
+        self.paced = paced
+        self.finished = Event()  # Set when a finite source has delivered everything
+
+    def start(self, callback: BlockCallback, blocksize: int):
+        """Start delivering blocks to the callback."""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop delivering blocks and release the input."""
+        raise NotImplementedError
+
+class DeviceSource(AudioSource):
+    name = "device"
+
+    def __init__(self, device=None, sample_rate: int = 16000, channels: int = 1):
+        """
+        Live microphone through PortAudio.
+
+        Args:
+            device: Input device index or name (default: system default input)
+            sample_rate: Capture rate (the device's native rate avoids resampling in the driver)
+            channels: Channels to capture (downmixed to mono)
+        """
+        super().__init__(sample_rate, paced=True)
+        self.device = device
+        self.channels = channels
+        self._stream = None
+
+    def start(self, callback: BlockCallback, blocksize: int):
+        import sounddevice as sd
+
+        def audio_callback(indata, frames, time_info, status):
+            if status:
+                logger.warning(f"Audio callback status: {status}")
+            # Convert to mono and float (both produce a copy of PortAudio's buffer)
+            callback(_to_mono(indata))
+
+        self._stream = sd.InputStream(
+            device=self.device,
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            callback=audio_callback,
+            blocksize=blocksize,
+            dtype=np.float32
+        )
+        self._stream.start()
+        logger.info("Microphone is open")
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+class _ThreadedSource(AudioSource):
+    """Source that reads blocks in its own thread until stopped or exhausted."""
+
+    def __init__(self, sample_rate: int, paced: bool):
+        super().__init__(sample_rate, paced)
+        self._stop_event = Event()
+        self._thread = None
+
+    def start(self, callback: BlockCallback, blocksize: int):
+        self._stop_event.clear()
+        self.finished.clear()
+        self._thread = Thread(target=self._run_thread, args=(callback, blocksize))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._close()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run_thread(self, callback: BlockCallback, blocksize: int):
+        try:
+            self._run(callback, blocksize)
+        except Exception as e:
+            if not self._stop_event.is_set():
+                logger.error(f"Error reading {self.name} audio source: {e}")
+        finally:
+            self.finished.set()
+
+    def _run(self, callback: BlockCallback, blocksize: int):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+class FileSource(_ThreadedSource):
+    name = "file"
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False, trailing_silence: float = 2.0):
+        """
+        Replay a WAV/FLAC file as if it was captured live.
+
+        Args:
+            path: Audio file (any format soundfile reads; downmixed to mono)
+            realtime: Deliver blocks at the speed of real audio; otherwise as fast as
+                the consumer takes them
+            loop: Start over at the end of the file until stopped
+            trailing_silence: Seconds of silence after the file so the last turn can end
+        """
+        import soundfile as sf
+
+        self.path = path
+        self.info = sf.info(path)
+        super().__init__(self.info.samplerate, paced=realtime)
+        self.loop = loop
+        self.trailing_silence = trailing_silence
+
+    def _run(self, callback: BlockCallback, blocksize: int):
+        import soundfile as sf
+
+        silence = np.zeros(blocksize, dtype=np.float32)
+        started = time.monotonic()
+        delivered = 0
+        while not self._stop_event.is_set():
+            with sf.SoundFile(self.path) as f:
+                for block in f.blocks(blocksize=blocksize, dtype="float32", always_2d=True, fill_value=0.0):
+                    if self._stop_event.is_set():
+                        return
+                    delivered = self._deliver(callback, _to_mono(block), started, delivered)
+            if not self.loop:
+                break
+        for _ in range(int(self.trailing_silence * self.sample_rate / blocksize)):
+            if self._stop_event.is_set():
+                return
+            delivered = self._deliver(callback, silence.copy(), started, delivered)
+        logger.info(f"Finished replaying {self.path}")
+
+    def _deliver(self, callback: BlockCallback, block: np.ndarray, started: float, delivered: int) -> int:
+        """Hand over a block, first waiting for its real-time deadline when paced."""
+        if self.paced:
+            delay = started + delivered / self.sample_rate - time.monotonic()
+            if delay > 0:
+                self._stop_event.wait(delay)
+        callback(block)
+        return delivered + len(block)
+
+class SocketSource(_ThreadedSource):
+    name = "socket"
+
+    def __init__(self, address: str, sample_rate: int = 16000):
+        """
+        Raw 16-bit little-endian mono PCM from a local socket or pipe.
+
+        Feed it with e.g. `arecord -f S16_LE -r 16000 -c 1 | nc 127.0.0.1 5005` or
+        `ffmpeg -i call.wav -f s16le -ar 16000 -ac 1 unix:/tmp/mic.sock`.
+        Socket servers accept one client at a time and wait for the next one
+        when it disconnects.
+
+        Args:
+            address: "tcp://host:port", "unix:///path/to.sock", "pipe:/path/to/fifo" or "pipe:-" (stdin)
+            sample_rate: Sample rate of the incoming audio
+        """
+        super().__init__(sample_rate, paced=False)
+        self.address = address
+        self._server = None
+        self._connection = None
+
+    def _run(self, callback: BlockCallback, blocksize: int):
+        if self.address.startswith("pipe:"):
+            path = self.address[len("pipe:"):]
+            logger.info(f"Reading audio from {path if path != '-' else 'stdin'}")
+            if path == "-":
+                self._read_pipe(sys.stdin.buffer, callback, blocksize)
+            else:
+                with open(path, "rb") as stream:
+                    self._read_pipe(stream, callback, blocksize)
+            return
+
+        self._server = self._listen()
+        while not self._stop_event.is_set():
+            try:
+                self._connection, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            logger.info(f"Audio client connected on {self.address}")
+            self._connection.settimeout(STOP_POLL_INTERVAL)
+            with self._connection:
+                self._read_socket(self._connection, callback, blocksize)
+            self._connection = None
+            logger.info("Audio client disconnected")
+
+    def _listen(self) -> socket.socket:
+        """Open the listening socket for the address."""
+        if self.address.startswith("tcp://"):
+            host, port = self.address[len("tcp://"):].rsplit(":", 1)
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((host, int(port)))
+        elif self.address.startswith("unix://"):
+            path = self.address[len("unix://"):]
+            if os.path.exists(path):
+                os.unlink(path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(path)
+        else:
+            raise ValueError(f"Unsupported audio socket address: {self.address}")
+        server.listen(1)
+        # Wake up regularly so stop() is noticed
+        server.settimeout(STOP_POLL_INTERVAL)
+        logger.info(f"Listening for audio on {self.address}")
+        return server
+
+    def _read_socket(self, connection: socket.socket, callback: BlockCallback, blocksize: int):
+        """Deliver whole blocks until the client disconnects."""
+        block = bytearray(2 * blocksize)
+        view = memoryview(block)
+        filled = 0
+        while not self._stop_event.is_set():
+            try:
+                received = connection.recv_into(view[filled:])
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if not received:
+                break
+            filled += received
+            if filled == len(block):
+                callback(pcm16_to_float(block))
+                filled = 0
+        if filled >= 2:
+            callback(pcm16_to_float(block[:filled - filled % 2]))
+
+    def _read_pipe(self, stream, callback: BlockCallback, blocksize: int):
+        """Deliver whole blocks until the writer closes the pipe."""
+        bytes_per_block = 2 * blocksize
+        while not self._stop_event.is_set():
+            data = stream.read(bytes_per_block)
+            if len(data) < 2:
+                return
+            callback(pcm16_to_float(data[:len(data) - len(data) % 2]))
+
+    def _close(self):
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            if self.address.startswith("unix://"):
+                path = self.address[len("unix://"):]
+                if os.path.exists(path):
+                    os.unlink(path)
+            self._server = None
+
+def pcm16_to_float(data) -> np.ndarray:
+    """Convert 16-bit little-endian PCM bytes to float32 samples."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+def create_audio_source(spec: str = "device", sample_rate: int = 16000, channels: int = 1,
+                        device=None, realtime: bool = True) -> AudioSource:
+    """
+    Create an audio source from a spec string.
+
+    Args:
+        spec: "device", "file:<path>", "tcp://host:port", "unix://<path>" or "pipe:<path>|-"
+        sample_rate: Capture rate for the device, incoming rate for sockets and pipes
+        channels: Device channels
+        device: Device index or name
+        realtime: Whether files are replayed at real-time speed
+
+    Returns:
+        AudioSource instance
+    """
+    if not spec or spec == "device":
+        return DeviceSource(device=device, sample_rate=sample_rate, channels=channels)
+    if spec.startswith("file:"):
+        return FileSource(spec[len("file:"):], realtime=realtime)
+    if spec.startswith(("tcp://", "unix://", "pipe:")):
+        return SocketSource(spec, sample_rate=sample_rate)
+    raise ValueError(f"Unknown audio source: {spec}")
@@ -0,0 +1,326 @@
+"""
+Module for acoustic echo cancellation of the avatar's own speech in the microphone signal.
+"""
+
+import logging
+import threading
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, Optional
+
+from audio.ring_buffer import RingBuffer
+from audio.resampler import PolyphaseResampler
+
+logger = logging.getLogger(__name__)
+
+# Longest reference kept waiting for the microphone (seconds)
+MAX_PENDING_REFERENCE = 30.0
+
+def estimate_delay(mic: np.ndarray, reference: np.ndarray, max_delay: int):
+    """
+    Estimate how many samples the microphone lags the reference with GCC-PHAT.
+
+    Args:
+        mic: Microphone samples
+        reference: Reference samples covering the same time span
+        max_delay: Largest delay (in samples) to search
+
+    Returns:
+        Tuple of (delay in samples, peak-to-average confidence)
+    """
+    n = len(mic)
+    fft_size = 1 << int(np.ceil(np.log2(2 * n)))
+    spectrum = np.fft.rfft(mic, fft_size) * np.conj(np.fft.rfft(reference, fft_size))
+    spectrum /= np.abs(spectrum) + 1e-12
+    correlation = np.fft.irfft(spectrum, fft_size)[:max_delay + 1]
+    delay = int(np.argmax(correlation))
+    confidence = float(correlation[delay] / (np.mean(np.abs(correlation)) + 1e-12))
+    return delay, confidence
+
+class EchoCanceller:
+    def __init__(self, sample_rate: int = 16000, block_size: int = 256, filter_ms: float = 256.0,
+                 max_delay_ms: float = 500.0, step_size: float = 0.5, delay_window_s: float = 2.0):
+        """
+        Initialize the echo canceller.
+
+        A partitioned-block frequency-domain NLMS filter (overlap-save, all
+        partitions updated with one batched FFT) models the loudspeaker-to-
+        microphone path and subtracts the predicted echo. The bulk delay between
+        the reference and the microphone (output buffering, capture queue,
+        acoustics) is estimated with GCC-PHAT so the filter only has to cover
+        the room's reverberation tail.
+
+        Args:
+            sample_rate: Sample rate of the microphone signal
+            block_size: Samples per filter block (FFT size is twice this)
+            filter_ms: Length of the echo tail the filter models
+            max_delay_ms: Largest bulk delay searched between reference and microphone
+            step_size: NLMS step size (0..1)
+            delay_window_s: Audio used per delay estimate
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.num_partitions = max(1, int(np.ceil(filter_ms / 1000.0 * sample_rate / block_size)))
+        self.max_delay = int(max_delay_ms / 1000.0 * sample_rate)
+        self.step_size = step_size
+        self.delay_window = int(delay_window_s * sample_rate)
+
+        self._lock = threading.Lock()
+        self._pending_reference = deque()
+        self._pending_samples = 0
+        self._reference_resamplers = {}  # Playback rate -> stateful resampler
+        bins = block_size + 1
+        self._far_line = np.zeros(self.max_delay + 2 * block_size, dtype=np.float32)
+        self._X = np.zeros((self.num_partitions, bins), dtype=np.complex64)
+        self._W = np.zeros((self.num_partitions, bins), dtype=np.complex64)
+        self._far_power = np.zeros(bins, dtype=np.float32)
+        self._far_input = np.zeros(2 * block_size, dtype=np.float32)
+        self._error_input = np.zeros(2 * block_size, dtype=np.float32)
+
+        # Input/output FIFOs so any block length can be processed
+        self._in = np.zeros(0, dtype=np.float32)
+        self._out = np.zeros(0, dtype=np.float32)
+
+        # Delay estimation history (undelayed reference and microphone)
+        self._mic_history = RingBuffer(self.delay_window)
+        self._ref_history = RingBuffer(self.delay_window)
+        self._mic_window = np.zeros(self.delay_window, dtype=np.float32)
+        self._ref_window = np.zeros(self.delay_window, dtype=np.float32)
+        self.delay = 0
+        self._samples_since_estimate = 0
+
+        self.reset()
+
+    def reset(self):
+        """Forget the echo path, the delay and any pending reference."""
+        with self._lock:
+            self._pending_reference.clear()
+            self._pending_samples = 0
+        self._far_line.fill(0.0)
+        self._X.fill(0.0)
+        self._W.fill(0.0)
+        self._far_power.fill(0.0)
+        self._in = np.zeros(0, dtype=np.float32)
+        self._out = np.zeros(0, dtype=np.float32)
+        self._mic_history.clear()
+        self._ref_history.clear()
+        self.delay = 0
+        self._samples_since_estimate = 0
+        self._active_samples = 0
+        self._converged = False
+        self._double_talk_blocks = 0
+        self._double_talk_run = 0
+        self._divergent_blocks = 0
+        self._erle_db = 0.0
+        self._mic_floor = 1e-6
+        self.metrics = {
+            "blocks": 0,
+            "active_blocks": 0,
+            "double_talk_blocks": 0,
+            "delay_updates": 0,
+            "filter_resets": 0,
+            "processing_ms_total": 0.0,
+            "audio_seconds": 0.0
+        }
+
+    def push_reference(self, audio: np.ndarray, sample_rate: Optional[int] = None):
+        """
+        Queue loudspeaker audio as it is sent to the output device.
+
+        Thread-safe; called from the playback path.
+
+        Args:
+            audio: Mono float32 audio being played
+            sample_rate: Sample rate of the audio (default: the microphone rate)
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if sample_rate and sample_rate != self.sample_rate:
+            resampler = self._reference_resamplers.get(sample_rate)
+            if resampler is None:
+                resampler = PolyphaseResampler(sample_rate, self.sample_rate)
+                self._reference_resamplers[sample_rate] = resampler
+            audio = resampler.process(audio).copy()
+        with self._lock:
+            self._pending_reference.append(audio)
+            self._pending_samples += len(audio)
+            # Drop the oldest reference if nobody is consuming it
+            while self._pending_samples > MAX_PENDING_REFERENCE * self.sample_rate:
+                self._pending_samples -= len(self._pending_reference.popleft())
+
+    def process(self, mic: np.ndarray) -> np.ndarray:
+        """
+        Remove the echo of the queued reference from a block of microphone audio.
+
+        Args:
+            mic: Mono float32 microphone audio of any length
+
+        Returns:
+            Echo-cancelled audio with the same length
+        """
+        start = time.perf_counter()
+        mic = np.asarray(mic, dtype=np.float32).reshape(-1)
+        self._in = np.concatenate([self._in, mic]) if len(self._in) else mic
+        processed = []
+        offset = 0
+        while offset + self.block_size <= len(self._in):
+            processed.append(self._process_block(self._in[offset:offset + self.block_size]))
+            offset += self.block_size
+        self._in = self._in[offset:].copy()
+        if processed:
+            self._out = np.concatenate([self._out] + processed)
+
+        # Block lengths that are not a multiple of block_size add a fixed delay once
+        if len(self._out) < len(mic):
+            self._out = np.concatenate([np.zeros(len(mic) - len(self._out), dtype=np.float32), self._out])
+        output = self._out[:len(mic)]
+        self._out = self._out[len(mic):]
+
+        self.metrics["processing_ms_total"] += (time.perf_counter() - start) * 1000
+        self.metrics["audio_seconds"] += len(mic) / self.sample_rate
+        return output
+
+    @property
+    def erle_db(self) -> float:
+        """Smoothed echo return loss enhancement over blocks with echo only."""
+        return self._erle_db
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Get echo canceller statistics."""
+        metrics = dict(self.metrics)
+        metrics["erle_db"] = self._erle_db
+        metrics["delay_ms"] = 1000.0 * self.delay / self.sample_rate
+        metrics["converged"] = self._converged
+        seconds = metrics["audio_seconds"]
+        metrics["cpu_ms_per_second"] = metrics["processing_ms_total"] / seconds if seconds else 0.0
+        return metrics
+
+    def _next_reference(self, n: int) -> np.ndarray:
+        """Take the next n reference samples (zeros once the playback is over)."""
+        block = np.zeros(n, dtype=np.float32)
+        filled = 0
+        with self._lock:
+            while filled < n and self._pending_reference:
+                head = self._pending_reference[0]
+                taken = min(n - filled, len(head))
+                block[filled:filled + taken] = head[:taken]
+                filled += taken
+                if taken == len(head):
+                    self._pending_reference.popleft()
+                else:
+                    self._pending_reference[0] = head[taken:]
+            self._pending_samples -= filled
+        return block
+
+    def _process_block(self, mic: np.ndarray) -> np.ndarray:
+        B = self.block_size
+        self.metrics["blocks"] += 1
+        reference = self._next_reference(B)
+
+        # Delay line: the filter sees the reference `delay` samples late
+        line = self._far_line
+        line[:-B] = line[B:]
+        line[-B:] = reference
+        if np.any(reference):
+            self._active_samples = len(line) + self.num_partitions * B
+
+        if self._active_samples <= 0:
+            return mic
+        self._active_samples -= B
+        self.metrics["active_blocks"] += 1
+
+        self._mic_history.write(mic)
+        self._ref_history.write(reference)
+        self._samples_since_estimate += B
+        if self._samples_since_estimate >= self.delay_window // 4 and len(self._ref_history) == self.delay_window:
+            self._samples_since_estimate = 0
+            self._update_delay()
+
+        end = len(line) - self.delay
+        far = line[end - B:end]
+
+        # Overlap-save: previous and current far block
+        self._far_input[:B] = self._far_input[B:]
+        self._far_input[B:] = far
+        self._X[1:] = self._X[:-1]
+        self._X[0] = np.fft.rfft(self._far_input)
+
+        echo = np.fft.irfft(np.sum(self._W * self._X, axis=0))[B:]
+        error = (mic - echo).astype(np.float32)
+
+        mic_power = float(np.dot(mic, mic)) / B + 1e-10
+        error_power = float(np.dot(error, error)) / B + 1e-10
+        far_power = float(np.dot(far, far)) / B
+        self._far_power = 0.9 * self._far_power + 0.1 * np.abs(self._X[0]) ** 2
+
+        # Microphone noise floor: follows drops at once, rises slowly
+        self._mic_floor = min(mic_power, self._mic_floor * 1.01)
+
+        # Blocks at the noise floor say nothing about the echo path or double talk
+        if far_power > 1e-7 and mic_power > 4 * self._mic_floor:
+            self._update_state(mic_power, error_power)
+            if not self._double_talk_blocks:
+                self._adapt(error)
+
+        # Never add energy: a diverged filter must not make things worse than no AEC
+        return error if error_power <= mic_power * 1.1 else mic
+
+    def _update_state(self, mic_power: float, error_power: float):
+        """Track convergence, double talk and divergence from block powers."""
+        block_erle = 10.0 * float(np.log10(mic_power / error_power))
+
+        if self._converged and error_power > 0.5 * mic_power:
+            # The residual is a large part of the microphone signal: the user is talking too
+            self._double_talk_blocks = 10
+            self._double_talk_run += 1
+            self.metrics["double_talk_blocks"] += 1
+            # Long "double talk" is more likely a changed echo path: adapt again
+            if self._double_talk_run * self.block_size > 2 * self.sample_rate:
+                self._converged = False
+                self._double_talk_run = 0
+        else:
+            self._double_talk_run = 0
+            if self._double_talk_blocks:
+                self._double_talk_blocks -= 1
+            else:
+                self._erle_db = 0.95 * self._erle_db + 0.05 * block_erle
+                self._converged = bool(self._erle_db > 6.0)
+
+        if error_power > 4 * mic_power:
+            self._divergent_blocks += 1
+            if self._divergent_blocks > 20:
+                self._W.fill(0.0)
+                self._converged = False
+                self._divergent_blocks = 0
+                self.metrics["filter_resets"] += 1
+                logger.warning("Echo canceller diverged, filter reset")
+        else:
+            self._divergent_blocks = 0
+
+    def _adapt(self, error: np.ndarray):
+        """Constrained NLMS update of all partitions at once."""
+        B = self.block_size
+        self._error_input[B:] = error
+        E = np.fft.rfft(self._error_input)
+        gain = self.step_size * E / (0.5 * self.num_partitions * self._far_power + 1e-6)
+        gradient = np.fft.irfft(np.conj(self._X) * gain[np.newaxis, :], axis=1)
+        gradient[:, B:] = 0.0
+        self._W += np.fft.rfft(gradient, axis=1).astype(np.complex64)
+
+    def _update_delay(self):
+        """Re-estimate the bulk delay from the recent microphone and reference history."""
+        self._mic_history.read(out=self._mic_window)
+        self._ref_history.read(out=self._ref_window)
+        if not np.any(self._ref_window):
+            return
+        delay, confidence = estimate_delay(self._mic_window, self._ref_window, self.max_delay)
+        if confidence < 8.0:
+            return
+        # Leave a block of margin so early reflections stay inside the filter
+        delay = max(0, delay - self.block_size)
+        if abs(delay - self.delay) > self.block_size // 2:
+            logger.info(f"Echo delay {1000.0 * delay / self.sample_rate:.0f}ms (confidence {confidence:.1f})")
+            self.delay = delay
+            self._W.fill(0.0)
+            self._converged = False
+            self.metrics["delay_updates"] += 1
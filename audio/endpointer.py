@@ -0,0 +1,284 @@
+"""
+Module for deciding when a recorded utterance starts and ends from per-block VAD decisions.
+"""
+
+import logging
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of recent end-of-turn decisions kept for metrics
+DECISION_HISTORY = 100
+
+class Endpointer:
+    START = "start"
+    END = "end"
+    mode = "fixed"
+
+    def __init__(self, sample_rate: int, silence_timeout: float):
+        """
+        Initialize the endpointer.
+
+        Time is counted in samples of the processed stream rather than wall-clock
+        time, so the same decisions are made live and when replaying a file
+        faster than real time.
+
+        Args:
+            sample_rate: Sample rate of the audio blocks
+            silence_timeout: Seconds of silence after speech before the utterance ends
+        """
+        self.sample_rate = sample_rate
+        self.silence_timeout = silence_timeout
+        self.hangovers = deque(maxlen=DECISION_HISTORY)
+        self.decisions = 0
+        self.reset()
+
+    def reset(self):
+        """Drop any utterance in progress."""
+        self.is_active = False
+        self.duration_samples = 0
+        self.silence_samples = 0
+
+    @property
+    def duration(self) -> float:
+        """Seconds since the current (or last) utterance started."""
+        return self.duration_samples / self.sample_rate
+
+    def start(self):
+        """Start an utterance (e.g. on a user interruption)."""
+        self.is_active = True
+        self.duration_samples = 0
+        self.silence_samples = 0
+
+    def update(self, speech_detected: bool, num_samples: int,
+               probability: Optional[float] = None) -> Optional[str]:
+        """
+        Feed the VAD decision for one block of audio.
+
+        Args:
+            speech_detected: Whether the block contains speech
+            num_samples: Number of samples in the block
+            probability: Speech probability of the block, if the VAD provides one
+
+        Returns:
+            Endpointer.START when an utterance begins with this block,
+            Endpointer.END when it ends after this block, None otherwise
+        """
+        if not self.is_active:
+            if not speech_detected:
+                return None
+            self.start()
+            self.duration_samples = num_samples
+            return self.START
+
+        self.duration_samples += num_samples
+        if speech_detected:
+            if self.silence_samples:
+                self._pause_ended(self.silence_samples)
+            self.silence_samples = 0
+            return None
+
+        if not self.silence_samples:
+            self._pause_started()
+        self.silence_samples += num_samples
+        self._observe_silence(probability)
+        if self.silence_samples > self._hangover_samples():
+            self.is_active = False
+            self.decisions += 1
+            self.hangovers.append(self.silence_samples / self.sample_rate)
+            self._utterance_ended()
+            return self.END
+        return None
+
+    def get_metrics(self) -> Dict:
+        """Get the end-of-turn decisions made so far."""
+        hangovers = list(self.hangovers)
+        return {
+            "mode": self.mode,
+            "decisions": self.decisions,
+            "hangover_last": hangovers[-1] if hangovers else None,
+            "hangover_median": float(np.median(hangovers)) if hangovers else None
+        }
+
+    def _hangover_samples(self) -> float:
+        """Silence (in samples) after which the current utterance ends."""
+        return self.silence_timeout * self.sample_rate
+
+    def _pause_started(self):
+        """Called on the first silent block after speech."""
+        pass
+
+    def _pause_ended(self, pause_samples: int):
+        """Called when speech resumes before the hang-over expired."""
+        pass
+
+    def _observe_silence(self, probability: Optional[float]):
+        """Called for every silent block of a pause."""
+        pass
+
+    def _utterance_ended(self):
+        """Called after an end-of-turn decision."""
+        pass
+
+class AdaptiveEndpointer(Endpointer):
+    mode = "adaptive"
+
+    def __init__(self, sample_rate: int, silence_timeout: float, min_hangover: float = 0.3,
+                 max_hangover: Optional[float] = None, prior_pause: float = 0.45,
+                 safety_margin: float = 0.15,
+                 completeness_hook: Optional[Callable[[], Optional[float]]] = None):
+        """
+        Initialize the adaptive endpointer.
+
+        Instead of always waiting `silence_timeout`, the hang-over is derived from
+        the pauses this speaker makes inside a turn (speech that resumed after
+        silence): the utterance ends once the current pause is longer than the
+        90th percentile of those pauses plus a margin. The estimate is then scaled:
+
+        - Speaking rate: a turn spoken faster than the running average gets a
+          shorter hang-over, a slower one a longer hang-over.
+        - VAD probability: a pause where the probability hovers above the noise
+          (breathing, hesitation) waits longer.
+        - Completeness: an optional hook returning 0..1 for "the text so far
+          looks like a complete question" shortens (1) or extends (0) the wait.
+
+        Args:
+            sample_rate: Sample rate of the audio blocks
+            silence_timeout: Fixed timeout, used as the upper bound by default
+            min_hangover: Shortest hang-over in seconds
+            max_hangover: Longest hang-over in seconds (default: silence_timeout)
+            prior_pause: Assumed 90th percentile of intra-turn pauses before any is observed
+            safety_margin: Seconds added to the pause estimate
+            completeness_hook: Optional callable returning a completeness score in
+                [0, 1], or None when no text is available yet
+        """
+        self.min_hangover = min_hangover
+        self.max_hangover = max_hangover if max_hangover is not None else silence_timeout
+        self.prior_pause = prior_pause
+        self.safety_margin = safety_margin
+        self.completeness_hook = completeness_hook
+
+        self.pauses = deque(maxlen=50)
+        self.speaking_rate_avg = None
+        self.completeness_calls = 0
+        self.extended_decisions = 0
+        self.shortened_decisions = 0
+        super().__init__(sample_rate, silence_timeout)
+
+    def reset(self):
+        """Drop any utterance in progress (learned pause statistics are kept)."""
+        super().reset()
+        self._bursts = 0
+        self._pause_hangover = self.max_hangover
+        self._pause_probability_sum = 0.0
+        self._pause_blocks = 0
+
+    def start(self):
+        super().start()
+        self._bursts = 1
+
+    @property
+    def pause_estimate(self) -> float:
+        """90th percentile of intra-turn pauses, blended with the prior while few are known."""
+        prior_weight = 3
+        if not self.pauses:
+            return self.prior_pause
+        observed = float(np.percentile(list(self.pauses), 90))
+        n = len(self.pauses)
+        return (n * observed + prior_weight * self.prior_pause) / (n + prior_weight)
+
+    @property
+    def speaking_rate(self) -> Optional[float]:
+        """Speech bursts per second in the current utterance."""
+        seconds = self.duration
+        return self._bursts / seconds if seconds >= 1.0 else None
+
+    def get_metrics(self) -> Dict:
+        metrics = super().get_metrics()
+        metrics.update({
+            "pauses_observed": len(self.pauses),
+            "pause_estimate": self.pause_estimate,
+            "speaking_rate_avg": self.speaking_rate_avg,
+            "completeness_calls": self.completeness_calls,
+            "shortened_decisions": self.shortened_decisions,
+            "extended_decisions": self.extended_decisions
+        })
+        return metrics
+
+    def _hangover_samples(self) -> float:
+        hangover = self._pause_hangover
+        # A probability that stays above the noise during the pause suggests a hesitation
+        if self._pause_blocks and self._pause_probability_sum / self._pause_blocks > 0.15:
+            hangover *= 1.5
+        return min(max(hangover, self.min_hangover), self.max_hangover) * self.sample_rate
+
+    def _pause_started(self):
+        hangover = self.pause_estimate + self.safety_margin
+
+        rate = self.speaking_rate
+        if rate and self.speaking_rate_avg:
+            hangover *= float(np.clip(self.speaking_rate_avg / rate, 0.8, 1.25))
+
+        score = self._completeness_score()
+        if score is not None:
+            hangover *= 1.5 - score
+
+        self._pause_hangover = hangover
+        self._pause_probability_sum = 0.0
+        self._pause_blocks = 0
+
+    def _pause_ended(self, pause_samples: int):
+        pause = pause_samples / self.sample_rate
+        if pause >= 0.1:
+            self.pauses.append(pause)
+        self._bursts += 1
+
+    def _observe_silence(self, probability: Optional[float]):
+        if probability is not None:
+            self._pause_probability_sum += probability
+            self._pause_blocks += 1
+
+    def _utterance_ended(self):
+        hangover = self.hangovers[-1]
+        if hangover < self.silence_timeout:
+            self.shortened_decisions += 1
+        elif hangover > self.silence_timeout:
+            self.extended_decisions += 1
+
+        rate = self.speaking_rate
+        if rate:
+            self.speaking_rate_avg = rate if self.speaking_rate_avg is None else 0.8 * self.speaking_rate_avg + 0.2 * rate
+        logger.debug(f"End of turn after {hangover:.2f}s of silence (pause estimate {self.pause_estimate:.2f}s)")
+
+    def _completeness_score(self) -> Optional[float]:
+        if not self.completeness_hook:
+            return None
+        try:
+            self.completeness_calls += 1
+            score = self.completeness_hook()
+        except Exception as e:
+            logger.error(f"Error in end-of-turn completeness hook: {e}")
+            return None
+        return None if score is None else float(np.clip(score, 0.0, 1.0))
+
+def create_endpointer(mode: str, sample_rate: int, silence_timeout: float, **kwargs) -> Endpointer:
+    """
+    Create an endpointer by name.
+
+    Args:
+        mode: "fixed" (always wait silence_timeout) or "adaptive"
+        sample_rate: Sample rate of the audio blocks
+        silence_timeout: Seconds of silence that end an utterance (upper bound in adaptive mode)
+        **kwargs: Options passed to AdaptiveEndpointer
+
+    Returns:
+        Endpointer instance
+    """
+    mode = (mode or "fixed").lower()
+    if mode == "adaptive":
+        return AdaptiveEndpointer(sample_rate, silence_timeout, **kwargs)
+    if mode != "fixed":
+        logger.warning(f"Unknown endpointer mode '{mode}', using fixed")
+    return Endpointer(sample_rate, silence_timeout)
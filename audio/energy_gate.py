@@ -0,0 +1,133 @@
+"""
+Module for a cheap energy/zero-crossing pre-gate in front of the neural VAD.
+"""
+
+import logging
+import numpy as np
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Level reported for digital silence
+MIN_LEVEL_DB = -100.0
+
+def frame_features(frame: np.ndarray) -> Tuple[float, float]:
+    """
+    Compute the RMS level (dBFS) and zero-crossing rate of a frame.
+
+    Args:
+        frame: Mono float32 audio frame
+
+    Returns:
+        Tuple of (level_db, zero_crossing_rate)
+    """
+    energy = float(np.dot(frame, frame)) / len(frame)
+    level_db = 10.0 * np.log10(energy) if energy > 1e-10 else MIN_LEVEL_DB
+    signs = np.signbit(frame)
+    zcr = np.count_nonzero(signs[1:] != signs[:-1]) / (len(frame) - 1)
+    return level_db, zcr
+
+class EnergyGate:
+    def __init__(self, margin_db: float = 6.0, hangover_frames: int = 10,
+                 warmup_frames: int = 15, zcr_threshold: float = 0.3,
+                 initial_floor_db: float = -60.0):
+        """
+        Initialize the energy pre-gate.
+
+        Frames whose level stays clearly below the adaptive noise floor skip the
+        neural model. The model always runs while speech is active, during a
+        hang-over after any frame the model scored as speech-like, and during a
+        short warm-up while the floor is learned.
+
+        Args:
+            margin_db: Level above the noise floor at which the model must run
+            hangover_frames: Frames the model keeps running after a speech-like frame
+            warmup_frames: Frames always scored at start-up to learn the noise floor
+            zcr_threshold: Zero-crossing rate above which quieter frames are still
+                scored (unvoiced consonants such as "s" and "f" are low-energy but noisy)
+            initial_floor_db: Noise floor estimate before any frame has been seen
+        """
+        self.margin_db = margin_db
+        self.hangover_frames = hangover_frames
+        self.warmup_frames = warmup_frames
+        self.zcr_threshold = zcr_threshold
+        self.initial_floor_db = initial_floor_db
+        self.reset()
+
+    def reset(self):
+        """Forget the noise floor and counters."""
+        self.noise_floor_db = self.initial_floor_db
+        self._frames_seen = 0
+        self._hangover = 0
+        self._last_level_db = MIN_LEVEL_DB
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        """Fraction of frames that bypassed the neural model."""
+        return self.frames_skipped / self.frames_total if self.frames_total else 0.0
+
+    def should_run(self, frame: np.ndarray, in_speech: bool) -> bool:
+        """
+        Decide whether the neural model has to score this frame.
+
+        Args:
+            frame: Mono float32 audio frame
+            in_speech: Whether the VAD is currently inside a speech segment
+
+        Returns:
+            True if the model must run, False if the frame can be treated as silence
+        """
+        level_db, zcr = frame_features(frame)
+        self._last_level_db = level_db
+        self.frames_total += 1
+        self._frames_seen += 1
+
+        threshold_db = self.noise_floor_db + self.margin_db
+        run = (
+            in_speech
+            or self._hangover > 0
+            or self._frames_seen <= self.warmup_frames
+            or level_db > threshold_db
+            or (zcr > self.zcr_threshold and level_db > threshold_db - self.margin_db / 2)
+        )
+        if self._hangover > 0:
+            self._hangover -= 1
+        if not run:
+            self.frames_skipped += 1
+            self._update_floor(level_db)
+        return run
+
+    def observe(self, probability: float, neg_threshold: float):
+        """
+        Feed back the model's probability for a frame that was scored.
+
+        Args:
+            probability: Speech probability returned by the model
+            neg_threshold: Probability below which the VAD treats a frame as silence
+        """
+        if probability >= neg_threshold:
+            # Keep the model running around possible transitions
+            self._hangover = self.hangover_frames
+        else:
+            self._update_floor(self._last_level_db)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Get gate counters and the current noise floor."""
+        return {
+            "gate_frames": self.frames_total,
+            "gate_skipped": self.frames_skipped,
+            "skip_ratio": self.skip_ratio,
+            "noise_floor_db": self.noise_floor_db
+        }
+
+    def _update_floor(self, level_db: float):
+        """Track the noise floor: fast when the level drops, slow when it rises."""
+        if self._frames_seen == 1:
+            self.noise_floor_db = level_db
+        elif level_db < self.noise_floor_db:
+            self.noise_floor_db += 0.1 * (level_db - self.noise_floor_db)
+        else:
+            self.noise_floor_db += 0.01 * (level_db - self.noise_floor_db)
+        self.noise_floor_db = max(self.noise_floor_db, MIN_LEVEL_DB)
@@ -0,0 +1,180 @@
+"""
+Module for hedged speech recognition across two backends.
+
+The primary recognizer gets every request. If it has not answered after a
+delay taken from its own recent latency (e.g. its 95th percentile), the same
+audio is sent to a secondary backend and whichever answers first wins, so
+one slow request no longer stalls the turn. Hedging only the slowest few
+percent of requests keeps the extra load on the secondary small.
+"""
+
+import time
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+from typing import Dict, Optional
+
+from audio.stt_backends import STTBackend
+
+logger = logging.getLogger(__name__)
+
+METRICS_LOG_INTERVAL = 20  # Requests between hedging summary log lines
+MIN_HISTORY = 10  # Primary latencies needed before the percentile is trusted
+
+class HedgedSTTBackend(STTBackend):
+    name = "hedged"
+
+    def __init__(self, primary: STTBackend, secondary: STTBackend, percentile: float = 95.0,
+                 initial_delay: float = 1.0, min_delay: float = 0.2, timeout: Optional[float] = 10.0,
+                 history: int = 200, max_workers: int = 8):
+        """
+        Send requests to the primary backend and hedge the slow ones on the secondary.
+
+        Args:
+            primary: Backend that answers normally (e.g. Google)
+            secondary: Backend the slow requests are also sent to (e.g. local Whisper)
+            percentile: Percentile of the primary's recent latency after which a request is hedged
+            initial_delay: Hedge delay in seconds until enough latencies were observed
+            min_delay: Lower bound of the hedge delay, so a fast period does not hedge everything
+            timeout: Seconds after which a request fails if neither backend answered (None waits)
+            history: Number of recent primary latencies the percentile is computed from
+            max_workers: Concurrent requests (losing requests keep a worker until they return)
+        """
+        super().__init__(primary.language)
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = Lock()
+        self._primary_latencies = deque(maxlen=history)  # Every primary answer, including the late ones
+        self._served_latencies = deque(maxlen=history)  # What callers actually waited
+        self.metrics = {"requests": 0, "hedged": 0, "secondary_wins": 0, "timeouts": 0, "failures": 0}
+
+    @property
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before the request is hedged."""
+        with self._lock:
+            latencies = list(self._primary_latencies)
+        if len(latencies) < MIN_HISTORY:
+            return self.initial_delay
+        return max(self.min_delay, float(np.percentile(latencies, self.percentile)))
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> Optional[str]:
+        start = time.perf_counter()
+        delay = self.hedge_delay
+        primary = self._submit(self.primary, audio, sample_rate, start, record=True)
+        with self._lock:
+            self.metrics["requests"] += 1
+
+        done, _ = wait([primary], timeout=delay)
+        if done and primary.exception() is None:
+            return self._served(primary, start, hedged=False)
+
+        # The primary is slow (or already failed): race the secondary against it
+        if done:
+            logger.warning(f"{self.primary.name} recognition failed ({primary.exception()}), "
+                           f"asking {self.secondary.name}")
+        else:
+            logger.info(f"{self.primary.name} recognition slower than {delay * 1000:.0f}ms, "
+                        f"hedging on {self.secondary.name}")
+        secondary = self._submit(self.secondary, audio, sample_rate, start, record=False)
+        pending = {primary, secondary}
+        remaining = None if self.timeout is None else self.timeout - (time.perf_counter() - start)
+        while pending:
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    return self._served(future, start, hedged=True, secondary_won=future is secondary)
+            if remaining is not None:
+                remaining = self.timeout - (time.perf_counter() - start)
+
+        with self._lock:
+            self.metrics["hedged"] += 1
+            if pending:
+                self.metrics["timeouts"] += 1
+            else:
+                self.metrics["failures"] += 1
+        for future in pending:
+            future.cancel()
+        if pending:
+            raise TimeoutError(f"No recognition result after {self.timeout:.1f}s")
+        raise primary.exception()
+
+    def _submit(self, backend: STTBackend, audio: np.ndarray, sample_rate: int, start: float, record: bool):
+        future = self.executor.submit(backend.transcribe, audio, sample_rate)
+        if record:
+            # The primary's latency is kept even when it loses, so the percentile
+            # and the tail comparison see its real distribution
+            def record_latency(f):
+                if not f.cancelled() and f.exception() is None:
+                    with self._lock:
+                        self._primary_latencies.append(time.perf_counter() - start)
+            future.add_done_callback(record_latency)
+        return future
+
+    def _served(self, future, start: float, hedged: bool, secondary_won: bool = False) -> Optional[str]:
+        """Account for the answer handed to the caller."""
+        with self._lock:
+            self._served_latencies.append(time.perf_counter() - start)
+            if hedged:
+                self.metrics["hedged"] += 1
+            if secondary_won:
+                self.metrics["secondary_wins"] += 1
+            log_now = self.metrics["requests"] % METRICS_LOG_INTERVAL == 0
+        if secondary_won:
+            logger.info(f"{self.secondary.name} answered first")
+        if log_now:
+            self._log_metrics()
+        return future.result()
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Get hedging counters.
+
+        Returns:
+            Dictionary with the request counts, the hedge rate, the current hedge delay and
+            the p50/p95/p99 latency of the primary alone versus what callers waited
+        """
+        delay = self.hedge_delay
+        with self._lock:
+            metrics = dict(self.metrics)
+            primary = list(self._primary_latencies)
+            served = list(self._served_latencies)
+        requests = metrics["requests"]
+        metrics["hedge_rate"] = metrics["hedged"] / requests if requests else 0.0
+        metrics["hedge_delay_ms"] = delay * 1000
+        for name, values in (("primary", primary), ("served", served)):
+            for p in (50, 95, 99):
+                metrics[f"{name}_p{p}_ms"] = float(np.percentile(values, p)) * 1000 if values else None
+        if primary and served:
+            metrics["p99_improvement_ms"] = metrics["primary_p99_ms"] - metrics["served_p99_ms"]
+        else:
+            metrics["p99_improvement_ms"] = None
+        return metrics
+
+    def _log_metrics(self):
+        metrics = self.get_metrics()
+        if metrics["p99_improvement_ms"] is None:
+            return
+        logger.info(f"STT hedging: {metrics['hedge_rate']:.0%} of {metrics['requests']} requests hedged "
+                    f"(delay {metrics['hedge_delay_ms']:.0f}ms, {metrics['secondary_wins']} won by "
+                    f"{self.secondary.name}), p99 {metrics['primary_p99_ms']:.0f}ms -> "
+                    f"{metrics['served_p99_ms']:.0f}ms")
+
+    def warmup(self):
+        self.primary.warmup()
+        self.secondary.warmup()
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.primary.close()
+        self.secondary.close()
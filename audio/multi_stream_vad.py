@@ -0,0 +1,340 @@
+"""
+Module for batched voice activity detection over several audio streams with one Silero model.
+"""
+
+import logging
+import threading
+import time
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from audio.streaming_vad import SpeechStateTracker, VADEvent
+from audio.vad_backends import SILERO_CONTEXT_SIZES
+
+logger = logging.getLogger(__name__)
+
+# Size of the recurrent state Silero keeps per stream
+SILERO_STATE_SIZE = 128
+
+class VADStream:
+    def __init__(self, service: "MultiStreamVAD", stream_id: str, slot: int,
+                 threshold: float, neg_threshold: Optional[float]):
+        """
+        One audio source registered with a MultiStreamVAD.
+
+        Exposes the same process()/is_speech/reset() interface as StreamingVAD, so an
+        AudioRecorder can use it in place of a model of its own.
+
+        Args:
+            service: The MultiStreamVAD scoring this stream
+            stream_id: Name of the stream (e.g. the kiosk or microphone)
+            slot: Row of the service's batched state arrays owned by this stream
+            threshold: Speech probability threshold for onsets
+            neg_threshold: Speech probability threshold for offsets
+        """
+        self.service = service
+        self.stream_id = stream_id
+        self.slot = slot
+        self.sample_rate = service.sample_rate
+        self.frame_size = service.frame_size
+        self.tracker = SpeechStateTracker(threshold=threshold, neg_threshold=neg_threshold)
+        self.position = 0
+        self.last_probability = 0.0
+
+        # Frames waiting for the next batch, and the partial frame still being filled
+        self._frames = deque()
+        self._pending = np.zeros(self.frame_size, dtype=np.float32)
+        self._pending_len = 0
+        self._first_pending_time = None
+        self._submitted = 0
+        self._scored = 0
+        self._events = []
+
+    @property
+    def is_speech(self) -> bool:
+        """Whether the stream is currently inside a speech segment."""
+        return self.tracker.is_speech
+
+    def process(self, audio_data: np.ndarray) -> List[VADEvent]:
+        """
+        Submit audio of any length and return the events detected in it.
+
+        Blocks until the service has scored every complete frame of this call.
+
+        Args:
+            audio_data: Mono float32 audio
+
+        Returns:
+            List of VADEvent objects in stream order
+        """
+        return self.service._process_stream(self, audio_data)
+
+    def reset(self):
+        """Reset this stream's model state, pending samples and speech tracker."""
+        self.service.reset_stream(self.stream_id)
+
+class MultiStreamVAD:
+    def __init__(self, backend, max_streams: int = 8, threshold: float = 0.5,
+                 neg_threshold: Optional[float] = None, max_wait_ms: Optional[float] = None,
+                 on_event: Optional[Callable[[str, VADEvent], None]] = None):
+        """
+        Initialize the multi-stream VAD service.
+
+        Frames pushed by all registered streams are stacked into a single batched
+        Silero inference per tick, while each stream keeps its own recurrent state,
+        context and speech tracker.
+
+        Args:
+            backend: VADBackend that supports run_batch (the ONNX backend)
+            max_streams: Maximum number of streams served at the same time
+            threshold: Speech probability threshold for onsets
+            neg_threshold: Speech probability threshold for offsets
+            max_wait_ms: How long a pending frame waits for the other streams before a
+                partial batch is run (default: half a frame)
+            on_event: Optional callback called with (stream_id, event) for every event
+        """
+        self.backend = backend
+        self.sample_rate = backend.sample_rate
+        self.frame_size = backend.frame_size
+        self.context_size = SILERO_CONTEXT_SIZES[self.sample_rate]
+        self.max_streams = max_streams
+        self.threshold = threshold
+        self.neg_threshold = neg_threshold
+        frame_ms = 1000.0 * self.frame_size / self.sample_rate
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else frame_ms / 2) / 1000.0
+        self.on_event = on_event
+
+        self._cond = threading.Condition()
+        self._inference_lock = threading.Lock()
+        self._streams: Dict[str, VADStream] = {}
+        self._free_slots = list(range(max_streams - 1, -1, -1))
+
+        # Per-slot model state and the reusable batch input
+        self._contexts = np.zeros((max_streams, self.context_size), dtype=np.float32)
+        self._states = np.zeros((2, max_streams, SILERO_STATE_SIZE), dtype=np.float32)
+        self._batch_input = np.zeros((max_streams, self.context_size + self.frame_size), dtype=np.float32)
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.metrics = {
+            "batches": 0,
+            "frames": 0,
+            "max_batch_size": 0,
+            "inference_ms_total": 0.0
+        }
+
+    def add_stream(self, stream_id: str) -> VADStream:
+        """
+        Register a new audio source.
+
+        Args:
+            stream_id: Unique name of the stream
+
+        Returns:
+            VADStream handle to push audio through
+        """
+        with self._cond:
+            if stream_id in self._streams:
+                raise ValueError(f"VAD stream '{stream_id}' already exists")
+            if not self._free_slots:
+                raise RuntimeError(f"MultiStreamVAD is limited to {self.max_streams} streams")
+            slot = self._free_slots.pop()
+            self._contexts[slot] = 0.0
+            self._states[:, slot] = 0.0
+            stream = VADStream(self, stream_id, slot, self.threshold, self.neg_threshold)
+            self._streams[stream_id] = stream
+            logger.info(f"Added VAD stream '{stream_id}' ({len(self._streams)}/{self.max_streams})")
+            return stream
+
+    def remove_stream(self, stream_id: str):
+        """Unregister a stream and free its slot."""
+        with self._inference_lock, self._cond:
+            stream = self._streams.pop(stream_id, None)
+            if stream:
+                self._free_slots.append(stream.slot)
+                # Wake up a caller still waiting on this stream
+                stream._scored = stream._submitted
+                self._cond.notify_all()
+
+    def reset_stream(self, stream_id: str):
+        """Reset the model state and speech tracker of one stream."""
+        with self._inference_lock, self._cond:
+            stream = self._streams[stream_id]
+            self._contexts[stream.slot] = 0.0
+            self._states[:, stream.slot] = 0.0
+            stream.tracker.reset()
+            stream._frames.clear()
+            stream._pending_len = 0
+            stream._first_pending_time = None
+            stream._scored = stream._submitted
+            stream._events = []
+            stream.position = 0
+            stream.last_probability = 0.0
+            self._cond.notify_all()
+
+    def start(self):
+        """Start the background thread that runs one batch per tick."""
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info("Multi-stream VAD started")
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def process_pending(self) -> List[Tuple[str, VADEvent]]:
+        """
+        Score all queued frames in the calling thread (used when the service is not started).
+
+        Returns:
+            List of (stream_id, event) tuples
+        """
+        events = []
+        while True:
+            batch_events = self._run_next_batch()
+            if batch_events is None:
+                return events
+            events.extend(batch_events)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Get batching statistics."""
+        metrics = dict(self.metrics)
+        batches = metrics["batches"]
+        metrics["streams"] = len(self._streams)
+        metrics["avg_batch_size"] = metrics["frames"] / batches if batches else 0.0
+        metrics["inference_ms_avg"] = metrics["inference_ms_total"] / batches if batches else 0.0
+        return metrics
+
+    def _process_stream(self, stream: VADStream, audio_data: np.ndarray) -> List[VADEvent]:
+        """Queue a stream's audio as frames and wait until they have been scored."""
+        audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
+        with self._cond:
+            offset = 0
+            while offset < len(audio_data):
+                taken = min(self.frame_size - stream._pending_len, len(audio_data) - offset)
+                stream._pending[stream._pending_len:stream._pending_len + taken] = audio_data[offset:offset + taken]
+                stream._pending_len += taken
+                offset += taken
+                if stream._pending_len == self.frame_size:
+                    stream._frames.append(stream._pending.copy())
+                    stream._pending_len = 0
+                    stream._submitted += 1
+                    if stream._first_pending_time is None:
+                        stream._first_pending_time = time.monotonic()
+            target = stream._submitted
+            self._cond.notify_all()
+
+        if not self.is_running():
+            self.process_pending()
+
+        with self._cond:
+            while stream._scored < target and self.is_running():
+                self._cond.wait(timeout=1.0)
+            events = stream._events
+            stream._events = []
+        return events
+
+    def _run(self):
+        """Background thread: wait until a batch is ready, then score it."""
+        while not self._stop_event.is_set():
+            with self._cond:
+                while not self._stop_event.is_set() and not self._batch_ready():
+                    self._cond.wait(timeout=self._wait_timeout())
+                if self._stop_event.is_set():
+                    break
+            try:
+                self._run_next_batch()
+            except Exception as e:
+                logger.error(f"Error in batched VAD inference: {e}")
+
+    def _batch_ready(self) -> bool:
+        """A batch runs when every stream has a frame or the oldest frame waited long enough."""
+        waiting = [s for s in self._streams.values() if s._frames]
+        if not waiting:
+            return False
+        if len(waiting) == len(self._streams):
+            return True
+        oldest = min(s._first_pending_time for s in waiting)
+        return time.monotonic() - oldest >= self.max_wait
+
+    def _wait_timeout(self) -> float:
+        pending = [s._first_pending_time for s in self._streams.values() if s._frames]
+        if not pending:
+            return 0.1
+        return max(0.0, min(pending) + self.max_wait - time.monotonic())
+
+    def _collect_batch(self) -> List[Tuple[VADStream, np.ndarray]]:
+        """Take the oldest queued frame of every stream that has one (lock held)."""
+        batch = []
+        for stream in self._streams.values():
+            if stream._frames:
+                batch.append((stream, stream._frames.popleft()))
+                if not stream._frames:
+                    stream._first_pending_time = None
+        return batch
+
+    def _run_next_batch(self) -> Optional[List[Tuple[str, VADEvent]]]:
+        """
+        Run one batched inference over the queued frames and update every stream in it.
+
+        Returns:
+            List of (stream_id, event) tuples, or None if no frame was queued
+        """
+        events = []
+        # Collecting under the inference lock keeps each stream's frames in order
+        with self._inference_lock:
+            with self._cond:
+                batch = self._collect_batch()
+            if not batch:
+                return None
+
+            slots = np.array([stream.slot for stream, _ in batch])
+            size = len(batch)
+            inputs = self._batch_input[:size]
+            inputs[:, :self.context_size] = self._contexts[slots]
+            for row, (_, frame) in enumerate(batch):
+                inputs[row, self.context_size:] = frame
+
+            start = time.perf_counter()
+            probabilities, states = self.backend.run_batch(inputs, self._states[:, slots])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._cond:
+                self._states[:, slots] = states
+                self._contexts[slots] = inputs[:, -self.context_size:]
+                for (stream, _), probability in zip(batch, probabilities):
+                    probability = float(probability)
+                    stream.last_probability = probability
+                    event = stream.tracker.update(probability, stream.position)
+                    stream.position += self.frame_size
+                    stream._scored += 1
+                    if event:
+                        stream._events.append(event)
+                        events.append((stream.stream_id, event))
+
+                self.metrics["batches"] += 1
+                self.metrics["frames"] += size
+                self.metrics["max_batch_size"] = max(self.metrics["max_batch_size"], size)
+                self.metrics["inference_ms_total"] += elapsed_ms
+                self._cond.notify_all()
+
+        if self.on_event:
+            for stream_id, event in events:
+                try:
+                    self.on_event(stream_id, event)
+                except Exception as e:
+                    logger.error(f"Error in VAD event callback for stream '{stream_id}': {e}")
+        return events
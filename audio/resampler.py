@@ -0,0 +1,154 @@
+"""
+Module for streaming sample rate conversion between the capture device and the VAD/STT rate.
+"""
+
+import logging
+from math import gcd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+def design_lowpass(up: int, down: int, half_width: int = 16, beta: float = 8.0,
+                   rolloff: float = 0.9) -> np.ndarray:
+    """
+    Kaiser-windowed sinc anti-aliasing filter for up/down rational resampling.
+
+    Args:
+        up: Interpolation factor
+        down: Decimation factor
+        half_width: Filter half-length in samples at the lower of the two rates
+        beta: Kaiser window shape (8.0 gives about 80dB stopband attenuation)
+        rolloff: Passband edge as a fraction of the lower Nyquist frequency
+
+    Returns:
+        Filter taps at the upsampled rate, scaled for a gain of `up`
+    """
+    factor = max(up, down)
+    length = 2 * half_width * factor + 1
+    cutoff = rolloff / factor  # Relative to the upsampled Nyquist frequency
+    t = np.arange(length) - (length - 1) / 2.0
+    taps = cutoff * np.sinc(cutoff * t) * np.kaiser(length, beta)
+    return (up * taps / np.sum(taps)).astype(np.float32)
+
+class PolyphaseResampler:
+    def __init__(self, from_rate: int, to_rate: int, half_width: int = 16, max_block: int = 4096):
+        """
+        Initialize the resampler.
+
+        Converts a continuous stream block by block with a polyphase FIR filter.
+        The filter bank, the index tables and the input buffer are built once;
+        the history between blocks is kept so block boundaries are seamless and
+        the output length over time is exactly the rate ratio.
+
+        Args:
+            from_rate: Input sample rate
+            to_rate: Output sample rate
+            half_width: Filter half-length in samples at the lower rate (quality vs CPU)
+            max_block: Largest input block expected (larger blocks grow the buffers once)
+        """
+        divisor = gcd(from_rate, to_rate)
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        self.passthrough = self.up == self.down
+
+        taps = design_lowpass(self.up, self.down, half_width)
+        self.taps_per_phase = int(np.ceil(len(taps) / self.up))
+        padded = np.zeros(self.taps_per_phase * self.up, dtype=np.float32)
+        padded[:len(taps)] = taps
+        # Row p holds the taps applied to x[i0], x[i0-1], ... for output phase p;
+        # reversed so it multiplies a window in time order
+        self._bank = np.ascontiguousarray(padded.reshape(self.taps_per_phase, self.up).T[:, ::-1])
+        self._history = self.taps_per_phase - 1
+
+        # Output phase/offset pattern repeats every `up` outputs
+        r = np.arange(self.up)
+        self._phase_cycle = (r * self.down) % self.up
+        self._offset_cycle = (r * self.down) // self.up
+
+        self._allocate(max_block)
+        self.reset()
+
+    def reset(self):
+        """Start a new stream (clears the filter history)."""
+        self._buffer[:self._history] = 0.0
+        self._filled = self._history
+        self._next_output = 0  # Index of the next output sample
+        self._consumed = 0  # Input samples that left the buffer
+
+    def output_length(self, num_samples: int) -> int:
+        """Number of samples the next process() call returns for num_samples of input."""
+        if self.passthrough:
+            return num_samples
+        total = self._consumed + self._filled - self._history + num_samples
+        return -(-total * self.up // self.down) - self._next_output
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block of the stream.
+
+        Args:
+            audio: Mono float32 input block of any length
+
+        Returns:
+            Resampled block (a view into an internal buffer, valid until the next call)
+        """
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.passthrough:
+            return audio
+
+        n = len(audio)
+        if self._filled + n > len(self._buffer):
+            self._allocate(self._filled + n)
+        self._buffer[self._filled:self._filled + n] = audio
+        self._filled += n
+
+        count = self.output_length(0)
+        if count <= 0:
+            return self._output[:0]
+        if count > len(self._output):
+            self._allocate(len(self._buffer), count)
+
+        # Input index (relative to the buffer) of the newest sample each output uses
+        cycle, position = divmod(self._next_output, self.up)
+        first = cycle * self.down + self._offset_cycle[position] - self._consumed + self._history
+        windows = sliding_window_view(self._buffer[:self._filled], self.taps_per_phase)
+        output = self._output[:count]
+        if self.up == 1:
+            # Integer decimation: evenly strided windows, a single tap set
+            np.dot(windows[first - self._history::self.down][:count], self._bank[0], out=output)
+        else:
+            pattern = position + np.arange(count)
+            starts = first - self._history + (pattern // self.up - position // self.up) * self.down \
+                + self._offset_cycle[pattern % self.up] - self._offset_cycle[position]
+            np.einsum("ij,ij->i", windows[starts], self._bank[self._phase_cycle[pattern % self.up]], out=output)
+        self._next_output += count
+
+        # Keep only the history the next block needs
+        cycle, position = divmod(self._next_output, self.up)
+        keep_from = cycle * self.down + self._offset_cycle[position] - self._consumed
+        keep_from = min(keep_from, self._filled - self._history)
+        remaining = self._filled - keep_from
+        self._buffer[:remaining] = self._buffer[keep_from:self._filled]
+        self._consumed += keep_from
+        self._filled = remaining
+        return output
+
+    def _allocate(self, buffer_size: int, output_size: int = 0):
+        """(Re)allocate the input and output work buffers, keeping buffered samples."""
+        buffer_size = max(buffer_size + self._history, 2 * self._history)
+        output_size = max(output_size, -(-buffer_size * self.up // self.down) + 1)
+        old = getattr(self, "_buffer", None)
+        self._buffer = np.zeros(buffer_size, dtype=np.float32)
+        if old is not None:
+            self._buffer[:self._filled] = old[:self._filled]
+        self._output = np.zeros(output_size, dtype=np.float32)
+
+def resample(audio: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Resample a complete signal (e.g. a file) in one call."""
+    if from_rate == to_rate:
+        return np.asarray(audio, dtype=np.float32)
+    resampler = PolyphaseResampler(from_rate, to_rate, max_block=len(audio))
+    return resampler.process(audio).copy()
@@ -0,0 +1,124 @@
+"""
+Module with preallocated NumPy audio buffers for the recorder.
+"""
+
+import numpy as np
+
+class RingBuffer:
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Fixed-size circular buffer holding the most recent samples.
+
+        Writes are at most two slice copies regardless of the block size, so the
+        audio callback never allocates or touches individual samples.
+
+        Args:
+            capacity: Number of samples kept
+            dtype: Sample type
+        """
+        if capacity <= 0:
+            raise ValueError("RingBuffer capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._write_pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """Forget all stored samples (the storage is kept)."""
+        self._write_pos = 0
+        self._size = 0
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full."""
+        samples = np.asarray(samples).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the tail survives
+            self._data[:] = samples[-self.capacity:]
+            self._write_pos = 0
+            self._size = self.capacity
+            return
+
+        end = self._write_pos + n
+        if end <= self.capacity:
+            self._data[self._write_pos:end] = samples
+        else:
+            first = self.capacity - self._write_pos
+            self._data[self._write_pos:] = samples[:first]
+            self._data[:n - first] = samples[first:]
+        self._write_pos = end % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def read(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Copy the stored samples, oldest first, into a contiguous array.
+
+        Args:
+            out: Optional destination with at least len(self) samples
+
+        Returns:
+            The filled prefix of `out` (or a new array)
+        """
+        if out is None:
+            out = np.empty(self._size, dtype=self._data.dtype)
+        start = (self._write_pos - self._size) % self.capacity
+        first = min(self._size, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:self._size] = self._data[:self._size - first]
+        return out[:self._size]
+
+class UtteranceBuffer:
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Growable contiguous buffer for one utterance.
+
+        The capacity is allocated up front and doubled only if an utterance
+        outgrows it; view() hands out the recorded samples without copying.
+
+        Args:
+            capacity: Initial capacity in samples
+            dtype: Sample type
+        """
+        self._data = np.empty(max(1, capacity), dtype=dtype)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, samples: np.ndarray):
+        """Append samples to the end of the utterance."""
+        samples = np.asarray(samples).reshape(-1)
+        end = self._length + len(samples)
+        if end > len(self._data):
+            self._grow(end)
+        self._data[self._length:end] = samples
+        self._length = end
+
+    def append_ring(self, ring: RingBuffer):
+        """Append the contents of a ring buffer without an intermediate copy."""
+        end = self._length + len(ring)
+        if end > len(self._data):
+            self._grow(end)
+        ring.read(out=self._data[self._length:end])
+        self._length = end
+
+    def view(self) -> np.ndarray:
+        """Return a zero-copy view of the recorded samples."""
+        return self._data[:self._length]
+
+    def _grow(self, required: int):
+        new_capacity = len(self._data)
+        while new_capacity < required:
+            new_capacity *= 2
+        data = np.empty(new_capacity, dtype=self._data.dtype)
+        data[:self._length] = self._data[:self._length]
+        self._data = data
@@ -0,0 +1,122 @@
+"""
+Module for recognizing long utterances as several segments in parallel.
+
+A long question is cut at the VAD pauses into segments of a few seconds
+that are recognized concurrently and stitched back in order, so the
+recognition time follows the longest segment instead of the whole turn.
+Cuts only happen in pauses, where splitting does not break words.
+"""
+
+import time
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RecognizeFunction = Callable[[np.ndarray, int], Optional[str]]
+
+def plan_segments(num_samples: int, pauses: List[int], min_samples: int) -> List[Tuple[int, int]]:
+    """
+    Choose the pauses to cut at.
+
+    Args:
+        num_samples: Length of the audio
+        pauses: Candidate cut positions (middle of VAD pauses), in order
+        min_samples: Shortest segment; shorter pieces stay joined to their neighbour
+
+    Returns:
+        List of [start, end) segments covering the audio
+    """
+    segments = []
+    start = 0
+    for pause in pauses:
+        if pause - start >= min_samples and num_samples - pause >= min_samples:
+            segments.append((start, pause))
+            start = pause
+    segments.append((start, num_samples))
+    return segments
+
+class SegmentedRecognizer:
+    def __init__(self, recognize: RecognizeFunction, max_workers: int = 4, min_segment: float = 2.0):
+        """
+        Recognize long utterances segment by segment on a thread pool.
+
+        Args:
+            recognize: Function taking (audio, sample_rate) and returning the text or None
+                (e.g. SpeechToText.convert)
+            max_workers: Segments recognized at the same time
+            min_segment: Shortest segment in seconds; utterances shorter than twice
+                this are sent in one piece
+        """
+        self.recognize = recognize
+        self.max_workers = max_workers
+        self.min_segment = min_segment
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = Lock()
+        self._speedups = deque(maxlen=100)
+        self.metrics = {"turns": 0, "segmented_turns": 0, "segments": 0}
+
+    def convert(self, audio: np.ndarray, sample_rate: int, pauses: Optional[List[int]] = None) -> Optional[str]:
+        """
+        Recognize an utterance, in parallel segments when it is long enough.
+
+        Args:
+            audio: Mono float32 audio
+            sample_rate: Sample rate of the audio
+            pauses: Sample positions in the middle of VAD pauses (Utterance.pauses)
+
+        Returns:
+            The segment transcripts joined in order, or None if nothing was recognized
+        """
+        segments = plan_segments(len(audio), pauses or [], int(self.min_segment * sample_rate))
+        with self._lock:
+            self.metrics["turns"] += 1
+            self.metrics["segments"] += len(segments)
+            if len(segments) > 1:
+                self.metrics["segmented_turns"] += 1
+        if len(segments) == 1:
+            return self.recognize(audio, sample_rate)
+
+        start = time.perf_counter()
+        futures = [self.executor.submit(self._timed_recognize, audio[a:b], sample_rate) for a, b in segments]
+        results = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+        sequential = sum(elapsed for _, elapsed in results)
+        with self._lock:
+            self._speedups.append(sequential / wall if wall else 1.0)
+        logger.info(f"Recognized {len(segments)} segments of {len(audio) / sample_rate:.2f}s in {wall * 1000:.0f}ms "
+                    f"(longest segment {max(e for _, e in results) * 1000:.0f}ms, sequential {sequential * 1000:.0f}ms)")
+
+        texts = [text.strip() for text, _ in results if text and text.strip()]
+        return " ".join(texts) if texts else None
+
+    def _timed_recognize(self, audio: np.ndarray, sample_rate: int) -> Tuple[Optional[str], float]:
+        start = time.perf_counter()
+        try:
+            text = self.recognize(audio, sample_rate)
+        except Exception as e:
+            logger.error(f"Error recognizing segment: {e}")
+            text = None
+        return text, time.perf_counter() - start
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Get segmentation counters.
+
+        Returns:
+            Dictionary with the turn/segment counts and the mean speed-up of segmented turns
+            over recognizing their segments one after another
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            speedups = list(self._speedups)
+        metrics["speedup_mean"] = float(np.mean(speedups)) if speedups else None
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker threads."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
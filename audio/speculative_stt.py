@@ -0,0 +1,141 @@
+"""
+Module for speculative speech recognition during the end-of-speech hang-over.
+
+When the VAD reports an offset, the turn may be over, but the endpointer
+still waits for the hang-over before deciding. The recorder submits the
+audio so far for recognition at the offset; if the user speaks again the
+speculation is discarded, and if the endpoint is confirmed its transcript
+is reused, so recognition overlaps the hang-over instead of following it.
+"""
+
+import time
+import logging
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RecognizeFunction = Callable[[np.ndarray, int], Optional[str]]
+
+class Speculation:
+    """A recognition request started at a VAD offset."""
+
+    def __init__(self, future: Future, samples: int):
+        self.future = future
+        self.samples = samples  # Audio length submitted
+        self.submitted_time = time.time()
+        self.completed_time = None  # When the recognizer returned
+        self.confirmed_time = None  # When the endpoint was confirmed
+        self.discarded = False
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for the transcript.
+
+        Args:
+            timeout: Seconds to wait (None waits until recognition finishes)
+
+        Returns:
+            The recognized text, or None if nothing was recognized, recognition failed or
+            the timeout ran out
+        """
+        try:
+            return self.future.result(timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Speculative recognition not finished after {timeout:.1f}s")
+            return None
+        except Exception as e:
+            logger.error(f"Speculative recognition failed: {e}")
+            return None
+
+    @property
+    def latency_saved(self) -> Optional[float]:
+        """Seconds of recognition that overlapped the hang-over (known once confirmed and completed)."""
+        if self.confirmed_time is None or self.completed_time is None:
+            return None
+        return max(0.0, min(self.completed_time, self.confirmed_time) - self.submitted_time)
+
+class SpeculativeRecognizer:
+    def __init__(self, recognize: RecognizeFunction, max_workers: int = 1):
+        """
+        Run recognition requests in the background and account for their outcome.
+
+        Args:
+            recognize: Function taking (audio, sample_rate) and returning the text or None
+                (e.g. SpeechToText.convert)
+            max_workers: Concurrent recognition requests
+        """
+        self.recognize = recognize
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = Lock()
+        self._latencies_saved = deque(maxlen=100)
+        self.metrics = {
+            "speculations": 0,
+            "hits": 0,  # Confirmed by the endpointer and reused
+            "misses": 0,  # Discarded because the user kept speaking
+            "cancelled": 0  # Discarded before the request was sent
+        }
+
+    def submit(self, audio: np.ndarray, sample_rate: int) -> Speculation:
+        """Start recognizing the audio of a possibly finished turn."""
+        future = self.executor.submit(self.recognize, audio, sample_rate)
+        speculation = Speculation(future, len(audio))
+        future.add_done_callback(lambda f: self._completed(speculation))
+        with self._lock:
+            self.metrics["speculations"] += 1
+        logger.debug(f"Speculative recognition of {len(audio) / sample_rate:.2f}s started")
+        return speculation
+
+    def discard(self, speculation: Speculation):
+        """Drop a speculation because the turn went on."""
+        if speculation.discarded or speculation.confirmed_time is not None:
+            return
+        speculation.discarded = True
+        cancelled = speculation.future.cancel()
+        with self._lock:
+            self.metrics["misses"] += 1
+            if cancelled:
+                self.metrics["cancelled"] += 1
+        logger.debug("Speech resumed, speculative recognition discarded")
+
+    def confirm(self, speculation: Speculation):
+        """Mark a speculation as the recognition of the finished turn."""
+        if speculation.discarded or speculation.confirmed_time is not None:
+            return
+        with self._lock:
+            speculation.confirmed_time = time.time()
+            self.metrics["hits"] += 1
+            self._record_saving(speculation)
+
+    def _completed(self, speculation: Speculation):
+        with self._lock:
+            speculation.completed_time = time.time()
+            self._record_saving(speculation)
+
+    def _record_saving(self, speculation: Speculation):
+        saved = speculation.latency_saved
+        if saved is not None:
+            self._latencies_saved.append(saved)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Get speculation counters.
+
+        Returns:
+            Dictionary with the counts, the hit rate and the mean/median seconds saved per confirmed turn
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            saved = list(self._latencies_saved)
+        decided = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / decided if decided else 0.0
+        metrics["latency_saved_ms_mean"] = float(np.mean(saved)) * 1000 if saved else None
+        metrics["latency_saved_ms_median"] = float(np.median(saved)) * 1000 if saved else None
+        return metrics
+
+    def shutdown(self):
+        """Stop the worker threads, dropping requests that have not started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
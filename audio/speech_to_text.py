@@ -2,81 +2,88 @@
 Module for converting speech to text.
 """
 
-import speech_recognition as sr
 import logging
 import numpy as np
-import wave
-import tempfile
-import os
-from utils.config import TEMP_AUDIO_PATH, LANGUAGE, SAMPLE_RATE
+import soundfile as sf
+import speech_recognition as sr
+from utils.config import (
+    TEMP_AUDIO_PATH, LANGUAGE, PROCESSING_SAMPLE_RATE, STT_BACKEND, STT_WHISPER_MODEL,
+    STT_WHISPER_COMPUTE_TYPE, STT_CPU_THREADS, STT_MAX_BATCH, STT_WARMUP, STT_TIMEOUT,
+    STT_HEDGE_BACKEND, STT_HEDGE_PERCENTILE, STT_HEDGE_MIN_DELAY
+)
+from audio.stt_backends import InMemoryAudioData, create_stt_backend
+from audio.hedged_stt import HedgedSTTBackend
 
 logger = logging.getLogger(__name__)
 
 class SpeechToText:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
+    def __init__(self, backend=None):
+        """
+        Initialize speech recognition.
+
+        Args:
+            backend: Optional STTBackend (created from STT_BACKEND if not given: Google's
+                web recognizer, or a local Whisper model loaded and warmed up here once;
+                hedged on STT_HEDGE_BACKEND when that is set)
+        """
+        self.backend = backend
+        if self.backend is None:
+            self.backend = self._create_backend(STT_BACKEND)
+            if STT_HEDGE_BACKEND != "none":
+                self.backend = HedgedSTTBackend(self.backend, self._create_backend(STT_HEDGE_BACKEND),
+                                                percentile=STT_HEDGE_PERCENTILE, min_delay=STT_HEDGE_MIN_DELAY,
+                                                timeout=STT_TIMEOUT)
+            if STT_WARMUP:
+                self.backend.warmup()
+        logger.info(f"Using {self.backend.name} speech recognition")
+        
+    @staticmethod
+    def _create_backend(name):
+        """Create a backend with its options from the configuration."""
+        options = {"timeout": STT_TIMEOUT}
+        if name == "whisper":
+            options = {"model": STT_WHISPER_MODEL, "compute_type": STT_WHISPER_COMPUTE_TYPE,
+                       "cpu_threads": STT_CPU_THREADS, "max_batch": STT_MAX_BATCH}
+        return create_stt_backend(name, language=LANGUAGE, **options)
         
-    def convert(self, audio_data):
+    def convert(self, audio_data, sample_rate=PROCESSING_SAMPLE_RATE):
         """
-        Convert audio data (numpy array) to text using Google's Speech Recognition API.
+        Convert audio data (numpy array) to text with the configured backend.
+        The audio stays in memory: no temporary files or external encoder.
         Returns the recognized text or None if recognition failed.
         """
         try:
-            # Create a temporary WAV file from the audio data
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-            # Save audio data as WAV file
-            with wave.open(temp_path, 'wb') as wf:
-                wf.setnchannels(1)  # Mono
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(SAMPLE_RATE)
-                
-                # Convert float32 to int16
-                audio_int16 = (audio_data * 32767).astype(np.int16)
-                wf.writeframes(audio_int16.tobytes())
-            
-            # Use the existing method to convert the WAV file
-            text = self.convert_audio_to_text(temp_path)
+            text = self.backend.transcribe(audio_data, sample_rate)
             
-            # Clean up temporary file
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-                
-            return text
+        except sr.RequestError as e:
+            logger.error(f"Could not request results from service; {e}")
+            print(f"Speech-to-text finished: Error - {e}")
+            return None
             
         except Exception as e:
-            logger.error(f"Error converting audio data to text: {e}")
+            logger.error(f"Error converting speech to text: {e}")
             print(f"Speech-to-text finished: Error - {e}")
             return None
+            
+        if not text:
+            logger.warning("Speech recognition could not understand audio")
+            print("Speech-to-text finished: No speech detected")
+            return None
+        logger.info(f"Recognized text: {text}")
+        print(f"Speech-to-text finished: '{text}'")
+        return text
         
     def convert_audio_to_text(self, audio_path=TEMP_AUDIO_PATH):
         """
-        Convert audio file to text using Google's Speech Recognition API.
+        Convert audio file to text with the configured backend.
         Returns the recognized text or None if recognition failed.
         """
         try:
-            with sr.AudioFile(audio_path) as source:
-                audio_data = self.recognizer.record(source)
-                
-            text = self.recognizer.recognize_google(audio_data, language=LANGUAGE)
-            logger.info(f"Recognized text: {text}")
-            print(f"Speech-to-text finished: '{text}'")
-            return text
-            
-        except sr.UnknownValueError:
-            logger.warning("Speech recognition could not understand audio")
-            print("Speech-to-text finished: No speech detected")
-            return None
-            
-        except sr.RequestError as e:
-            logger.error(f"Could not request results from service; {e}")
-            print(f"Speech-to-text finished: Error - {e}")
-            return None
+            audio_data, sample_rate = sf.read(audio_path, dtype="float32", always_2d=True)
             
         except Exception as e:
-            logger.error(f"Error converting speech to text: {e}")
+            logger.error(f"Error reading audio file {audio_path}: {e}")
             print(f"Speech-to-text finished: Error - {e}")
             return None
+            
+        return self.convert(np.mean(audio_data, axis=1), sample_rate)
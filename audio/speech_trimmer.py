@@ -0,0 +1,184 @@
+"""
+Module for cutting silence out of utterances before they are uploaded for recognition.
+"""
+
+import logging
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from audio.streaming_vad import VADEvent
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = 2  # The recognizer receives 16-bit PCM
+FADE_MS = 5.0  # Fade at cuts so joins do not click
+
+@dataclass
+class TrimResult:
+    """Audio with silence removed and what was kept."""
+    audio: np.ndarray
+    spans: List[Tuple[int, int]]  # Kept [start, end) sample ranges of the original audio
+    original_samples: int
+
+    @property
+    def samples_saved(self) -> int:
+        return self.original_samples - len(self.audio)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.samples_saved * BYTES_PER_SAMPLE
+
+    def map_position(self, position: int) -> int:
+        """Map a sample position of the original audio to the trimmed audio (cut regions map to the cut)."""
+        offset = 0
+        for start, end in self.spans:
+            if position < end:
+                return offset + max(position - start, 0)
+            offset += end - start
+        return offset
+
+def speech_spans(events: List[VADEvent], audio_start: int, num_samples: int) -> List[Tuple[int, int]]:
+    """
+    Turn VAD onset/offset events into speech spans relative to the audio.
+
+    Args:
+        events: VAD events in stream order
+        audio_start: Stream position of the first audio sample
+        num_samples: Length of the audio
+
+    Returns:
+        List of [start, end) sample ranges; speech still active at the end runs to the end
+    """
+    spans = []
+    start = None
+    for i, event in enumerate(events):
+        position = min(max(event.sample - audio_start, 0), num_samples)
+        if event.event_type == "start":
+            if start is None:
+                start = position
+        elif event.event_type == "end":
+            # An offset without an onset: speech was already active when the audio began
+            if start is None and not spans and i == 0:
+                start = 0
+            if start is not None:
+                if position > start:
+                    spans.append((start, position))
+                start = None
+    if start is not None and start < num_samples:
+        spans.append((start, num_samples))
+    return spans
+
+def pause_points(spans: List[Tuple[int, int]]) -> List[int]:
+    """Middle of every pause between consecutive speech spans."""
+    return [(spans[i][1] + spans[i + 1][0]) // 2 for i in range(len(spans) - 1)]
+
+class SpeechTrimmer:
+    def __init__(self, sample_rate: int, margin_before: float = 0.3, margin_after: float = 0.3,
+                 max_pause: float = 0.5):
+        """
+        Initialize the speech trimmer.
+
+        Keeps the speech spans found by the VAD plus a margin on each side and
+        shortens pauses between them, so the pre-roll, the trailing silence
+        the endpointer waited for and long hesitations are not uploaded.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            margin_before: Seconds kept before the first speech onset (VAD onsets lag the speech a little)
+            margin_after: Seconds kept after the last speech offset
+            max_pause: Longest silence (seconds) kept between two speech spans; the kept
+                part is split between both sides in proportion to the margins
+        """
+        self.sample_rate = sample_rate
+        self.margin_before = int(margin_before * sample_rate)
+        self.margin_after = int(margin_after * sample_rate)
+        self.max_pause = int(max_pause * sample_rate)
+        self._fade = int(FADE_MS / 1000.0 * sample_rate)
+        self.metrics = {
+            "turns": 0,
+            "trimmed_turns": 0,
+            "samples_in": 0,
+            "samples_out": 0,
+            "bytes_saved_total": 0
+        }
+
+    def trim(self, audio: np.ndarray, events: List[VADEvent], audio_start: int, record: bool = True) -> TrimResult:
+        """
+        Remove leading, trailing and long internal silence from an utterance.
+
+        Args:
+            audio: Mono float32 utterance audio
+            events: VAD events of the utterance
+            audio_start: Stream position of the first audio sample
+            record: Count the turn in the metrics (off for provisional trims, e.g. speculation)
+
+        Returns:
+            TrimResult (the audio is returned unchanged when the VAD found no speech in it)
+        """
+        n = len(audio)
+        spans = self._keep_spans(speech_spans(events, audio_start, n), n)
+        if not spans or spans == [(0, n)]:
+            result = TrimResult(audio=audio, spans=[(0, n)], original_samples=n)
+        else:
+            pieces = [audio[start:end].copy() for start, end in spans]
+            for piece, (start, end) in zip(pieces, spans):
+                self._fade_edges(piece, start > 0, end < n)
+            result = TrimResult(audio=np.concatenate(pieces), spans=spans, original_samples=n)
+
+        if not record:
+            return result
+        self.metrics["turns"] += 1
+        self.metrics["samples_in"] += n
+        self.metrics["samples_out"] += len(result.audio)
+        self.metrics["bytes_saved_total"] += result.bytes_saved
+        if result.samples_saved:
+            self.metrics["trimmed_turns"] += 1
+        return result
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Get trimming totals."""
+        metrics = dict(self.metrics)
+        turns = metrics["turns"]
+        samples_in = metrics["samples_in"]
+        metrics["bytes_saved_avg"] = metrics["bytes_saved_total"] / turns if turns else 0.0
+        metrics["kept_ratio"] = metrics["samples_out"] / samples_in if samples_in else 1.0
+        return metrics
+
+    def _keep_spans(self, spans: List[Tuple[int, int]], n: int) -> List[Tuple[int, int]]:
+        """Add margins, shorten the pauses between spans and merge what touches."""
+        if not spans:
+            return []
+        kept = []
+        for i, (start, end) in enumerate(spans):
+            if i == 0:
+                start = max(0, start - self.margin_before)
+            else:
+                # Split the kept part of the pause in proportion to the margins
+                gap = start - spans[i - 1][1]
+                pause = min(gap, self.max_pause)
+                share = self.margin_before / float(self.margin_before + self.margin_after or 1)
+                start -= int(pause * share)
+            if i == len(spans) - 1:
+                end = min(n, end + self.margin_after)
+            else:
+                gap = spans[i + 1][0] - end
+                pause = min(gap, self.max_pause)
+                share = self.margin_after / float(self.margin_before + self.margin_after or 1)
+                end += pause - int(pause * (1.0 - share))
+            if kept and start <= kept[-1][1]:
+                kept[-1] = (kept[-1][0], max(kept[-1][1], end))
+            else:
+                kept.append((start, end))
+        return kept
+
+    def _fade_edges(self, piece: np.ndarray, fade_in: bool, fade_out: bool):
+        """Short linear fades where the audio was cut."""
+        fade = min(self._fade, len(piece) // 2)
+        if fade <= 0:
+            return
+        ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+        if fade_in:
+            piece[:fade] *= ramp
+        if fade_out:
+            piece[-fade:] *= ramp[::-1]
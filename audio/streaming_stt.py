@@ -0,0 +1,300 @@
+"""
+Module for streaming speech recognition: audio is sent while the user speaks and transcripts come back during the turn.
+
+The recorder opens a session at the speech onset, pushes every processed
+block into it and ends it at the end-of-speech decision. Only the tail of
+the turn is left to recognize at that point, so the final transcript
+arrives shortly after the turn ends instead of one full batch request later.
+
+The reference engine talks to a WebSocket server with this protocol:
+
+    client -> {"type": "start", "sample_rate": 16000, "language": "es"}
+    client -> binary frames of 16-bit little-endian mono PCM
+    client -> {"type": "end"}
+    server -> {"type": "partial", "text": "..."}   (any number, while audio arrives)
+    server -> {"type": "final", "text": "..."}     (once, after "end")
+
+utils/stt_stub_server.py is a local stand-in server speaking it.
+"""
+
+import json
+import time
+import queue
+import logging
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from threading import Thread, Event, Lock
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Transcript:
+    """A hypothesis returned by a streaming recognizer."""
+    text: str
+    is_final: bool
+    received_time: float  # Wall-clock time the hypothesis arrived
+
+TranscriptCallback = Callable[[Transcript], None]
+
+class StreamingSTTSession:
+    """
+    Recognition of one utterance.
+
+    push() is called from the recorder's VAD worker and never blocks;
+    hypotheses are delivered to the callback from the engine's threads.
+    """
+
+    def __init__(self, sample_rate: int, on_transcript: Optional[TranscriptCallback] = None,
+                 on_finished: Optional[Callable[["StreamingSTTSession"], None]] = None):
+        self.sample_rate = sample_rate
+        self.on_transcript = on_transcript
+        self.on_finished = on_finished
+        self.partial = None  # Latest partial hypothesis
+        self.final = None  # Final transcript ("" if nothing was recognized)
+        self.failed = False
+        self.samples_pushed = 0
+        self.end_time = None  # When the end of speech was signalled
+        self.final_latency = None  # Seconds from end() to the final transcript
+        self._done = Event()
+
+    def push(self, audio: np.ndarray):
+        """Send a block of float32 audio."""
+        if self.failed or self._done.is_set() or not len(audio):
+            return
+        self.samples_pushed += len(audio)
+        self._send((np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+
+    def end(self):
+        """Signal the end of speech; the final transcript follows."""
+        if self.end_time is None:
+            self.end_time = time.time()
+            self._end()
+
+    def cancel(self):
+        """Abandon the session (e.g. the utterance was too short)."""
+        if not self._done.is_set():
+            self.failed = True
+            self._done.set()
+            self._close()
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Wait for the final transcript.
+
+        Args:
+            timeout: Seconds to wait (None waits until the session finishes)
+
+        Returns:
+            The final text, or None if the session failed or the timeout expired
+        """
+        if not self._done.wait(timeout):
+            return None
+        return None if self.failed else self.final
+
+    def _emit(self, text: str, is_final: bool):
+        """Record a hypothesis from the engine and pass it on."""
+        if self._done.is_set():
+            return
+        transcript = Transcript(text=text, is_final=is_final, received_time=time.time())
+        if is_final:
+            self.final = text
+            if self.end_time is not None:
+                self.final_latency = transcript.received_time - self.end_time
+        else:
+            self.partial = text
+        if self.on_transcript:
+            try:
+                self.on_transcript(transcript)
+            except Exception as e:
+                logger.error(f"Error in transcript callback: {e}")
+        if is_final:
+            self._finish()
+
+    def _fail(self, error):
+        """Give up on the session; result() returns None so callers fall back to batch recognition."""
+        if self._done.is_set():
+            return
+        logger.warning(f"Streaming recognition failed: {error}")
+        self.failed = True
+        self._finish()
+
+    def _finish(self):
+        self._done.set()
+        if self.on_finished:
+            self.on_finished(self)
+
+    def _send(self, pcm: bytes):
+        raise NotImplementedError
+
+    def _end(self):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+class StreamingSTTEngine:
+    """Base class for streaming recognizers; creates one session per utterance."""
+    name = "base"
+
+    def __init__(self):
+        self._lock = Lock()
+        self._latencies = deque(maxlen=100)
+        self._metrics = {"sessions": 0, "finals": 0, "failures": 0}
+
+    def start_session(self, sample_rate: int, on_transcript: Optional[TranscriptCallback] = None) -> StreamingSTTSession:
+        """Open a session for a new utterance."""
+        with self._lock:
+            self._metrics["sessions"] += 1
+        return self._create_session(sample_rate, on_transcript)
+
+    def _create_session(self, sample_rate: int, on_transcript: Optional[TranscriptCallback]) -> StreamingSTTSession:
+        raise NotImplementedError
+
+    def _session_finished(self, session: StreamingSTTSession):
+        with self._lock:
+            if session.failed:
+                self._metrics["failures"] += 1
+            else:
+                self._metrics["finals"] += 1
+                if session.final_latency is not None:
+                    self._latencies.append(session.final_latency)
+
+    def get_metrics(self) -> Dict:
+        """
+        Get session counters.
+
+        Returns:
+            Dictionary with session/final/failure counts and the median and p90
+            delay between end of speech and the final transcript
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            latencies = list(self._latencies)
+        metrics["final_latency_ms_median"] = float(np.median(latencies)) * 1000 if latencies else None
+        metrics["final_latency_ms_p90"] = float(np.percentile(latencies, 90)) * 1000 if latencies else None
+        return metrics
+
+class WebSocketSTTSession(StreamingSTTSession):
+    def __init__(self, url: str, language: str, sample_rate: int, connect_timeout: float = 2.0,
+                 on_transcript: Optional[TranscriptCallback] = None, on_finished=None):
+        """
+        Session streaming audio over one WebSocket connection.
+
+        The connection is opened at the speech onset in a background thread;
+        audio pushed before it is up is queued and sent once it is.
+
+        Args:
+            url: Server URL, e.g. "ws://127.0.0.1:8765"
+            language: Recognition language sent in the start message
+            sample_rate: Sample rate of the pushed audio
+            connect_timeout: Seconds to wait for the connection
+            on_transcript: Called with every partial and the final Transcript
+            on_finished: Called once the session has its final transcript or failed
+        """
+        super().__init__(sample_rate, on_transcript, on_finished)
+        self.url = url
+        self.language = language
+        self.connect_timeout = connect_timeout
+        self._outgoing = queue.Queue()
+        self._connection = None
+        self._sender = Thread(target=self._send_loop)
+        self._sender.daemon = True
+        self._sender.start()
+
+    def _send(self, pcm: bytes):
+        self._outgoing.put(pcm)
+
+    def _end(self):
+        self._outgoing.put(None)
+
+    def _close(self):
+        self._outgoing.put(None)
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+
+    def _send_loop(self):
+        from websockets.sync.client import connect
+
+        try:
+            self._connection = connect(self.url, open_timeout=self.connect_timeout)
+            self._connection.send(json.dumps({"type": "start", "sample_rate": self.sample_rate,
+                                              "language": self.language}))
+        except Exception as e:
+            self._fail(f"could not connect to {self.url}: {e}")
+            return
+
+        receiver = Thread(target=self._receive_loop)
+        receiver.daemon = True
+        receiver.start()
+        try:
+            while not self._done.is_set():
+                pcm = self._outgoing.get()
+                if pcm is None:
+                    break
+                self._connection.send(pcm)
+            if self._done.is_set():
+                # Cancelled while connecting or sending
+                self._connection.close()
+            else:
+                self._connection.send(json.dumps({"type": "end"}))
+        except Exception as e:
+            self._fail(e)
+            self._connection.close()
+
+    def _receive_loop(self):
+        try:
+            for message in self._connection:
+                data = json.loads(message)
+                if data.get("type") in ("partial", "final"):
+                    self._emit(data.get("text", ""), data["type"] == "final")
+                elif data.get("type") == "error":
+                    self._fail(data.get("message", "server error"))
+                if self._done.is_set():
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._fail("connection closed before the final transcript")
+            self._connection.close()
+
+class WebSocketSTTEngine(StreamingSTTEngine):
+    name = "websocket"
+
+    def __init__(self, url: str, language: str = "es", connect_timeout: float = 2.0):
+        """
+        Streaming recognizer behind a WebSocket server (see the module docstring for the protocol).
+
+        Args:
+            url: Server URL, e.g. "ws://127.0.0.1:8765"
+            language: Recognition language
+            connect_timeout: Seconds to wait for each session's connection
+        """
+        super().__init__()
+        self.url = url
+        self.language = language
+        self.connect_timeout = connect_timeout
+
+    def _create_session(self, sample_rate, on_transcript):
+        return WebSocketSTTSession(self.url, self.language, sample_rate, connect_timeout=self.connect_timeout,
+                                   on_transcript=on_transcript, on_finished=self._session_finished)
+
+def create_streaming_stt(name: str, url: str = "", language: str = "es") -> Optional[StreamingSTTEngine]:
+    """
+    Create a streaming recognizer by name.
+
+    Args:
+        name: "none" (batch recognition after the turn) or "websocket"
+        url: Server URL for the websocket engine
+        language: Recognition language
+
+    Returns:
+        StreamingSTTEngine instance, or None when streaming recognition is off
+    """
+    if not name or name == "none":
+        return None
+    if name == "websocket":
+        return WebSocketSTTEngine(url, language=language)
+    raise ValueError(f"Unknown streaming STT engine: {name}")
@@ -76,19 +76,26 @@ class StreamingTTSProcessor:
         self.audio_buffers = []
         self.buffer_lock = threading.Lock()
         
+        # Timing of the last stream_text_to_speech() call
+        self.last_metrics: Dict[str, Any] = {}
+        
         # Callbacks
         self.on_chunk_processed: Optional[Callable[[TextChunk, str], None]] = None
         self.on_audio_ready: Optional[Callable[[np.ndarray], None]] = None
         self.on_streaming_complete: Optional[Callable[[], None]] = None
+        # Called with (audio, sample_rate) as audio goes to the output (echo canceller reference)
+        self.on_playback_audio: Optional[Callable[[np.ndarray, int], None]] = None
         
     def set_callbacks(self, 
                      on_chunk_processed: Optional[Callable[[TextChunk, str], None]] = None,
                      on_audio_ready: Optional[Callable[[np.ndarray], None]] = None,
-                     on_streaming_complete: Optional[Callable[[], None]] = None):
+                     on_streaming_complete: Optional[Callable[[], None]] = None,
+                     on_playback_audio: Optional[Callable[[np.ndarray, int], None]] = None):
         """Set callback functions for various events."""
         self.on_chunk_processed = on_chunk_processed
         self.on_audio_ready = on_audio_ready
         self.on_streaming_complete = on_streaming_complete
+        self.on_playback_audio = on_playback_audio
     
     def stream_text_to_speech(self, text_stream: Generator[str, None, None], 
                              conversation_history: Optional[list] = None) -> bool:
@@ -102,6 +109,9 @@ class StreamingTTSProcessor:
         Returns:
             True if successful, False otherwise
         """
+        original_on_audio_ready = self.on_audio_ready
+        original_on_playback_audio = self.on_playback_audio
+        audio_thread = None
         try:
             # Reset state
             self.stop_event.clear()
@@ -115,15 +125,17 @@ class StreamingTTSProcessor:
             audio_playback_start_time = None
             last_audio_time = None
             
-            # Create a wrapper for on_audio_ready to track audio timing
-            original_on_audio_ready = self.on_audio_ready
+            self.last_metrics = {"start_time": start_time, "first_token_time": None,
+                                 "first_audio_time": None, "playback_start_time": None, "chunks": 0}
             
+            # Create a wrapper for on_audio_ready to track audio timing
             def audio_ready_wrapper(audio_data):
                 nonlocal first_audio_time, last_audio_time
                 current_time = time.time()
                 
                 if first_audio_time is None:
                     first_audio_time = current_time
+                    self.last_metrics["first_audio_time"] = first_audio_time
                     time_to_first_audio = first_audio_time - start_time
                     print(f"🔊 Time to first audio chunk: {time_to_first_audio:.3f}s")
                     print(f"🎵 Audio chunk size: {len(audio_data)} samples")
@@ -134,8 +146,18 @@ class StreamingTTSProcessor:
                 if original_on_audio_ready:
                     original_on_audio_ready(audio_data)
             
-            # Set the wrapper as the callback
+            def playback_audio_wrapper(audio_data, sample_rate):
+                nonlocal audio_playback_start_time
+                if audio_playback_start_time is None:
+                    audio_playback_start_time = time.time()
+                    self.last_metrics["playback_start_time"] = audio_playback_start_time
+                    print(f"▶️  Time to start playing: {audio_playback_start_time - start_time:.3f}s")
+                if original_on_playback_audio:
+                    original_on_playback_audio(audio_data, sample_rate)
+            
+            # Set the wrappers as the callbacks (restored when streaming ends)
             self.on_audio_ready = audio_ready_wrapper
+            self.on_playback_audio = playback_audio_wrapper
             
             # Start processing threads
             self._start_processing_threads()
@@ -156,6 +178,7 @@ class StreamingTTSProcessor:
                 # Record time to first token
                 if first_token_time is None:
                     first_token_time = time.time()
+                    self.last_metrics["first_token_time"] = first_token_time
                     time_to_first_token = first_token_time - start_time
                     print(f"⏱️  Time to first token (LLM): {time_to_first_token:.3f}s")
                     print(f"📝 First token: '{text_chunk}'")
@@ -202,6 +225,8 @@ class StreamingTTSProcessor:
             # Wait for audio streaming to complete
             audio_thread.join(timeout=30)
             
+            self.last_metrics["chunks"] = chunk_count
+            
             # Call completion callback
             if self.on_streaming_complete:
                 self.on_streaming_complete()
@@ -231,6 +256,12 @@ class StreamingTTSProcessor:
         finally:
             self.is_processing = False
             self._stop_processing_threads()
+            if audio_thread is not None and audio_thread.is_alive():
+                # The text stream failed: end this turn's audio worker so it cannot take the next turn's audio
+                self.audio_queue.put(None)
+                audio_thread.join(timeout=30)
+            self.on_audio_ready = original_on_audio_ready
+            self.on_playback_audio = original_on_playback_audio
     
     def _start_processing_threads(self):
         """Start worker threads for processing text chunks."""
@@ -259,6 +290,8 @@ class StreamingTTSProcessor:
                 # Get chunk from queue
                 item = self.chunk_queue.get(timeout=1)
                 if item is None:  # Sentinel value
+                    # Counted like any item, or the next stream's chunk_queue.join() never returns
+                    self.chunk_queue.task_done()
                     break
                 
                 chunk_index, chunk = item
@@ -411,6 +444,8 @@ class StreamingTTSProcessor:
                             # Break audio into smaller chunks for streaming
                             for i in range(0, len(audio_chunk), FRAME_BUFFER_SIZE):
                                 chunk = audio_chunk[i:i+FRAME_BUFFER_SIZE]
+                                if self.on_playback_audio:
+                                    self.on_playback_audio(chunk, TARGET_SAMPLE_RATE)
                                 yield audio2face_pb2.PushAudioStreamRequest(
                                     audio_data=chunk.tobytes()
                                 )
@@ -441,11 +476,13 @@ class StreamingTTSProcessor:
     
     def _stream_to_file(self):
         """Stream audio directly to speakers (fallback when gRPC is not available)."""
+        output = None
         try:
             # Process audio chunks in order
             expected_index = 0
             audio_buffer = {}
-            all_audio = []
+            played_samples = 0
+            playback_start_time = None
             
             while True:
                 try:
@@ -456,43 +493,43 @@ class StreamingTTSProcessor:
                     chunk_index, audio_data = item
                     audio_buffer[chunk_index] = audio_data
                     
-                    # Process chunks in order
+                    # Play chunks in order as soon as they are next, while later ones are synthesized
                     while expected_index in audio_buffer:
                         audio_chunk = audio_buffer.pop(expected_index)
-                        all_audio.append(audio_chunk)
                         
                         if self.on_audio_ready:
                             self.on_audio_ready(audio_chunk)
                         
+                        if output is None:
+                            output = sd.OutputStream(samplerate=TARGET_SAMPLE_RATE, channels=TARGET_CHANNELS,
+                                                     dtype="float32")
+                            output.start()
+                            playback_start_time = time.time()
+                            print(f"▶️  Starting audio playback at: {playback_start_time:.3f}s")
+                        if self.on_playback_audio:
+                            self.on_playback_audio(audio_chunk, TARGET_SAMPLE_RATE)
+                        # Blocks until the chunk is queued on the device, so playback stays gapless
+                        output.write(np.ascontiguousarray(audio_chunk, dtype=np.float32).reshape(-1, 1))
+                        played_samples += len(audio_chunk)
+                        
                         expected_index += 1
                         
                 except queue.Empty:
                     continue
             
-            # Combine all audio and play directly
-            if all_audio:
-                combined_audio = np.concatenate(all_audio)
-                print(f"Combined audio: {len(combined_audio)} samples")
-                
-                # Record playback start time
-                playback_start_time = time.time()
-                print(f"▶️  Starting audio playback at: {playback_start_time:.3f}s")
-                
-                # Play the audio using sounddevice
-                print("Starting audio playback...")
-                sd.play(combined_audio, TARGET_SAMPLE_RATE)
-                sd.wait()  # Wait for playback to finish
-                
-                playback_end_time = time.time()
-                playback_duration = playback_end_time - playback_start_time
-                print(f"✅ Audio playback completed. Duration: {playback_duration:.3f}s")
-                
-                print("Audio playback completed")
+            if output is not None:
+                playback_duration = time.time() - playback_start_time
+                print(f"✅ Audio playback completed. Duration: {playback_duration:.3f}s ({played_samples} samples)")
                 
         except Exception as e:
             print(f"Error streaming audio: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            if output is not None:
+                # stop() lets the buffered audio finish playing
+                output.stop()
+                output.close()
     
     def stop_streaming(self):
         """Stop the streaming process."""
@@ -583,6 +620,8 @@ class StreamingTTSProcessor:
                 
                 # Play the audio using sounddevice
                 print("Starting audio playback...")
+                if self.on_playback_audio:
+                    self.on_playback_audio(combined_audio, TARGET_SAMPLE_RATE)
                 sd.play(combined_audio, TARGET_SAMPLE_RATE)
                 sd.wait()  # Wait for playback to finish
                 
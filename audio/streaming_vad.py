@@ -0,0 +1,179 @@
+"""
+Module for frame-level streaming voice activity detection using Silero VAD.
+"""
+
+import logging
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class VADEvent:
+    """Represents a speech onset or offset detected by the streaming VAD."""
+    event_type: str  # "start" or "end"
+    sample: int  # Stream position (in samples) of the frame that triggered the event
+    probability: float
+
+class SpeechStateTracker:
+    def __init__(self, threshold: float = 0.5, neg_threshold: Optional[float] = None,
+                 min_speech_frames: int = 1, min_silence_frames: int = 1):
+        """
+        Hysteresis state machine that turns per-frame speech probabilities into onset/offset events.
+
+        Args:
+            threshold: Probability at or above which a frame counts as speech
+            neg_threshold: Probability below which a frame counts as silence (default: threshold - 0.15)
+            min_speech_frames: Consecutive speech frames required to emit an onset
+            min_silence_frames: Consecutive silence frames required to emit an offset
+        """
+        self.threshold = threshold
+        self.neg_threshold = neg_threshold if neg_threshold is not None else max(threshold - 0.15, 0.01)
+        self.min_speech_frames = max(1, min_speech_frames)
+        self.min_silence_frames = max(1, min_silence_frames)
+        self.reset()
+
+    def reset(self):
+        """Reset the tracker to the silence state."""
+        self.is_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+
+    def update(self, probability: float, sample: int) -> Optional[VADEvent]:
+        """
+        Feed the probability of one frame and return an event if the state changed.
+
+        Args:
+            probability: Speech probability of the frame
+            sample: Stream position of the frame
+
+        Returns:
+            VADEvent on a state transition, None otherwise
+        """
+        if not self.is_speech:
+            # Frames between the two thresholds neither start nor extend an onset
+            self._speech_run = self._speech_run + 1 if probability >= self.threshold else 0
+            if self._speech_run >= self.min_speech_frames:
+                self.is_speech = True
+                self._silence_run = 0
+                return VADEvent("start", sample, probability)
+        else:
+            self._silence_run = self._silence_run + 1 if probability < self.neg_threshold else 0
+            if self._silence_run >= self.min_silence_frames:
+                self.is_speech = False
+                self._speech_run = 0
+                return VADEvent("end", sample, probability)
+        return None
+
+class StreamingVAD:
+    def __init__(self, backend, threshold: float = 0.5,
+                 neg_threshold: Optional[float] = None, min_speech_ms: int = 0,
+                 min_silence_ms: int = 0, energy_gate=None):
+        """
+        Initialize the streaming VAD.
+
+        Unlike get_speech_timestamps, which re-analyses a whole block from scratch,
+        this keeps the model's recurrent state between frames and reports transitions
+        as soon as the frame that causes them has been scored.
+
+        Args:
+            backend: VADBackend scoring one frame per call (see audio.vad_backends)
+            threshold: Speech probability threshold for onsets
+            neg_threshold: Speech probability threshold for offsets
+            min_speech_ms: Minimum speech before an onset is reported (0 = first frame)
+            min_silence_ms: Minimum silence before an offset is reported (0 = first frame)
+            energy_gate: Optional EnergyGate that lets clearly silent frames skip the model
+        """
+        self.backend = backend
+        self.energy_gate = energy_gate
+        self.sample_rate = backend.sample_rate
+        self.frame_size = backend.frame_size
+        frame_ms = 1000.0 * self.frame_size / self.sample_rate
+        self.tracker = SpeechStateTracker(
+            threshold=threshold,
+            neg_threshold=neg_threshold,
+            min_speech_frames=int(np.ceil(min_speech_ms / frame_ms)) if min_speech_ms else 1,
+            min_silence_frames=int(np.ceil(min_silence_ms / frame_ms)) if min_silence_ms else 1
+        )
+
+        # Partial frame carried over between calls
+        self._pending = np.zeros(self.frame_size, dtype=np.float32)
+        self._pending_len = 0
+
+        self.position = 0  # Samples scored so far
+        self.last_probability = 0.0
+        self.reset()
+
+    @property
+    def is_speech(self) -> bool:
+        """Whether the stream is currently inside a speech segment."""
+        return self.tracker.is_speech
+
+    def reset(self):
+        """Reset model state, pending samples and the speech tracker."""
+        self.backend.reset_states()
+        self.tracker.reset()
+        if self.energy_gate:
+            self.energy_gate.reset()
+        self._pending_len = 0
+        self.position = 0
+        self.last_probability = 0.0
+
+    def process(self, audio_data: np.ndarray) -> List[VADEvent]:
+        """
+        Feed audio of any length and return the events detected in it.
+
+        Samples that do not fill a whole frame are kept for the next call.
+
+        Args:
+            audio_data: Mono float32 audio
+
+        Returns:
+            List of VADEvent objects in stream order
+        """
+        events = []
+        audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
+        offset = 0
+
+        # Complete a frame left over from the previous call
+        if self._pending_len:
+            needed = self.frame_size - self._pending_len
+            taken = audio_data[:needed]
+            self._pending[self._pending_len:self._pending_len + len(taken)] = taken
+            self._pending_len += len(taken)
+            offset = len(taken)
+            if self._pending_len < self.frame_size:
+                return events
+            self._pending_len = 0
+            event = self._process_frame(self._pending)
+            if event:
+                events.append(event)
+
+        # Score whole frames directly from the input
+        while offset + self.frame_size <= len(audio_data):
+            event = self._process_frame(audio_data[offset:offset + self.frame_size])
+            if event:
+                events.append(event)
+            offset += self.frame_size
+
+        remaining = len(audio_data) - offset
+        if remaining:
+            self._pending[:remaining] = audio_data[offset:]
+            self._pending_len = remaining
+
+        return events
+
+    def _process_frame(self, frame: np.ndarray) -> Optional[VADEvent]:
+        """Run the model on one frame and update the speech state."""
+        if self.energy_gate and not self.energy_gate.should_run(frame, self.tracker.is_speech):
+            self.backend.skip(frame)
+            probability = 0.0
+        else:
+            probability = self.backend(frame)
+            if self.energy_gate:
+                self.energy_gate.observe(probability, self.tracker.neg_threshold)
+        self.last_probability = probability
+        event = self.tracker.update(probability, self.position)
+        self.position += self.frame_size
+        return event
@@ -0,0 +1,275 @@
+"""
+Module with pluggable speech recognition backends.
+"""
+
+import io
+import time
+import queue
+import logging
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+from concurrent.futures import Future
+from threading import Thread
+from typing import Callable, List, Optional, Tuple
+
+from audio.resampler import resample
+
+logger = logging.getLogger(__name__)
+
+FLAC_COMPRESSION_LEVEL = 0.5  # libsndfile scale 0..1; speech at 16kHz gains little from slower levels
+WHISPER_SAMPLE_RATE = 16000  # Whisper models only take 16kHz audio
+
+Request = Tuple[np.ndarray, int]
+
+class InMemoryAudioData(sr.AudioData):
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        """
+        Recognizer input built from int16 samples that encodes FLAC in-process.
+
+        speech_recognition's AudioData pipes a WAV through the bundled flac
+        binary for every request; this encodes with libsndfile (via soundfile)
+        straight into memory, so recognition needs no subprocess and no files.
+
+        Args:
+            samples: Mono int16 samples
+            sample_rate: Sample rate of the samples
+        """
+        self.samples = np.ascontiguousarray(samples, dtype=np.int16)
+        super().__init__(self.samples.tobytes(), sample_rate, 2)
+
+    @classmethod
+    def from_float(cls, audio: np.ndarray, sample_rate: int) -> "InMemoryAudioData":
+        """Build from float32 audio in [-1, 1]."""
+        return cls((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16), sample_rate)
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        if (convert_rate is not None and convert_rate != self.sample_rate) or convert_width not in (None, 2):
+            # Conversions are left to speech_recognition
+            return super().get_flac_data(convert_rate, convert_width)
+        buffer = io.BytesIO()
+        sf.write(buffer, self.samples, self.sample_rate, format="FLAC", subtype="PCM_16",
+                 compression_level=FLAC_COMPRESSION_LEVEL)
+        return buffer.getvalue()
+
+class STTBackend:
+    """
+    Interface for speech recognizers.
+
+    transcribe() returns the text, or None when no speech was recognized, and
+    raises on errors (network, model) so callers can tell both apart.
+    """
+    name = "base"
+    is_local = False  # Runs on this machine (no network round-trip)
+
+    def __init__(self, language: str = "es"):
+        self.language = language
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> Optional[str]:
+        """Recognize mono float32 audio."""
+        raise NotImplementedError
+
+    def transcribe_batch(self, requests: List[Request]) -> List[Optional[str]]:
+        """Recognize several utterances; backends that can decode them together override this."""
+        return [self.transcribe(audio, sample_rate) for audio, sample_rate in requests]
+
+    def warmup(self):
+        """Run a throw-away recognition so the first real turn does not pay for initialization."""
+        pass
+
+    def close(self):
+        """Release threads and models."""
+        pass
+
+class GoogleSTTBackend(STTBackend):
+    name = "google"
+
+    def __init__(self, language: str = "es", timeout: Optional[float] = None):
+        """
+        Google Web Speech API through speech_recognition (one HTTPS request per utterance).
+
+        Args:
+            language: Recognition language
+            timeout: Seconds before a request is abandoned (None waits indefinitely)
+        """
+        super().__init__(language)
+        self.recognizer = sr.Recognizer()
+        self.recognizer.operation_timeout = timeout
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> Optional[str]:
+        return self.recognize(InMemoryAudioData.from_float(audio, sample_rate))
+
+    def recognize(self, audio_data: sr.AudioData) -> Optional[str]:
+        """Recognize an sr.AudioData (e.g. read from a file)."""
+        try:
+            return self.recognizer.recognize_google(audio_data, language=self.language)
+        except sr.UnknownValueError:
+            return None
+
+class BatchingDecoder:
+    def __init__(self, decode_batch: Callable[[List[Request]], List[Optional[str]]], max_batch: int = 8,
+                 name: str = "stt-decoder"):
+        """
+        Single decoding thread that groups requests waiting at the same time into one batch.
+
+        Requests that arrive while a batch is being decoded (e.g. the segments
+        of a long turn, or turns from several recorders) are decoded together
+        in the next call, which costs little more than decoding one of them.
+
+        Args:
+            decode_batch: Function decoding a list of (audio, sample_rate) requests, results in order
+            max_batch: Largest number of requests decoded in one call
+            name: Name of the decoding thread
+        """
+        self.decode_batch = decode_batch
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.metrics = {"requests": 0, "batches": 0, "max_batch": 0}
+        self._thread = Thread(target=self._decode_loop, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, audio: np.ndarray, sample_rate: int) -> Future:
+        """Queue a request; the future resolves to its text."""
+        future = Future()
+        self.requests.put((future, audio, sample_rate))
+        return future
+
+    def decode(self, audio: np.ndarray, sample_rate: int) -> Optional[str]:
+        """Queue a request and wait for its text."""
+        return self.submit(audio, sample_rate).result()
+
+    def close(self):
+        self.requests.put(None)
+        self._thread.join(timeout=2.0)
+
+    def _decode_loop(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.requests.put(None)
+                    break
+                batch.append(item)
+            batch = [entry for entry in batch if entry[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            self.metrics["requests"] += len(batch)
+            self.metrics["batches"] += 1
+            self.metrics["max_batch"] = max(self.metrics["max_batch"], len(batch))
+            try:
+                texts = self.decode_batch([(audio, sample_rate) for _, audio, sample_rate in batch])
+                for (future, _, _), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as e:
+                for future, _, _ in batch:
+                    future.set_exception(e)
+
+class WhisperSTTBackend(STTBackend):
+    name = "whisper"
+    is_local = True
+
+    def __init__(self, language: str = "es", model: str = "small", compute_type: str = "int8",
+                 cpu_threads: int = 4, max_batch: int = 8, beam_size: int = 1, download_root: Optional[str] = None):
+        """
+        Whisper on the CPU with faster-whisper (CTranslate2), loaded once and kept in memory.
+
+        Requires faster-whisper 1.1.0 or later: batches are decoded with
+        BatchedInferencePipeline and one clip_timestamps entry per utterance.
+
+        Args:
+            language: Recognition language (fixed, so no language detection pass is needed)
+            model: Model size or path, e.g. "base", "small", "large-v3-turbo" or a local CTranslate2 directory
+            compute_type: Weight quantization; "int8" keeps "small" at about 250MB and runs
+                several times faster than float32 on the CPU
+            cpu_threads: Threads used by the model (the thread budget for recognition)
+            max_batch: Queued utterances decoded together in one batch
+            beam_size: Beam width (1 = greedy, fastest)
+            download_root: Directory for downloaded models (default: the Hugging Face cache)
+        """
+        super().__init__(language)
+        from faster_whisper import WhisperModel, BatchedInferencePipeline
+
+        start = time.perf_counter()
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads,
+                                  num_workers=1, download_root=download_root)
+        self.pipeline = BatchedInferencePipeline(self.model)
+        self.beam_size = beam_size
+        self.max_batch = max_batch
+        logger.info(f"Loaded Whisper {model} ({compute_type}, {cpu_threads} threads) "
+                    f"in {time.perf_counter() - start:.1f}s")
+        # One thread owns the model; concurrent callers are batched
+        self.decoder = BatchingDecoder(self._decode_batch, max_batch=max_batch, name="whisper-decoder")
+
+    def transcribe(self, audio: np.ndarray, sample_rate: int) -> Optional[str]:
+        return self.decoder.decode(audio, sample_rate)
+
+    def transcribe_batch(self, requests: List[Request]) -> List[Optional[str]]:
+        futures = [self.decoder.submit(audio, sample_rate) for audio, sample_rate in requests]
+        return [future.result() for future in futures]
+
+    def warmup(self):
+        start = time.perf_counter()
+        rng = np.random.default_rng(0)
+        self.transcribe((0.01 * rng.standard_normal(WHISPER_SAMPLE_RATE)).astype(np.float32), WHISPER_SAMPLE_RATE)
+        logger.info(f"Whisper warm-up took {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def close(self):
+        self.decoder.close()
+
+    def _decode_batch(self, requests: List[Request]) -> List[Optional[str]]:
+        """Decode utterances in one batched call, one clip per utterance."""
+        pieces = []
+        clips = []
+        position = 0
+        for audio, sample_rate in requests:
+            if sample_rate != WHISPER_SAMPLE_RATE:
+                audio = resample(audio, sample_rate, WHISPER_SAMPLE_RATE)
+            audio = np.asarray(audio, dtype=np.float32)
+            pieces.append(audio)
+            clips.append({"start": position / WHISPER_SAMPLE_RATE,
+                          "end": (position + len(audio)) / WHISPER_SAMPLE_RATE})
+            position += len(audio)
+
+        segments, _ = self.pipeline.transcribe(
+            np.concatenate(pieces),
+            language=self.language,
+            clip_timestamps=clips,
+            batch_size=len(requests),
+            beam_size=self.beam_size,
+            without_timestamps=True
+        )
+        # Segments start inside the clip they were decoded from
+        texts = [[] for _ in requests]
+        starts = np.array([clip["start"] for clip in clips])
+        for segment in segments:
+            index = int(np.searchsorted(starts, segment.start + 1e-3, side="right")) - 1
+            texts[max(index, 0)].append(segment.text.strip())
+        return [" ".join(t for t in parts if t) or None for parts in texts]
+
+def create_stt_backend(name: str, language: str = "es", **kwargs) -> STTBackend:
+    """
+    Create a speech recognition backend by name.
+
+    Args:
+        name: "google" or "whisper"
+        language: Recognition language
+        **kwargs: Backend options (google: timeout; whisper: model, compute_type, cpu_threads,
+            max_batch, beam_size, download_root)
+
+    Returns:
+        STTBackend instance
+    """
+    if name == "google":
+        return GoogleSTTBackend(language, **kwargs)
+    if name == "whisper":
+        return WhisperSTTBackend(language, **kwargs)
+    raise ValueError(f"Unknown STT backend: {name}")
@@ -2,7 +2,6 @@
 Module for converting text to speech using ElevenLabs with streaming support.
 """
 
-import requests
 import json
 import logging
 import os
@@ -12,6 +11,7 @@ import tempfile
 import numpy as np
 import grpc
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pynput import keyboard
 from pydub import AudioSegment
 from datetime import datetime
@@ -22,6 +22,7 @@ from utils.config import (
 from proto import audio2face_pb2
 from proto import audio2face_pb2_grpc
 from audio.audio_player import AudioPlayer
+from utils.http_transport import get_transport
 
 logger = logging.getLogger(__name__)
 
@@ -197,8 +198,9 @@ class TextToSpeech:
             "voice_settings": self.voice_settings
         }
         
+        response = None
         try:
-            response = requests.post(url, json=data, headers=headers, stream=True)
+            response = get_transport().post(url, json=data, headers=headers, stream=True)
             
             if response.status_code != 200:
                 logger.error(f"ElevenLabs API Error: {response.status_code} - {response.text}")
@@ -233,6 +235,10 @@ class TextToSpeech:
         except Exception as e:
             logger.error(f"Error streaming from ElevenLabs: {e}")
             return
+        finally:
+            # A fully read response has already gone back to the pool; an abandoned one is dropped
+            if response is not None:
+                response.close()
 
     def stream_audio_from_elevenlabs(self, text):
         """
@@ -257,7 +263,7 @@ class TextToSpeech:
         
         try:
             log_time(f"Requesting audio from ElevenLabs API for text: '{text[:30]}...'")
-            response = requests.post(url, json=data, headers=headers, stream=True)
+            response = get_transport().post(url, json=data, headers=headers, stream=True)
             
             if response.status_code != 200:
                 error_msg = f"ElevenLabs API Error: {response.status_code} - {response.text}"
@@ -453,6 +459,39 @@ class TextToSpeech:
             traceback.print_exc()
             return False
             
+    def warm_up(self, text: str = "", connections: int = 1) -> bool:
+        """
+        Open connections to ElevenLabs before they are needed.
+        
+        Args:
+            text: Text of a tiny TTS request on the first connection (empty: the models are
+                listed instead, which costs no characters)
+            connections: Connections opened at the same time (one per streaming TTS worker)
+            
+        Returns:
+            True if every request succeeded
+        """
+        if not self.api_key or self.api_key == "your_elevenlabs_api_key_here":
+            return False
+            
+        def list_models():
+            response = get_transport().get("https://api.elevenlabs.io/v1/models",
+                                           headers={"Accept": "application/json", "xi-api-key": self.api_key})
+            return response.status_code == 200
+            
+        def synthesize():
+            response = get_transport().post(
+                f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/stream",
+                json={"text": text, "model_id": self.model_id, "voice_settings": self.voice_settings},
+                headers={"Accept": "audio/mpeg", "Content-Type": "application/json", "xi-api-key": self.api_key}
+            )
+            return response.status_code == 200
+            
+        warm_requests = [synthesize if text else list_models] + [list_models] * (connections - 1)
+        # Concurrent requests each take their own connection, which then stays in the pool
+        with ThreadPoolExecutor(max_workers=len(warm_requests)) as executor:
+            return all(executor.map(lambda warm_request: warm_request(), warm_requests))
+            
     def test_voices(self):
         """
         List available voices from ElevenLabs.
@@ -469,7 +508,7 @@ class TextToSpeech:
                 "xi-api-key": self.api_key
             }
             
-            response = requests.get(voices_url, headers=headers)
+            response = get_transport().get(voices_url, headers=headers)
             
             if response.status_code == 200:
                 voices = response.json()
@@ -500,7 +539,7 @@ class TextToSpeech:
                 "xi-api-key": self.api_key
             }
             
-            response = requests.get(models_url, headers=headers)
+            response = get_transport().get(models_url, headers=headers)
             
             if response.status_code == 200:
                 models = response.json()
@@ -0,0 +1,33 @@
+"""
+Module for completed utterances handed from the recorder to the processing pipeline.
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from audio.streaming_vad import VADEvent
+from audio.streaming_stt import StreamingSTTSession
+from audio.speculative_stt import Speculation
+
+@dataclass
+class Utterance:
+    """A finished recording with its timing and VAD metadata."""
+    audio: np.ndarray  # Mono float32 audio for recognition (silence trimmed if enabled)
+    sample_rate: int
+    start_time: float  # Wall-clock time of the first sample
+    detected_time: float  # Wall-clock time the speech onset was detected
+    end_time: float  # Wall-clock time the end of speech was detected
+    onset_sample: Optional[int] = None  # VAD stream position of the onset (streaming mode)
+    end_sample: Optional[int] = None  # VAD stream position of the end decision (streaming mode)
+    vad_events: List[VADEvent] = field(default_factory=list)
+    interruption: bool = False  # Started while the avatar was speaking
+    untrimmed_audio: Optional[np.ndarray] = None  # Full recording including the pre-roll, when audio was trimmed
+    stt_session: Optional[StreamingSTTSession] = None  # Streaming recognition of the turn, when enabled
+    speculation: Optional[Speculation] = None  # Recognition started at the last VAD offset, when enabled
+    pauses: List[int] = field(default_factory=list)  # Samples of `audio` in the middle of VAD pauses (segment split points)
+
+    @property
+    def duration(self) -> float:
+        """Length of the audio in seconds."""
+        return len(self.audio) / self.sample_rate
@@ -0,0 +1,337 @@
+"""
+Module with pluggable Silero VAD inference backends.
+"""
+
+import os
+import gc
+import time
+import platform
+import logging
+import urllib.request
+import numpy as np
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Silero VAD is trained on fixed-size frames (32ms at both supported rates)
+SILERO_FRAME_SIZES = {16000: 512, 8000: 256}
+
+# Samples of the previous frame the ONNX model expects in front of each frame
+SILERO_CONTEXT_SIZES = {16000: 64, 8000: 32}
+
+SILERO_ONNX_URL = "https://github.com/snakers4/silero-vad/raw/master/src/silero_vad/data/silero_vad.onnx"
+
+class VADBackend:
+    """
+    Interface for per-frame speech probability models.
+
+    A backend scores one frame of `frame_size` float32 samples at a time and
+    keeps its recurrent state between calls until reset_states() is called.
+    """
+    name = "base"
+
+    def __init__(self, sample_rate: int = 16000):
+        if sample_rate not in SILERO_FRAME_SIZES:
+            raise ValueError(f"Silero VAD supports sample rates {list(SILERO_FRAME_SIZES)}, got {sample_rate}")
+        self.sample_rate = sample_rate
+        self.frame_size = SILERO_FRAME_SIZES[sample_rate]
+
+    def __call__(self, frame: np.ndarray) -> float:
+        """Return the speech probability of one frame."""
+        raise NotImplementedError
+
+    def reset_states(self):
+        """Forget the recurrent state (start of a new stream)."""
+        raise NotImplementedError
+
+    def skip(self, frame: np.ndarray):
+        """Account for a frame that was not scored (e.g. bypassed by the energy gate)."""
+        pass
+
+    def run_batch(self, inputs: np.ndarray, states: np.ndarray):
+        """
+        Score one frame for each of several independent streams in a single call.
+
+        Args:
+            inputs: (batch, context + frame) float32 frames, each prefixed with its stream's context
+            states: (2, batch, 128) float32 recurrent state of each stream
+
+        Returns:
+            Tuple of (probabilities with shape (batch,), updated states)
+        """
+        raise NotImplementedError(f"The {self.name} VAD backend does not support batched inference")
+
+class SileroTorchBackend(VADBackend):
+    name = "torch"
+
+    def __init__(self, sample_rate: int = 16000, num_threads: Optional[int] = None):
+        """
+        TorchScript Silero VAD loaded through torch.hub.
+
+        Args:
+            sample_rate: Sample rate of the audio to score
+            num_threads: Size of torch's intra-op thread pool (None keeps torch's default)
+        """
+        super().__init__(sample_rate)
+        import torch
+        self.torch = torch
+        if num_threads:
+            # Note: this is process-wide for torch
+            torch.set_num_threads(num_threads)
+        self.model = None
+        self.utils = None
+        self.get_speech_timestamps = None
+        self._load_model()
+
+    def __call__(self, frame: np.ndarray) -> float:
+        return self.model(self.torch.from_numpy(frame), self.sample_rate).item()
+
+    def reset_states(self):
+        self.model.reset_states()
+
+    def get_speech_segments(self, audio_data: np.ndarray, min_speech_duration_ms: int,
+                            min_silence_duration_ms: int) -> list:
+        """Run the stateless get_speech_timestamps over a whole block (chunk mode)."""
+        return self.get_speech_timestamps(
+            self.torch.from_numpy(audio_data).float(),
+            self.model,
+            sampling_rate=self.sample_rate,
+            min_speech_duration_ms=min_speech_duration_ms,
+            min_silence_duration_ms=min_silence_duration_ms
+        )
+
+    def _load_model(self):
+        """Load the Silero VAD model."""
+        try:
+            print("DEBUG: _load_model started")
+            logger.info("Loading Silero VAD model...")
+            import torch
+            
+            # Check if model is already cached
+            cache_dir = torch.hub.get_dir()
+            model_path = f"{cache_dir}/snakers4_silero-vad_master"
+            if os.path.exists(model_path):
+                logger.info("Using cached Silero VAD model")
+                print("DEBUG: Using cached model")
+            else:
+                logger.info("Downloading Silero VAD model (this may take a few minutes on first run)...")
+                print("DEBUG: Will download model")
+            
+            # Windows-specific workaround for torch.hub.load issues
+            if platform.system() == "Windows":
+                print("DEBUG: Windows detected, using workaround for torch.hub.load")
+                # Set environment variables to help with Windows file handling
+                os.environ['TORCH_HOME'] = cache_dir
+                os.environ['HF_HOME'] = cache_dir
+                
+                # Try to clear any existing file handles
+                gc.collect()
+                
+                # Add a small delay to let Windows file system settle
+                time.sleep(1)
+            
+            print("DEBUG: About to call torch.hub.load")
+            
+            # Try multiple approaches for loading the model
+            max_retries = 3
+            for attempt in range(max_retries):
+                try:
+                    self.model, self.utils = torch.hub.load(
+                        repo_or_dir='snakers4/silero-vad', 
+                        model='silero_vad', 
+                        force_reload=False,  # Use cached model if available
+                        trust_repo=True  # Trust the repository
+                    )
+                    print(f"DEBUG: torch.hub.load completed successfully on attempt {attempt + 1}")
+                    break
+                except Exception as e:
+                    print(f"DEBUG: Attempt {attempt + 1} failed: {e}")
+                    if attempt < max_retries - 1:
+                        print(f"DEBUG: Retrying in 2 seconds...")
+                        time.sleep(2)
+                        # Force garbage collection before retry
+                        gc.collect()
+                    else:
+                        # If all torch.hub.load attempts fail, try alternative method
+                        print("DEBUG: All torch.hub.load attempts failed, trying alternative method")
+                        self._load_model_alternative()
+                        return
+            
+            self.get_speech_timestamps = self.utils[0]
+            print("DEBUG: get_speech_timestamps assigned")
+            logger.info("Silero VAD model loaded successfully")
+            print("DEBUG: _load_model completed successfully")
+            
+        except Exception as e:
+            print(f"DEBUG: Error in _load_model: {e}")
+            logger.error(f"Failed to load Silero VAD model: {e}")
+            
+            # Provide helpful error message and suggestions
+            error_msg = f"Failed to load Silero VAD model: {e}"
+            if "Controlador no válido" in str(e) or "Invalid handle" in str(e):
+                error_msg += "\n\nThis is a Windows-specific file handle issue. Try the following:"
+                error_msg += "\n1. Restart your Python environment"
+                error_msg += "\n2. Clear the model cache: python utils/check_cache.py clear"
+                error_msg += "\n3. Run as administrator if the issue persists"
+                error_msg += "\n4. Check if antivirus software is blocking the download"
+            
+            logger.error(error_msg)
+            raise RuntimeError(error_msg)
+        
+    def _load_model_alternative(self):
+        """Alternative method to load Silero VAD model using direct import."""
+        try:
+            print("DEBUG: Using alternative VAD model loading method")
+            logger.info("Loading Silero VAD model using alternative method...")
+            
+            # Try to import silero-vad directly
+            try:
+                from silero_vad import load_model, get_speech_timestamps
+                self.model = load_model()
+                self.get_speech_timestamps = get_speech_timestamps
+                print("DEBUG: Successfully loaded using direct silero_vad import")
+                logger.info("Silero VAD model loaded using direct import")
+                return
+            except ImportError:
+                print("DEBUG: silero_vad package not available, trying manual download")
+            
+            # Manual download and setup
+            import torch
+            import zipfile
+            import tempfile
+            
+            # Download the model files manually
+            model_url = "https://github.com/snakers4/silero-vad/archive/refs/heads/master.zip"
+            cache_dir = torch.hub.get_dir()
+            model_path = f"{cache_dir}/snakers4_silero-vad_master"
+            
+            if not os.path.exists(model_path):
+                print("DEBUG: Downloading model manually...")
+                with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
+                    urllib.request.urlretrieve(model_url, temp_file.name)
+                    
+                    # Extract the zip file
+                    with zipfile.ZipFile(temp_file.name, 'r') as zip_ref:
+                        zip_ref.extractall(cache_dir)
+                
+                # Clean up temp file
+                os.unlink(temp_file.name)
+            
+            # Now try to load using torch.hub.load with local path
+            self.model, self.utils = torch.hub.load(
+                repo_or_dir=model_path,
+                model='silero_vad',
+                source='local'
+            )
+            
+            self.get_speech_timestamps = self.utils[0]
+            print("DEBUG: Alternative method completed successfully")
+            logger.info("Silero VAD model loaded using alternative method")
+            
+        except Exception as e:
+            print(f"DEBUG: Alternative method also failed: {e}")
+            raise RuntimeError(f"All methods to load Silero VAD model failed: {e}")
+
+class SileroOnnxBackend(VADBackend):
+    name = "onnx"
+
+    def __init__(self, sample_rate: int = 16000, model_path: Optional[str] = None, num_threads: int = 1):
+        """
+        Silero VAD running on ONNX Runtime without importing torch.
+
+        The input frame (with its context prefix) and the recurrent state are
+        preallocated once and reused for every inference call.
+
+        Args:
+            sample_rate: Sample rate of the audio to score
+            model_path: Path to silero_vad.onnx (located or downloaded if not given)
+            num_threads: Intra-op threads for the session (1 is fastest for 32ms frames)
+        """
+        super().__init__(sample_rate)
+        import onnxruntime
+
+        self.model_path = model_path or find_silero_onnx_model()
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        self.context_size = SILERO_CONTEXT_SIZES[sample_rate]
+        self._input = np.zeros((1, self.context_size + self.frame_size), dtype=np.float32)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._inputs = {
+            "input": self._input,
+            "state": self._state,
+            "sr": np.array(sample_rate, dtype=np.int64)
+        }
+        logger.info(f"Silero VAD ONNX model loaded from {self.model_path} ({num_threads} thread(s))")
+
+    def __call__(self, frame: np.ndarray) -> float:
+        self._input[0, self.context_size:] = frame
+        output, state = self.session.run(None, self._inputs)
+        self._state[...] = state
+        # The tail of this frame is the context of the next one
+        self._input[0, :self.context_size] = self._input[0, -self.context_size:]
+        return float(output[0, 0])
+
+    def reset_states(self):
+        self._input.fill(0.0)
+        self._state.fill(0.0)
+
+    def skip(self, frame: np.ndarray):
+        # Keep the context aligned with the stream so the next scored frame sees its real predecessor
+        self._input[0, :self.context_size] = frame[-self.context_size:]
+
+    def run_batch(self, inputs: np.ndarray, states: np.ndarray):
+        output, state = self.session.run(None, {
+            "input": inputs,
+            "state": states,
+            "sr": self._inputs["sr"]
+        })
+        return output[:, 0], state
+
+def find_silero_onnx_model() -> str:
+    """
+    Locate silero_vad.onnx without importing torch.
+
+    Looks in the installed silero-vad package first and downloads the model
+    into the user cache directory otherwise.
+    """
+    import importlib.util
+    spec = importlib.util.find_spec("silero_vad")
+    if spec and spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            candidate = os.path.join(location, "data", "silero_vad.onnx")
+            if os.path.exists(candidate):
+                return candidate
+
+    cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "silero_vad")
+    model_path = os.path.join(cache_dir, "silero_vad.onnx")
+    if not os.path.exists(model_path):
+        logger.info("Downloading Silero VAD ONNX model...")
+        os.makedirs(cache_dir, exist_ok=True)
+        urllib.request.urlretrieve(SILERO_ONNX_URL, model_path + ".part")
+        os.replace(model_path + ".part", model_path)
+    return model_path
+
+def create_vad_backend(name: str = "torch", sample_rate: int = 16000, **kwargs) -> VADBackend:
+    """
+    Create a VAD backend by name.
+
+    Args:
+        name: "torch" or "onnx"
+        sample_rate: Sample rate of the audio to score
+        **kwargs: Backend-specific options (num_threads; model_path for onnx)
+
+    Returns:
+        VADBackend instance
+    """
+    if name == "onnx":
+        return SileroOnnxBackend(sample_rate=sample_rate, **kwargs)
+    if name == "torch":
+        return SileroTorchBackend(sample_rate=sample_rate, num_threads=kwargs.get("num_threads"))
+    raise ValueError(f"Unknown VAD backend: {name}")
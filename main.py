@@ -7,6 +7,8 @@ Main entry point for the voice assistant application.
 import sys
 import os
 import signal
+import time
+from contextlib import nullcontext
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -50,6 +52,15 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
+from audio.segmented_stt import SegmentedRecognizer
+from audio.speculative_stt import SpeculativeRecognizer
+from utils.http_transport import get_transport
+from utils.warmup import create_warmup_manager
+from utils.config import (
+    STREAMING_STT_FINAL_TIMEOUT, STT_SPECULATIVE, STT_SPECULATIVE_TIMEOUT,
+    STT_SEGMENTED, STT_SEGMENT_MIN, STT_MAX_PARALLEL, USE_STREAMING_PIPELINE, WARMUP
+)
+
 print("All imports successful!")
 
 def main():
@@ -81,6 +92,11 @@ class VoiceAssistant:
         try:
             print("  - Step 1: Initializing SpeechToText...")
             self.speech_to_text = SpeechToText()
+            # Long turns are recognized as parallel segments cut at VAD pauses
+            self.segmented_stt = None
+            if STT_SEGMENTED:
+                self.segmented_stt = SegmentedRecognizer(self.speech_to_text.convert, max_workers=STT_MAX_PARALLEL,
+                                                         min_segment=STT_SEGMENT_MIN)
             print("  - Step 1: SpeechToText initialized")
             
             print("  - Step 2: Initializing StreamingLLMProcessor...")
@@ -92,9 +108,20 @@ class VoiceAssistant:
             print("  - Step 3: StreamingTTSProcessor initialized")
             
             print("  - Step 4: Initializing AudioRecorder...")
-            self.recorder = AudioRecorder()
+            # Speculative recognition shares this SpeechToText (its model, hedging and metrics)
+            speculative_stt = None
+            if STT_SPECULATIVE:
+                speculative_stt = SpeculativeRecognizer(self.speech_to_text.convert)
+            self.recorder = AudioRecorder(speculative_stt=speculative_stt)
             print("  - Step 4: AudioRecorder initialized")
             
+            # Connections and the local model are warmed at startup and while idle, never during a turn
+            self.warmup = None
+            if WARMUP:
+                self.warmup = create_warmup_manager(self.streaming_llm_processor, self.streaming_tts_processor.tts_processor,
+                                                    tts_connections=self.streaming_tts_processor.max_workers,
+                                                    is_busy=lambda: self.recorder.is_recording)
+            
             print("  - Step 5: Setting up streaming callbacks...")
             self._setup_streaming_callbacks()
             print("  - Step 5: Streaming callbacks set up")
@@ -121,10 +148,13 @@ class VoiceAssistant:
         def on_streaming_complete():
             print("Streaming TTS completed")
         
+        # The echo canceller needs what is sent to the speakers as its reference
+        echo_canceller = self.recorder.echo_canceller
         self.streaming_tts_processor.set_callbacks(
             on_chunk_processed=on_chunk_processed,
             on_audio_ready=on_audio_ready,
-            on_streaming_complete=on_streaming_complete
+            on_streaming_complete=on_streaming_complete,
+            on_playback_audio=echo_canceller.push_reference if echo_canceller else None
         )
         
     def setup_signal_handlers(self):
@@ -141,58 +171,145 @@ class VoiceAssistant:
         """Start the voice assistant."""
         self.setup_signal_handlers()
         self.running = True
+        if self.warmup:
+            self.warmup.start()
         self.recorder.start_listening()
         print("Voice Assistant started. Listening for speech...")
         
         try:
             while self.running:
-                # Wait for speech to be detected
-                if self.recorder.wait_for_speech(timeout=None):
-                    # Process detected speech
-                    self._process_speech()
-                    # Reset for next detection
-                    self.recorder.reset_detection_event()
+                # Wait for the next completed utterance; capture keeps running meanwhile
+                utterance = self.recorder.get_utterance(timeout=0.5)
+                if utterance is not None:
+                    with self.warmup.turn() if self.warmup else nullcontext():
+                        self._process_speech(utterance)
+                elif self.recorder.wait_for_source(timeout=0) and self.recorder.utterance_queue.empty():
+                    # A replayed file or a closed pipe has been fully processed
+                    print("Audio source finished")
+                    self.stop()
                     
         except Exception as e:
             print(f"Error in main loop: {e}")
             self.stop()
             
-    def _process_speech(self):
-        """Process detected speech through the pipeline."""
+    def _process_speech(self, utterance):
+        """Process a recorded utterance through the pipeline."""
         try:
-            print("Speech detected! Processing...")
+            queued_ms = (time.time() - utterance.end_time) * 1000
+            print(f"Speech detected! Processing {utterance.duration:.2f}s utterance (queued {queued_ms:.0f}ms)...")
             
             # Convert speech to text
-            audio_data = self.recorder.get_audio_data()
-            if audio_data is None:
+            audio_data = utterance.audio
+            if audio_data is None or not len(audio_data):
                 print("No audio data available")
                 return
                 
-            print("Converting speech to text...")
-            text = self.speech_to_text.convert(audio_data)
+            text = None
+            if utterance.stt_session is not None:
+                # Most of the turn was recognized while it was spoken
+                text = utterance.stt_session.result(timeout=STREAMING_STT_FINAL_TIMEOUT)
+                if text is None:
+                    print("Streaming transcript not available, falling back to batch recognition")
+                else:
+                    print(f"Streaming transcript ready {(time.time() - utterance.end_time) * 1000:.0f}ms after end of speech")
+            if text is None and utterance.speculation is not None:
+                # Recognition started at the VAD offset, while the endpointer was still waiting
+                text = utterance.speculation.result(timeout=STT_SPECULATIVE_TIMEOUT)
+                if text is None:
+                    print("Speculative transcript not available, recognizing the turn again")
+                else:
+                    print(f"Speculative transcript ready {(time.time() - utterance.end_time) * 1000:.0f}ms after end of speech")
+            if text is None:
+                print("Converting speech to text...")
+                if self.segmented_stt:
+                    text = self.segmented_stt.convert(audio_data, utterance.sample_rate, utterance.pauses)
+                else:
+                    text = self.speech_to_text.convert(audio_data, sample_rate=utterance.sample_rate)
             if not text or text.strip() == "":
                 print("No text detected from speech")
                 return
                 
             print(f"Transcribed text: '{text}'")
             
-            # Generate response using streaming LLM
-            print("Generating response with streaming LLM...")
-            response_text = self.streaming_llm_processor.generate_response(text)
-            if not response_text:
-                print("No response generated")
-                return
-                
-            print(f"Generated response: '{response_text}'")
-            
-            # Convert response to speech using streaming TTS
-            print("Converting response to speech...")
-            self.streaming_tts_processor.process_text(response_text)
+            if USE_STREAMING_PIPELINE:
+                if self._process_with_streaming_pipeline(text, speech_end_time=utterance.end_time):
+                    return
+                print("Streaming pipeline failed, falling back to the batch pipeline")
+            self._process_with_traditional_pipeline(text)
             
         except Exception as e:
             print(f"Error processing speech: {e}")
             import traceback
             traceback.print_exc()
+    
+    def _process_with_streaming_pipeline(self, text, speech_end_time=None):
+        """
+        Pipe the LLM token stream straight into streaming TTS.
+        
+        The first sentence is synthesized and played while the LLM is still
+        generating the rest of the response.
+        
+        Args:
+            text: Transcribed user text
+            speech_end_time: time.time() at the end of the user's speech, for the end-to-end latency
+            
+        Returns:
+            True if the response was spoken, False if no audio was produced (the caller can
+            then use the batch pipeline without repeating anything)
+        """
+        start_time = time.time()
+        llm_errors = []
+        
+        def token_stream():
+            try:
+                yield from self.streaming_llm_processor.stream_text(text)
+            except Exception as e:
+                llm_errors.append(e)
+                raise
+        
+        print("Streaming response from LLM into TTS...")
+        success = self.streaming_tts_processor.stream_text_to_speech(token_stream())
+        metrics = self.streaming_tts_processor.last_metrics
+        first_audio_time = metrics.get("playback_start_time") or metrics.get("first_audio_time")
+        
+        if first_audio_time is None:
+            reason = f"LLM error: {llm_errors[0]}" if llm_errors else "no audio was produced"
+            print(f"Streaming pipeline produced no speech ({reason})")
+            return False
+        if not success or llm_errors:
+            # Part of the response was already spoken; replaying it through the batch path would repeat it
+            print("Streaming pipeline was interrupted after speech started")
+        
+        if metrics.get("first_token_time") is not None:
+            print(f"⏱️  First LLM token {(metrics['first_token_time'] - start_time) * 1000:.0f}ms after transcript")
+        print(f"🔊 First audio {(first_audio_time - start_time) * 1000:.0f}ms after transcript"
+              + (f", {(first_audio_time - speech_end_time) * 1000:.0f}ms after end of speech" if speech_end_time else ""))
+        for host, counts in get_transport().get_metrics().items():
+            print(f"🔌 {host}: {counts['reused']}/{counts['requests']} requests on reused connections")
+        return True
+    
+    def _process_with_traditional_pipeline(self, text):
+        """
+        Generate the whole response, then synthesize it.
+        
+        Args:
+            text: Transcribed user text
+            
+        Returns:
+            True if a response was generated and sent to TTS
+        """
+        print("Generating response with streaming LLM...")
+        response_text = self.streaming_llm_processor.generate_response(text)
+        if not response_text:
+            print("No response generated")
+            return False
+            
+        print(f"Generated response: '{response_text}'")
+        
+        # Convert response to speech using streaming TTS
+        print("Converting response to speech...")
+        self.streaming_tts_processor.process_text(response_text)
+        return True
             
     def stop(self):
         """Stop the voice assistant."""
@@ -200,6 +317,11 @@ class VoiceAssistant:
         self.running = False
         if self.recorder:
             self.recorder.stop()
+        if self.warmup:
+            self.warmup.stop()
+        # Keeps the provider statistics for the next start
+        self.streaming_llm_processor.close()
+        get_transport().close()
         print("Voice Assistant stopped")
 
 if __name__ == "__main__":
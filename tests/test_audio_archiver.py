@@ -0,0 +1,77 @@
+"""
+Test script for in-memory speech-to-text input and the background audio archiver.
+"""
+
+import sys
+import os
+import time
+import wave
+import tempfile
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.audio_archiver import AudioArchiver
+from audio.utterance import Utterance
+from audio.speech_to_text import SpeechToText
+from audio.stt_backends import GoogleSTTBackend
+
+SAMPLE_RATE = 16000
+
+def make_utterance(seconds=1.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    now = time.time()
+    return Utterance(audio=audio, sample_rate=SAMPLE_RATE, start_time=now - seconds,
+                     detected_time=now - seconds, end_time=now)
+
+def test_archive_does_not_block():
+    """archive() returns immediately; the file appears once the writer thread ran."""
+    print("Testing background archiver...")
+    with tempfile.TemporaryDirectory() as directory:
+        archiver = AudioArchiver(directory)
+        archiver.start()
+        utterance = make_utterance()
+
+        start = time.perf_counter()
+        assert archiver.archive(utterance, name="turn.wav")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        archiver.stop()
+
+        with wave.open(os.path.join(directory, "turn.wav"), "rb") as wf:
+            assert wf.getframerate() == SAMPLE_RATE
+            assert wf.getnframes() == len(utterance.audio)
+        assert archiver.get_metrics()["archived"] == 1
+        print(f"✓ archive() took {elapsed_ms:.3f}ms")
+
+def test_archive_queue_full():
+    """A full queue drops utterances instead of blocking the caller."""
+    archiver = AudioArchiver(tempfile.gettempdir(), max_queue=1)
+    assert archiver.archive(make_utterance(0.1), name="a.wav")
+    assert not archiver.archive(make_utterance(0.1), name="b.wav")
+    assert archiver.get_metrics()["dropped"] == 1
+
+def test_speech_to_text_in_memory():
+    """convert() hands the recognizer 16-bit PCM built in memory."""
+    print("Testing in-memory speech-to-text input...")
+    stt = SpeechToText(backend=GoogleSTTBackend())
+    captured = {}
+
+    def fake_recognize(audio_data):
+        captured["audio"] = audio_data
+        return "hola"
+
+    stt.backend.recognize = fake_recognize
+    utterance = make_utterance()
+    assert stt.convert(utterance.audio, sample_rate=SAMPLE_RATE) == "hola"
+    audio = captured["audio"]
+    assert audio.sample_rate == SAMPLE_RATE and audio.sample_width == 2
+    assert len(audio.get_raw_data()) == 2 * len(utterance.audio)
+    print("✓ No temporary WAV file needed")
+
+if __name__ == "__main__":
+    test_archive_does_not_block()
+    test_archive_queue_full()
+    test_speech_to_text_in_memory()
+    print("All audio archiver tests passed")
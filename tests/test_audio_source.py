@@ -0,0 +1,131 @@
+"""
+Test script for the audio source layer: file replay and socket input drive the recorder without a microphone.
+"""
+
+import sys
+import os
+import time
+import socket
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.audio_source import FileSource, SocketSource, create_audio_source, DeviceSource
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+from audio.audio_recorder import AudioRecorder
+from utils.config import SILENCE_TIMEOUT
+
+SAMPLE_RATE = 16000
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern, rate=SAMPLE_RATE):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * rate)
+        if is_speech:
+            t = np.arange(n) / rate
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def test_file_source_blocks():
+    """A file is delivered in whole blocks followed by trailing silence, then finishes."""
+    print("Testing file source...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tone.wav")
+        sf.write(path, make_audio([(1.0, True)]), SAMPLE_RATE)
+        source = FileSource(path, realtime=False, trailing_silence=0.5)
+        blocks = []
+        source.start(blocks.append, 512)
+        assert source.finished.wait(5.0)
+        source.stop()
+
+    assert all(len(block) == 512 for block in blocks)
+    assert len(blocks) == int(np.ceil(SAMPLE_RATE / 512)) + int(0.5 * SAMPLE_RATE / 512)
+    assert not source.paced
+    print(f"✓ {len(blocks)} blocks delivered")
+
+def test_recorder_replays_file():
+    """A 48kHz file drives the whole recorder (resampling, VAD, endpointing) faster than real time."""
+    print("Testing recorder on a file source...")
+    pause = SILENCE_TIMEOUT + 0.5
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "turns.wav")
+        sf.write(path, make_audio([(0.5, False), (1.0, True), (pause, False), (0.8, True)], 48000), 48000)
+        recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()), source=FileSource(path, realtime=False))
+        assert recorder.device_rate == 48000 and recorder.resampler is not None
+
+        start = time.perf_counter()
+        recorder.start_listening()
+        assert recorder.wait_for_source(timeout=20.0)
+        elapsed = time.perf_counter() - start
+        utterances = [recorder.get_utterance(timeout=1.0), recorder.get_utterance(timeout=1.0)]
+        recorder.stop()
+
+    assert all(u is not None and u.sample_rate == SAMPLE_RATE for u in utterances)
+    assert recorder.get_vad_metrics()["dropped_frames"] == 0
+    audio_seconds = recorder.stream_position / recorder.rate
+    assert elapsed < audio_seconds
+    print(f"✓ {len(utterances)} utterances from {audio_seconds:.1f}s of audio in {elapsed:.2f}s")
+
+def test_socket_source():
+    """16-bit PCM written to a TCP socket arrives as float blocks."""
+    print("Testing socket source...")
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    source = create_audio_source(f"tcp://127.0.0.1:{port}", sample_rate=SAMPLE_RATE)
+    assert isinstance(source, SocketSource)
+    blocks = []
+    source.start(blocks.append, 512)
+    audio = make_audio([(0.5, True)])
+    pcm = (audio * 32767).astype("<i2").tobytes()
+    for _ in range(50):
+        try:
+            client = socket.create_connection(("127.0.0.1", port))
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    with client:
+        client.sendall(pcm)
+    deadline = time.time() + 5.0
+    while sum(len(b) for b in blocks) < len(audio) and time.time() < deadline:
+        time.sleep(0.01)
+    source.stop()
+
+    received = np.concatenate(blocks)
+    assert len(received) == len(audio)
+    assert np.max(np.abs(received - audio)) < 1e-3
+    print(f"✓ {len(received)} samples received over TCP")
+
+def test_default_source_is_the_device():
+    """Without AUDIO_SOURCE the recorder opens the microphone (sounddevice is only imported on start)."""
+    assert isinstance(create_audio_source("device", sample_rate=48000), DeviceSource)
+    print("✓ Device source by default")
+
+if __name__ == "__main__":
+    test_file_source_blocks()
+    test_recorder_replays_file()
+    test_socket_source()
+    test_default_source_is_the_device()
+    print("All audio source tests passed")
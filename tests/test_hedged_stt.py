@@ -0,0 +1,109 @@
+"""
+Test script for hedged speech recognition across two backends.
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.stt_backends import STTBackend
+from audio.hedged_stt import HedgedSTTBackend, MIN_HISTORY
+from audio.speech_to_text import SpeechToText
+
+SAMPLE_RATE = 16000
+AUDIO = np.full(SAMPLE_RATE, 0.1, dtype=np.float32)
+
+class ScriptedBackend(STTBackend):
+    """Answers after scripted delays; a delay of None raises."""
+
+    def __init__(self, name, delays, default=0.05):
+        super().__init__("es")
+        self.name = name
+        self.delays = list(delays)
+        self.default = default
+        self.calls = 0
+
+    def transcribe(self, audio, sample_rate):
+        self.calls += 1
+        delay = self.delays.pop(0) if self.delays else self.default
+        if delay is None:
+            raise ConnectionError("service unavailable")
+        time.sleep(delay)
+        return self.name
+
+def warmed_up(primary, secondary, **kwargs):
+    """Hedged backend whose latency history is already full."""
+    hedged = HedgedSTTBackend(primary, secondary, **kwargs)
+    for _ in range(MIN_HISTORY):
+        assert hedged.transcribe(AUDIO, SAMPLE_RATE) == primary.name
+    time.sleep(0.05)
+    return hedged
+
+def test_fast_primary_is_not_hedged():
+    """While the primary answers within its usual latency the secondary is never asked."""
+    print("Testing no hedging on fast requests...")
+    secondary = ScriptedBackend("whisper", [])
+    hedged = warmed_up(ScriptedBackend("google", [], default=0.03), secondary)
+    assert secondary.calls == 0
+    metrics = hedged.get_metrics()
+    assert metrics["hedged"] == 0 and metrics["hedge_rate"] == 0.0
+    assert metrics["hedge_delay_ms"] >= 200  # min_delay
+    print(f"✓ Hedge delay {metrics['hedge_delay_ms']:.0f}ms, nothing hedged")
+
+def test_slow_request_is_hedged():
+    """A straggler is answered by the secondary shortly after the hedge delay."""
+    print("Testing a slow primary request...")
+    primary = ScriptedBackend("google", [0.05] * MIN_HISTORY + [2.0], default=0.05)
+    secondary = ScriptedBackend("whisper", [0.1])
+    hedged = warmed_up(primary, secondary, min_delay=0.1)
+
+    start = time.perf_counter()
+    assert hedged.transcribe(AUDIO, SAMPLE_RATE) == "whisper"
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5
+    time.sleep(2.0)  # Let the loser finish so its latency is counted
+    metrics = hedged.get_metrics()
+    assert metrics["hedged"] == 1 and metrics["secondary_wins"] == 1
+    assert metrics["primary_p99_ms"] > 1000 and metrics["p99_improvement_ms"] > 500
+    print(f"✓ Answered in {elapsed * 1000:.0f}ms instead of 2000ms, "
+          f"p99 improved by {metrics['p99_improvement_ms']:.0f}ms")
+
+def test_failed_primary_falls_over():
+    """A primary error sends the request to the secondary right away."""
+    print("Testing a failing primary...")
+    hedged = HedgedSTTBackend(ScriptedBackend("google", [None]), ScriptedBackend("whisper", [0.01]),
+                              initial_delay=5.0)
+    start = time.perf_counter()
+    assert hedged.transcribe(AUDIO, SAMPLE_RATE) == "whisper"
+    assert time.perf_counter() - start < 1.0
+    print("✓ Secondary answered")
+
+def test_timeout():
+    """When neither backend answers in time the request fails instead of stalling the turn."""
+    print("Testing the overall timeout...")
+    hedged = HedgedSTTBackend(ScriptedBackend("google", [3.0]), ScriptedBackend("whisper", [3.0]),
+                              initial_delay=0.1, timeout=0.5)
+    start = time.perf_counter()
+    try:
+        hedged.transcribe(AUDIO, SAMPLE_RATE)
+        assert False, "TimeoutError expected"
+    except TimeoutError:
+        pass
+    assert time.perf_counter() - start < 1.0
+    assert hedged.get_metrics()["timeouts"] == 1
+    # SpeechToText reports the failure as "nothing recognized"
+    stt = SpeechToText(backend=HedgedSTTBackend(ScriptedBackend("google", [3.0]), ScriptedBackend("whisper", [3.0]),
+                                                initial_delay=0.1, timeout=0.3))
+    assert stt.convert(AUDIO, sample_rate=SAMPLE_RATE) is None
+    print("✓ Timed out")
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_slow_request_is_hedged()
+    test_failed_primary_falls_over()
+    test_timeout()
+    print("All hedged STT tests passed")
@@ -0,0 +1,154 @@
+"""
+Test script for the shared keep-alive HTTP transport (connection reuse, streaming, timeouts).
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_transport import HTTPTransport
+import utils.http_transport as http_transport
+from ai.streaming_llm_processor import StreamingLLMProcessor, PROVIDERS
+from ai.provider_router import ProviderRouter
+
+class Handler(BaseHTTPRequestHandler):
+    """Keep-alive test server: plain JSON, a chunked Ollama-style stream and a slow endpoint."""
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _record_connection(self):
+        Handler.connections.add(self.client_address)
+
+    def do_GET(self):
+        self._record_connection()
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out and closed the connection
+            pass
+
+    def do_POST(self):
+        self._record_connection()
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for content in ["Hola ", "desde ", "Ollama."]:
+            line = json.dumps({"message": {"content": content}, "done": False}).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        line = json.dumps({"message": {"content": ""}, "done": True}).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(line), line))
+
+def start_server():
+    Handler.connections = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_sequential_requests_reuse_connection():
+    server, url = start_server()
+    transport = HTTPTransport(max_connections_per_host=3)
+    try:
+        for _ in range(5):
+            assert transport.get(f"{url}/tags").json() == {"ok": True}
+        metrics = transport.get_metrics()["127.0.0.1"]
+        assert metrics == {"requests": 5, "connections": 1, "reused": 4}, metrics
+        assert len(Handler.connections) == 1
+    finally:
+        transport.close()
+        server.shutdown()
+    print("✓ Sequential requests reused one connection")
+
+def test_parallel_requests_stay_within_pool():
+    """Concurrent requests open at most one connection each and reuse them afterwards."""
+    server, url = start_server()
+    transport = HTTPTransport(max_connections_per_host=3)
+    try:
+        for _ in range(3):
+            threads = [threading.Thread(target=transport.get, args=(f"{url}/tags",)) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        metrics = transport.get_metrics()["127.0.0.1"]
+        assert metrics["requests"] == 9 and metrics["connections"] <= 3, metrics
+    finally:
+        transport.close()
+        server.shutdown()
+    print(f"✓ 9 parallel requests used {metrics['connections']} connections")
+
+def test_streamed_response_returns_connection():
+    server, url = start_server()
+    transport = HTTPTransport()
+    try:
+        for _ in range(3):
+            response = transport.post(f"{url}/api/chat", json={"stream": True}, stream=True)
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+            assert lines[-1]["done"]
+        assert transport.get_metrics()["127.0.0.1"]["reused"] == 2
+    finally:
+        transport.close()
+        server.shutdown()
+    print("✓ Fully read streams went back to the pool")
+
+def test_read_timeout():
+    server, url = start_server()
+    transport = HTTPTransport(read_timeout=0.1)
+    try:
+        try:
+            transport.get(f"{url}/slow")
+            assert False, "slow response did not time out"
+        except requests.exceptions.Timeout:
+            pass
+        # A longer timeout from the caller replaces the default read timeout
+        assert transport.get(f"{url}/slow", timeout=2.0).ok
+    finally:
+        transport.close()
+        server.shutdown()
+    print("✓ Read timeout raised requests' Timeout")
+
+def test_local_llm_stream_reuses_connection():
+    """StreamingLLMProcessor's Ollama stream goes through the shared transport."""
+    server, url = start_server()
+    transport = HTTPTransport()
+    http_transport._transport = transport
+    try:
+        processor = StreamingLLMProcessor(race_width=1, provider_costs={}, router=ProviderRouter(PROVIDERS))
+        processor.local_llm_processor = type("Ollama", (), {"base_url": url})()
+        for _ in range(2):
+            assert "".join(processor._stream_from_local_llm("Hola")) == "Hola desde Ollama."
+        assert processor.get_metrics()["http"]["127.0.0.1"] == {"requests": 2, "connections": 1, "reused": 1}
+    finally:
+        http_transport._transport = None
+        transport.close()
+        server.shutdown()
+    print("✓ Local LLM stream reused the connection")
+
+if __name__ == "__main__":
+    test_sequential_requests_reuse_connection()
+    test_parallel_requests_stay_within_pool()
+    test_streamed_response_returns_connection()
+    test_read_timeout()
+    test_local_llm_stream_reuses_connection()
+    print("All HTTP transport tests passed")
@@ -0,0 +1,166 @@
+"""
+Test script for the first-token race across LLM providers in StreamingLLMProcessor.
+"""
+
+import sys
+import os
+import time
+import threading
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.streaming_llm_processor import StreamingLLMProcessor, FALLBACK_RESPONSE, PROVIDERS
+from ai.provider_router import ProviderRouter
+
+class FakeResponse:
+    """Stands in for an HTTP stream; close() unblocks a pending read like closing the socket does."""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+class FakeProvider:
+    """
+    Streams `tokens` after `first_token_delay` seconds, 0.05s apart.
+    A delay of None raises before the first token; fail_after raises after that many tokens.
+    """
+
+    def __init__(self, name, first_token_delay, tokens=None, fail_after=None):
+        self.name = name
+        self.first_token_delay = first_token_delay
+        self.fail_after = fail_after
+        self.tokens = tokens or [f"{name} ", "responde ", "primero."]
+        self.calls = 0
+        self.sent = 0
+        self.response = None
+
+    def stream(self, text, conversation_history=None, handle=None):
+        self.calls += 1
+        self.response = FakeResponse()
+        if handle:
+            handle.attach(self.response)
+        if self.first_token_delay is None:
+            raise ConnectionError(f"{self.name} unavailable")
+        delays = [self.first_token_delay] + [0.05] * (len(self.tokens) - 1)
+        for token, delay in zip(self.tokens, delays):
+            if self.response.closed.wait(delay):
+                raise ConnectionError("connection closed")
+            if self.sent == self.fail_after:
+                raise ConnectionError(f"{self.name} dropped the stream")
+            self.sent += 1
+            yield token
+
+def make_processor(providers, race_width=2, provider_costs=None):
+    # A fresh in-memory router has no observations, so the cost order decides
+    processor = StreamingLLMProcessor(race_width=race_width, provider_costs=provider_costs or {},
+                                      router=ProviderRouter(PROVIDERS))
+    fakes = {provider.name: provider for provider in providers}
+    processor._is_available = lambda name: name in fakes
+    for name, provider in fakes.items():
+        setattr(processor, f"_stream_from_{name}", provider.stream)
+    return processor
+
+def test_fastest_provider_wins():
+    """The provider with the first token is used even if it is not first in the order."""
+    slow = FakeProvider("chatgpt", 1.0)
+    fast = FakeProvider("claude", 0.1)
+    processor = make_processor([slow, fast])
+    start = time.perf_counter()
+    text = "".join(processor.stream_text("Hola"))
+    elapsed = time.perf_counter() - start
+    assert text == "claude responde primero.", text
+    assert elapsed < 0.6, f"waited {elapsed:.2f}s for the slow provider"
+    assert processor.get_metrics()["wins"] == {"claude": 1}
+    print(f"✓ Fastest provider won ({elapsed * 1000:.0f}ms)")
+
+def test_loser_stream_is_closed():
+    """The losing provider's stream is closed as soon as the winner's first token arrives."""
+    winner = FakeProvider("chatgpt", 0.05, tokens=["a "] * 20)
+    loser = FakeProvider("claude", 0.5)
+    processor = make_processor([winner, loser])
+    stream = processor.stream_text("Hola")
+    assert next(stream) == "a "
+    assert loser.response.closed.wait(0.2), "loser stream still open"
+    assert loser.sent == 0
+    # Stopping the consumer closes the winner as well
+    stream.close()
+    assert winner.response.closed.wait(0.2)
+    assert winner.sent < 20
+    print("✓ Losing stream closed")
+
+def test_failed_racer_does_not_win():
+    """A provider that errors out immediately does not end the race."""
+    broken = FakeProvider("chatgpt", None)
+    working = FakeProvider("claude", 0.2)
+    processor = make_processor([broken, working])
+    assert "".join(processor.stream_text("Hola")) == "claude responde primero."
+    print("✓ Failed provider skipped")
+
+def test_fallback_after_all_racers_fail():
+    """When every racer fails, the providers outside the race are tried in order."""
+    providers = [FakeProvider("chatgpt", None), FakeProvider("claude", None), FakeProvider("deepseek", 0.05)]
+    processor = make_processor(providers)
+    assert "".join(processor.stream_text("Hola")) == "deepseek responde primero."
+    assert processor.get_metrics()["all_failed"] == 1
+
+    processor = make_processor([FakeProvider("chatgpt", None), FakeProvider("claude", None)])
+    assert "".join(processor.stream_text("Hola")) == FALLBACK_RESPONSE
+    print("✓ Fell back after all racers failed")
+
+def test_costs_choose_the_racers():
+    """The cheapest providers are raced; an expensive one is not started at all."""
+    providers = [FakeProvider("chatgpt", 0.1), FakeProvider("claude", 0.1),
+                 FakeProvider("deepseek", 0.2), FakeProvider("local_llm", 0.3)]
+    processor = make_processor(providers, provider_costs={"chatgpt": 1.0, "claude": 3.0, "deepseek": 0.5, "local_llm": 0.0})
+    text = "".join(processor.stream_text("Hola"))
+    assert text == "deepseek responde primero.", text
+    assert [p.calls for p in providers] == [0, 0, 1, 1]
+    print("✓ Cheapest providers raced")
+
+def test_width_one_is_sequential():
+    providers = [FakeProvider("chatgpt", 0.3), FakeProvider("claude", 0.05)]
+    processor = make_processor(providers, race_width=1)
+    assert "".join(processor.stream_text("Hola")) == "chatgpt responde primero."
+    assert providers[1].calls == 0
+    print("✓ Race width 1 tries providers in order")
+
+def test_no_failover_after_first_token():
+    """A provider failing mid-answer raises instead of appending another provider's answer."""
+    for race_width in (1, 2):
+        broken = FakeProvider("chatgpt", 0.05, tokens=["Hola, ", "la respuesta es"], fail_after=1)
+        other = FakeProvider("claude", 0.5, tokens=["Respuesta completa de otro proveedor."])
+        processor = make_processor([broken, other], race_width=race_width)
+        received = []
+        try:
+            for chunk in processor.stream_text("Hola"):
+                received.append(chunk)
+            assert False, "mid-stream failure was not raised"
+        except ConnectionError:
+            pass
+        assert received == ["Hola, "], received
+
+    # With a single provider the fallback response is not appended either
+    processor = make_processor([FakeProvider("chatgpt", 0.05, tokens=["Hola, ", "la respuesta es"], fail_after=1)],
+                               race_width=1)
+    received = []
+    try:
+        for chunk in processor.stream_text("Hola"):
+            received.append(chunk)
+        assert False, "mid-stream failure was not raised"
+    except ConnectionError:
+        pass
+    assert FALLBACK_RESPONSE not in received
+    print("✓ No failover after the first token")
+
+if __name__ == "__main__":
+    test_fastest_provider_wins()
+    test_loser_stream_is_closed()
+    test_failed_racer_does_not_win()
+    test_fallback_after_all_racers_fail()
+    test_costs_choose_the_racers()
+    test_width_one_is_sequential()
+    test_no_failover_after_first_token()
+    print("All LLM race tests passed")
@@ -0,0 +1,166 @@
+"""
+Test script for the end-to-end streaming pipeline in main.VoiceAssistant (LLM tokens -> TTS -> speakers).
+"""
+
+import sys
+import os
+import time
+import types
+import numpy as np
+from concurrent.futures import Future
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from audio import streaming_tts_processor
+from audio.streaming_tts_processor import StreamingTTSProcessor, TARGET_SAMPLE_RATE
+from audio.speculative_stt import Speculation
+
+SENTENCES = [
+    "Hola, soy el asistente de voz de Hyundai y te ayudo con nuestros vehículos. ",
+    "Tenemos una amplia gama de modelos, desde compactos hasta SUVs eléctricos. ",
+    "¿Te gustaría conocer más sobre algún modelo específico? "
+]
+
+class FakeLLM:
+    """Streams SENTENCES word by word, pausing between sentences; fail=True raises before the first token."""
+
+    def __init__(self, pause=0.3, fail=False):
+        self.pause = pause
+        self.fail = fail
+        self.finished_at = None
+        self.batch_calls = 0
+
+    def stream_text(self, text, conversation_history=None, provider="fastest"):
+        if self.fail:
+            raise ConnectionError("provider unavailable")
+        for sentence in SENTENCES:
+            for word in sentence.split(" "):
+                if word:
+                    yield word + " "
+            time.sleep(self.pause)
+        self.finished_at = time.time()
+
+    def generate_response(self, text, conversation_history=None, provider="fastest"):
+        self.batch_calls += 1
+        return "".join(SENTENCES)
+
+class FakeOutputStream:
+    """Records what would have been played instead of opening a sound device."""
+    writes = []
+
+    def __init__(self, samplerate, channels, dtype):
+        self.samplerate = samplerate
+
+    def start(self):
+        pass
+
+    def write(self, data):
+        FakeOutputStream.writes.append((time.time(), len(data)))
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+def make_tts():
+    streaming_tts_processor.USE_GRPC = False
+    streaming_tts_processor.sd.OutputStream = FakeOutputStream
+    tts = StreamingTTSProcessor()
+    tts.batch_texts = []
+    # 50ms of tone per character instead of an ElevenLabs request
+    tts._convert_chunk_to_speech = lambda chunk: np.full(len(chunk.text) * 1200, 0.1, dtype=np.float32)
+    tts.process_text = lambda text: tts.batch_texts.append(text)
+    return tts
+
+def make_assistant(llm):
+    assistant = main.VoiceAssistant.__new__(main.VoiceAssistant)
+    assistant.streaming_llm_processor = llm
+    assistant.streaming_tts_processor = make_tts()
+    assistant.speech_to_text = types.SimpleNamespace(convert=lambda audio, sample_rate: "Hola, cuéntame sobre Hyundai")
+    assistant.segmented_stt = None
+    return assistant
+
+def make_utterance():
+    return types.SimpleNamespace(audio=np.zeros(16000, dtype=np.float32), sample_rate=16000,
+                                 duration=1.0, end_time=time.time(), pauses=[], stt_session=None, speculation=None)
+
+def test_audio_starts_before_llm_finishes():
+    """The first sentence is played while the LLM is still generating."""
+    FakeOutputStream.writes = []
+    llm = FakeLLM(pause=0.3)
+    assistant = make_assistant(llm)
+    assert assistant._process_with_streaming_pipeline("Hola, cuéntame sobre Hyundai", speech_end_time=time.time())
+    metrics = assistant.streaming_tts_processor.last_metrics
+    assert metrics["playback_start_time"] is not None
+    assert metrics["playback_start_time"] < llm.finished_at - 0.3, "playback waited for the whole response"
+    assert FakeOutputStream.writes[0][0] < llm.finished_at
+    # Chunks are played one by one as they are synthesized, not concatenated at the end
+    assert len(FakeOutputStream.writes) >= len(SENTENCES)
+    assert llm.batch_calls == 0
+    print(f"✓ First audio {(metrics['playback_start_time'] - metrics['start_time']) * 1000:.0f}ms after start, "
+          f"LLM finished after {(llm.finished_at - metrics['start_time']) * 1000:.0f}ms")
+
+def test_consecutive_turns():
+    """Each turn's stream completes (the worker sentinels no longer leave chunk_queue.join() waiting)."""
+    assistant = make_assistant(FakeLLM(pause=0.0))
+    tts = assistant.streaming_tts_processor
+    original_callback = tts.on_audio_ready
+    for turn in range(3):
+        start = time.time()
+        assert assistant._process_with_streaming_pipeline("Hola")
+        assert time.time() - start < 5.0, f"turn {turn} hung"
+    # The timing wrappers are removed again after each turn
+    assert tts.on_audio_ready is original_callback
+    print("✓ Consecutive turns")
+
+def test_fallback_to_batch_pipeline():
+    """An LLM stream that fails before any audio falls back to generate_response + process_text."""
+    main.USE_STREAMING_PIPELINE = True
+    llm = FakeLLM(fail=True)
+    assistant = make_assistant(llm)
+    assert not assistant._process_with_streaming_pipeline("Hola")
+    assistant._process_speech(make_utterance())
+    assert llm.batch_calls == 1
+    assert assistant.streaming_tts_processor.batch_texts == ["".join(SENTENCES)]
+    # The failed turns left no audio worker behind to take the next turn's audio
+    FakeOutputStream.writes = []
+    assistant.streaming_llm_processor = FakeLLM(pause=0.0)
+    assert assistant._process_with_streaming_pipeline("Hola")
+    assert len(FakeOutputStream.writes) >= len(SENTENCES)
+    print("✓ Fell back to the batch pipeline")
+
+def test_no_fallback_when_streaming_succeeds():
+    main.USE_STREAMING_PIPELINE = True
+    llm = FakeLLM(pause=0.0)
+    assistant = make_assistant(llm)
+    assistant._process_speech(make_utterance())
+    assert llm.batch_calls == 0
+    assert assistant.streaming_tts_processor.batch_texts == []
+    print("✓ Streamed without the batch pipeline")
+
+def test_stalled_speculation_falls_back():
+    """A speculative transcript that does not arrive in time is replaced by a fresh recognition."""
+    main.STT_SPECULATIVE_TIMEOUT = 0.1
+    llm = FakeLLM(pause=0.0)
+    assistant = make_assistant(llm)
+    converted = []
+    assistant.speech_to_text = types.SimpleNamespace(
+        convert=lambda audio, sample_rate: converted.append(sample_rate) or "Hola, cuéntame sobre Hyundai")
+    utterance = make_utterance()
+    utterance.speculation = Speculation(Future(), len(utterance.audio))  # Never completes
+    start = time.time()
+    assistant._process_speech(utterance)
+    assert converted == [16000]
+    assert llm.finished_at is not None and time.time() - start < 5.0
+    print("✓ Stalled speculation fell back to recognition")
+
+if __name__ == "__main__":
+    test_audio_starts_before_llm_finishes()
+    test_consecutive_turns()
+    test_fallback_to_batch_pipeline()
+    test_no_fallback_when_streaming_succeeds()
+    test_stalled_speculation_falls_back()
+    print("All main pipeline tests passed")
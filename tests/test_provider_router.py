@@ -0,0 +1,186 @@
+"""
+Test script for the adaptive LLM provider router (latency EWMAs, circuit breakers, persistence).
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.provider_router import ProviderRouter
+from ai.streaming_llm_processor import StreamingLLMProcessor, PROVIDERS
+
+def test_ranking_follows_latency():
+    """Providers are ordered by TTFT plus the time to generate the first TTS chunk."""
+    router = ProviderRouter(["chatgpt", "claude", "deepseek"])
+    for _ in range(5):
+        router.record_first_token("chatgpt", 0.9)
+        router.record_first_token("claude", 0.4)
+        router.record_first_token("deepseek", 0.3)
+    # deepseek answers first but generates so slowly that even chatgpt has audio sooner
+    router.record_completion("claude", 101, 1.0)
+    router.record_completion("deepseek", 11, 1.0)
+    assert router.rank(["chatgpt", "claude", "deepseek"]) == ["claude", "chatgpt", "deepseek"]
+    metrics = router.get_metrics()
+    assert abs(metrics["claude"]["ttft_ms_p50"] - 400) < 1e-6
+    assert abs(metrics["claude"]["tokens_per_second"] - 100) < 1e-6
+    print("✓ Ranked by expected time to first audio")
+
+def test_costs_weight_the_ranking():
+    """With observations, a slightly faster but expensive provider loses to a cheaper one."""
+    router = ProviderRouter(["chatgpt", "claude", "local_llm"], cost_weight=0.25)
+    for _ in range(5):
+        router.record_first_token("chatgpt", 0.50)
+        router.record_first_token("claude", 0.45)
+        router.record_first_token("local_llm", 1.20)
+    costs = {"chatgpt": 1.0, "claude": 3.0, "local_llm": 0.0}
+    assert router.rank(["chatgpt", "claude", "local_llm"]) == ["claude", "chatgpt", "local_llm"]
+    # claude is 50ms faster, but would need to be 1.4 times faster to outweigh three times the cost
+    assert router.rank(["chatgpt", "claude", "local_llm"], costs) == ["chatgpt", "claude", "local_llm"]
+    # A much faster expensive provider still wins
+    for _ in range(10):
+        router.record_first_token("claude", 0.05)
+    assert router.rank(["chatgpt", "claude", "local_llm"], costs)[0] == "claude"
+    # Weight 0 ignores cost
+    router.cost_weight = 0.0
+    router.record_first_token("claude", 0.45)
+    assert router.rank(["chatgpt", "local_llm", "claude"], {"claude": 100.0})[0] == "claude"
+
+    # The processor races by the weighted score
+    router = ProviderRouter(PROVIDERS, cost_weight=0.25)
+    for _ in range(5):
+        router.record_first_token("chatgpt", 0.50)
+        router.record_first_token("claude", 0.45)
+        router.record_first_token("deepseek", 0.60)
+    processor = StreamingLLMProcessor(race_width=2, provider_costs={"chatgpt": 1.0, "claude": 3.0, "deepseek": 0.5},
+                                      router=router)
+    started = []
+
+    def fake_stream(name):
+        def stream(text, conversation_history=None, handle=None):
+            started.append(name)
+            yield f"{name}."
+        return stream
+
+    processor._is_available = lambda name: name in ("chatgpt", "claude", "deepseek")
+    for name in ("chatgpt", "claude", "deepseek"):
+        setattr(processor, f"_stream_from_{name}", fake_stream(name))
+    "".join(processor.stream_text("Hola"))
+    assert sorted(started) == ["chatgpt", "deepseek"], started
+    print("✓ Cost weighted into the ranking")
+
+def test_errors_penalize():
+    router = ProviderRouter(["chatgpt", "claude"], failure_threshold=10)
+    router.record_first_token("chatgpt", 0.3)
+    router.record_first_token("claude", 0.5)
+    router.record_failure("chatgpt")
+    router.record_failure("chatgpt")
+    assert router.rank(["chatgpt", "claude"]) == ["claude", "chatgpt"]
+    print("✓ Error rate penalized")
+
+def test_circuit_opens_and_half_opens():
+    """Without a prober, a live request after the cooldown decides; a failure backs off."""
+    router = ProviderRouter(["chatgpt", "claude"], failure_threshold=3, cooldown=0.2)
+    for _ in range(3):
+        router.record_failure("chatgpt", ConnectionError("down"))
+    assert router.rank(["chatgpt", "claude"]) == ["claude"]
+    assert router.get_metrics()["chatgpt"]["circuit_open"]
+    time.sleep(0.25)
+    assert router.is_available("chatgpt")
+    router.record_failure("chatgpt")
+    assert not router.is_available("chatgpt")
+    assert abs(router.stats["chatgpt"].cooldown - 0.4) < 1e-6
+    time.sleep(0.45)
+    router.record_first_token("chatgpt", 0.2)
+    assert not router.get_metrics()["chatgpt"]["circuit_open"]
+    # When every circuit is open the turn is still attempted
+    for name in ("chatgpt", "claude"):
+        for _ in range(3):
+            router.record_failure(name)
+    assert sorted(router.rank(["chatgpt", "claude"])) == ["chatgpt", "claude"]
+    print("✓ Circuit opened, half-opened and closed")
+
+def test_prober_closes_circuit():
+    healthy = {"chatgpt": False}
+    probes = []
+
+    def probe(name):
+        probes.append(name)
+        return healthy[name]
+
+    router = ProviderRouter(["chatgpt"], failure_threshold=2, cooldown=0.1, probe=probe, probe_interval=0.05)
+    router.record_failure("chatgpt")
+    router.record_failure("chatgpt")
+    time.sleep(0.3)
+    assert probes and not router.is_available("chatgpt"), "failed probe closed the circuit"
+    healthy["chatgpt"] = True
+    deadline = time.time() + 2.0
+    while not router.is_available("chatgpt") and time.time() < deadline:
+        time.sleep(0.05)
+    assert router.is_available("chatgpt")
+    router.close()
+    print(f"✓ Prober closed the circuit after {len(probes)} probes")
+
+def test_statistics_persist():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stats.json")
+        router = ProviderRouter(["chatgpt", "claude"], state_path=path, failure_threshold=1)
+        router.record_first_token("chatgpt", 1.2)
+        router.record_first_token("claude", 0.4)
+        router.record_failure("chatgpt")
+        router.close()
+
+        restarted = ProviderRouter(["chatgpt", "claude"], state_path=path)
+        assert restarted.rank(["chatgpt", "claude"]) == ["claude", "chatgpt"]
+        assert restarted.stats["claude"].ttft == 0.4
+        assert restarted.get_metrics()["chatgpt"]["failures"] == 1
+        # Circuits start closed: a restart tries every provider again
+        assert restarted.is_available("chatgpt")
+
+        with open(path, "w") as f:
+            f.write("{not json")
+        assert ProviderRouter(["chatgpt"], state_path=path).stats["chatgpt"].ttft is None
+    print("✓ Statistics persisted across restarts")
+
+def test_processor_skips_failing_provider():
+    """StreamingLLMProcessor stops calling a provider once its circuit is open."""
+    calls = {"chatgpt": 0, "claude": 0}
+
+    def broken(text, conversation_history=None, handle=None):
+        calls["chatgpt"] += 1
+        raise ConnectionError("503")
+        yield
+
+    def working(text, conversation_history=None, handle=None):
+        calls["claude"] += 1
+        yield from ["Hola ", "desde ", "claude."]
+
+    router = ProviderRouter(PROVIDERS, failure_threshold=2, cooldown=60.0)
+    # chatgpt has been much faster so far, so only its circuit keeps it from being chosen
+    for _ in range(5):
+        router.record_first_token("chatgpt", 0.1)
+        router.record_first_token("claude", 2.0)
+    processor = StreamingLLMProcessor(race_width=1, provider_costs={}, router=router)
+    processor._is_available = lambda name: name in calls
+    processor._stream_from_chatgpt = broken
+    processor._stream_from_claude = working
+    for _ in range(5):
+        assert "".join(processor.stream_text("Hola")) == "Hola desde claude."
+    assert calls == {"chatgpt": 2, "claude": 5}, calls
+    metrics = router.get_metrics()
+    assert metrics["chatgpt"]["circuit_open"] and metrics["claude"]["requests"] == 10
+    assert metrics["claude"]["tokens_per_second"] is not None
+    print("✓ Failing provider skipped by the processor")
+
+if __name__ == "__main__":
+    test_ranking_follows_latency()
+    test_costs_weight_the_ranking()
+    test_errors_penalize()
+    test_circuit_opens_and_half_opens()
+    test_prober_closes_circuit()
+    test_statistics_persist()
+    test_processor_skips_failing_provider()
+    print("All provider router tests passed")
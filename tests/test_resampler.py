@@ -0,0 +1,77 @@
+"""
+Test script for the streaming polyphase resampler.
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.resampler import PolyphaseResampler, resample
+
+def tone(frequency, rate, seconds=1.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def fit_amplitude(audio, frequency, rate):
+    """Amplitude of a sine at the given frequency (least squares), ignoring the edges."""
+    audio = audio[500:-500].astype(np.float64)
+    t = np.arange(500, 500 + len(audio)) / rate
+    basis = np.stack([np.sin(2 * np.pi * frequency * t), np.cos(2 * np.pi * frequency * t)], axis=1)
+    coefficients = np.linalg.lstsq(basis, audio, rcond=None)[0]
+    return float(np.hypot(*coefficients)), float(np.std(audio - basis @ coefficients))
+
+def test_blocks_match_one_shot():
+    """Arbitrary block sizes give exactly the samples of a one-shot conversion."""
+    print("Testing block boundaries...")
+    for from_rate, to_rate in [(48000, 16000), (44100, 16000), (8000, 16000)]:
+        audio = tone(440, from_rate)
+        expected = resample(audio, from_rate, to_rate)
+        resampler = PolyphaseResampler(from_rate, to_rate, max_block=512)
+        rng = np.random.default_rng(0)
+        blocks = []
+        offset = 0
+        while offset < len(audio):
+            size = int(rng.integers(1, 2000))
+            assert resampler.output_length(len(audio[offset:offset + size])) >= 0
+            blocks.append(resampler.process(audio[offset:offset + size]).copy())
+            offset += size
+        streamed = np.concatenate(blocks)
+        assert len(streamed) == len(expected) == int(np.ceil(len(audio) * to_rate / from_rate))
+        assert np.allclose(streamed, expected, atol=1e-6)
+    print("✓ Streaming output is seamless across blocks")
+
+def test_passband_and_aliasing():
+    """Speech-band tones keep their level; tones above the new Nyquist frequency are removed."""
+    print("Testing frequency response...")
+    amplitude, residual = fit_amplitude(resample(tone(1000, 48000), 48000, 16000), 1000, 16000)
+    assert abs(amplitude - 0.5) < 0.01 and residual < 1e-3
+    amplitude, residual = fit_amplitude(resample(tone(3000, 44100), 44100, 16000), 3000, 16000)
+    assert abs(amplitude - 0.5) < 0.01 and residual < 1e-3
+    aliased = resample(tone(9000, 48000), 48000, 16000)
+    assert np.sqrt(np.mean(aliased[500:-500] ** 2)) < 0.005
+    print("✓ Passband kept, aliasing suppressed")
+
+def test_recorder_block_cost():
+    """Converting one 48kHz capture block (one VAD frame) is cheap and never re-allocates."""
+    print("Testing per-block cost...")
+    resampler = PolyphaseResampler(48000, 16000, max_block=1536)
+    buffer = resampler._buffer
+    block = tone(440, 48000, 1536 / 48000)
+    start = time.perf_counter()
+    for _ in range(200):
+        output = resampler.process(block)
+    per_block_ms = (time.perf_counter() - start) * 1000 / 200
+    assert len(output) == 512
+    assert resampler._buffer is buffer
+    assert per_block_ms < 2.0
+    print(f"✓ {per_block_ms:.3f}ms per 32ms block")
+
+if __name__ == "__main__":
+    test_blocks_match_one_shot()
+    test_passband_and_aliasing()
+    test_recorder_block_cost()
+    print("All resampler tests passed")
@@ -0,0 +1,58 @@
+"""
+Test script for the recorder's preallocated audio buffers.
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.ring_buffer import RingBuffer, UtteranceBuffer
+
+def test_ring_buffer_wraparound():
+    """The ring keeps only the newest samples, oldest first."""
+    print("Testing ring buffer wraparound...")
+    ring = RingBuffer(10)
+    ring.write(np.arange(4, dtype=np.float32))
+    assert np.array_equal(ring.read(), np.arange(4))
+
+    ring.write(np.arange(4, 12, dtype=np.float32))
+    assert len(ring) == 10
+    assert np.array_equal(ring.read(), np.arange(2, 12))
+
+    # A block larger than the ring replaces everything
+    ring.write(np.arange(100, 125, dtype=np.float32))
+    assert np.array_equal(ring.read(), np.arange(115, 125))
+    print("✓ Ring buffer wraparound works")
+
+def test_utterance_buffer_views():
+    """Views are zero-copy and stay valid after the buffer grows."""
+    print("Testing utterance buffer...")
+    buffer = UtteranceBuffer(8)
+    buffer.append(np.ones(5, dtype=np.float32))
+    first_view = buffer.view()
+    assert first_view.base is not None  # A view, not a copy
+
+    buffer.append(np.full(10, 2.0, dtype=np.float32))
+    assert buffer.capacity >= 15
+    assert len(buffer) == 15
+    assert np.array_equal(first_view, np.ones(5))
+    assert np.array_equal(buffer.view()[5:], np.full(10, 2.0))
+    print("✓ Utterance buffer works")
+
+def test_pre_roll_copy():
+    """Copying the ring into an utterance preserves order."""
+    ring = RingBuffer(6)
+    ring.write(np.arange(9, dtype=np.float32))
+    buffer = UtteranceBuffer(4)
+    buffer.append_ring(ring)
+    buffer.append(np.array([42.0], dtype=np.float32))
+    assert np.array_equal(buffer.view(), [3, 4, 5, 6, 7, 8, 42])
+
+if __name__ == "__main__":
+    test_ring_buffer_wraparound()
+    test_utterance_buffer_views()
+    test_pre_roll_copy()
+    print("All ring buffer tests passed")
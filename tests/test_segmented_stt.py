@@ -0,0 +1,113 @@
+"""
+Test script for parallel segment-wise recognition of long utterances.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.segmented_stt import SegmentedRecognizer, plan_segments
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+from audio.audio_source import FileSource
+from audio.audio_recorder import AudioRecorder
+from audio.endpointer import create_endpointer
+
+SAMPLE_RATE = 16000
+SILENCE_TIMEOUT = 0.8
+SECONDS_PER_SECOND = 0.1  # Fake recognition time per second of audio
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def slow_recognizer(audio, sample_rate):
+    """Fake recognizer whose latency grows with the audio length; returns the segment length."""
+    seconds = len(audio) / sample_rate
+    time.sleep(seconds * SECONDS_PER_SECOND)
+    return f"{seconds:.1f}"
+
+def test_plan_segments():
+    """Cuts only at pauses, never leaving a segment shorter than the minimum."""
+    print("Testing segment planning...")
+    second = SAMPLE_RATE
+    assert plan_segments(8 * second, [1 * second, 3 * second, 5 * second, 7 * second], 2 * second) == \
+        [(0, 3 * second), (3 * second, 5 * second), (5 * second, 8 * second)]
+    assert plan_segments(3 * second, [int(1.5 * second)], 2 * second) == [(0, 3 * second)]
+    assert plan_segments(3 * second, [], 2 * second) == [(0, 3 * second)]
+    print("✓ Segments planned")
+
+def test_parallel_recognition():
+    """Wall-clock time follows the longest segment and the text comes back in order."""
+    print("Testing parallel recognition...")
+    recognizer = SegmentedRecognizer(slow_recognizer, max_workers=4, min_segment=2.0)
+    audio = make_audio([(10.0, True)])
+    pauses = [int(s * SAMPLE_RATE) for s in (2.5, 5.0, 7.5)]
+
+    start = time.perf_counter()
+    text = recognizer.convert(audio, SAMPLE_RATE, pauses)
+    elapsed = time.perf_counter() - start
+    assert text == "2.5 2.5 2.5 2.5"
+    assert elapsed < 10.0 * SECONDS_PER_SECOND * 0.5
+    assert recognizer.convert(audio[:3 * SAMPLE_RATE], SAMPLE_RATE, [SAMPLE_RATE]) == "3.0"
+    metrics = recognizer.get_metrics()
+    recognizer.shutdown()
+    assert metrics["turns"] == 2 and metrics["segmented_turns"] == 1 and metrics["segments"] == 5
+    assert metrics["speedup_mean"] > 2.5
+    print(f"✓ 10s recognized in {elapsed * 1000:.0f}ms (speed-up {metrics['speedup_mean']:.1f}x)")
+
+def test_recorder_reports_pauses():
+    """Utterance.pauses point into the pauses of the trimmed audio."""
+    print("Testing pause positions from the recorder...")
+    pattern = [(0.5, False), (2.5, True), (SILENCE_TIMEOUT / 2, False), (2.5, True), (SILENCE_TIMEOUT + 0.5, False)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "long.wav")
+        sf.write(path, make_audio(pattern), SAMPLE_RATE)
+        recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()), source=FileSource(path, realtime=False))
+        recorder.endpointer = create_endpointer("fixed", SAMPLE_RATE, SILENCE_TIMEOUT)
+        recorder.start_listening()
+        assert recorder.wait_for_source(timeout=20.0)
+        utterance = recorder.get_utterance(timeout=1.0)
+        recorder.stop()
+
+    assert utterance is not None and len(utterance.pauses) == 1
+    pause = utterance.pauses[0]
+    assert np.max(np.abs(utterance.audio[pause - 800:pause + 800])) < 0.01
+    recognizer = SegmentedRecognizer(slow_recognizer, min_segment=2.0)
+    segments = recognizer.convert(utterance.audio, SAMPLE_RATE, utterance.pauses).split()
+    recognizer.shutdown()
+    assert len(segments) == 2
+    print(f"✓ Split at {pause / SAMPLE_RATE:.2f}s into {segments}")
+
+if __name__ == "__main__":
+    test_plan_segments()
+    test_parallel_recognition()
+    test_recorder_reports_pauses()
+    print("All segmented STT tests passed")
@@ -0,0 +1,134 @@
+"""
+Test script for speculative recognition started at VAD offsets.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import soundfile as sf
+from threading import Event
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.speculative_stt import SpeculativeRecognizer
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+from audio.audio_source import FileSource
+from audio.audio_recorder import AudioRecorder
+from audio.endpointer import create_endpointer
+
+SAMPLE_RATE = 16000
+SILENCE_TIMEOUT = 0.8
+RECOGNITION_TIME = 0.3
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def speech_seconds(audio, sample_rate):
+    """Fake recognizer output: how much loud audio it was given."""
+    return f"{np.count_nonzero(np.abs(audio) > 0.01) / sample_rate:.1f}"
+
+def slow_recognizer(audio, sample_rate):
+    time.sleep(RECOGNITION_TIME)
+    return speech_seconds(audio, sample_rate)
+
+def test_discard_before_start():
+    """A speculation still waiting for a worker is cancelled, not sent."""
+    print("Testing discard of a queued speculation...")
+    release = Event()
+    speculative = SpeculativeRecognizer(lambda audio, rate: release.wait(2.0) and "busy")
+    first = speculative.submit(make_audio([(0.5, True)]), SAMPLE_RATE)
+    second = speculative.submit(make_audio([(0.5, True)]), SAMPLE_RATE)
+    speculative.discard(second)
+    release.set()
+    speculative.confirm(first)
+    assert first.result(timeout=2.0) == "busy"
+    metrics = speculative.get_metrics()
+    speculative.shutdown()
+    assert metrics["hits"] == 1 and metrics["misses"] == 1 and metrics["cancelled"] == 1
+    assert metrics["hit_rate"] == 0.5
+    print("✓ Queued speculation cancelled")
+
+def test_result_timeout():
+    """result() gives up after its timeout; the transcript is still available later."""
+    print("Testing speculation result timeout...")
+    speculative = SpeculativeRecognizer(slow_recognizer)
+    speculation = speculative.submit(make_audio([(0.5, True)]), SAMPLE_RATE)
+    start = time.time()
+    assert speculation.result(timeout=0.05) is None
+    assert time.time() - start < RECOGNITION_TIME
+    assert speculation.result(timeout=2.0) == "0.5"
+    speculative.shutdown()
+    print("✓ Result timed out")
+
+def test_recorder_ignores_speculation_without_vad_offsets():
+    """Only a recognizer passed in is used, and only when the VAD reports offsets."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "turn.wav")
+        sf.write(path, make_audio([(0.5, False)]), SAMPLE_RATE)
+        recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()), source=FileSource(path))
+        assert recorder.speculative_stt is None
+        speculative = SpeculativeRecognizer(slow_recognizer)
+        recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()), source=FileSource(path),
+                                 streaming_stt=object(), speculative_stt=speculative)
+        assert recorder.speculative_stt is None
+        speculative.shutdown()
+    print("✓ No implicit or redundant speculative recognizer")
+
+def test_recorder_speculates_in_hangover():
+    """A short pause is a miss; the final pause is a hit whose transcript covers the whole turn."""
+    print("Testing speculation in the recorder...")
+    pattern = [(0.3, False), (0.8, True), (SILENCE_TIMEOUT / 3, False), (0.8, True), (SILENCE_TIMEOUT + 0.3, False)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "turn.wav")
+        sf.write(path, make_audio(pattern), SAMPLE_RATE)
+        speculative = SpeculativeRecognizer(slow_recognizer)
+        recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()),
+                                 source=FileSource(path, realtime=True, trailing_silence=0.0),
+                                 speculative_stt=speculative)
+        recorder.endpointer = create_endpointer("fixed", SAMPLE_RATE, SILENCE_TIMEOUT)
+        recorder.start_listening()
+        assert recorder.wait_for_source(timeout=20.0)
+        utterance = recorder.get_utterance(timeout=1.0)
+        recorder.stop()
+
+    assert utterance is not None and utterance.speculation is not None
+    assert utterance.speculation.result(timeout=2.0) == speech_seconds(utterance.audio, SAMPLE_RATE) == "1.6"
+    metrics = recorder.get_vad_metrics()["speculation"]
+    assert metrics["speculations"] == 2 and metrics["hits"] == 1 and metrics["misses"] == 1
+    # Recognition ran entirely inside the hang-over
+    assert abs(metrics["latency_saved_ms_median"] - RECOGNITION_TIME * 1000) < 100
+    speculative.shutdown()
+    print(f"✓ Hit rate {metrics['hit_rate']:.0%}, saved {metrics['latency_saved_ms_median']:.0f}ms")
+
+if __name__ == "__main__":
+    test_discard_before_start()
+    test_result_timeout()
+    test_recorder_ignores_speculation_without_vad_offsets()
+    test_recorder_speculates_in_hangover()
+    print("All speculative STT tests passed")
@@ -0,0 +1,63 @@
+"""
+Test script for the in-process FLAC encoding used for speech recognition.
+"""
+
+import sys
+import os
+import io
+import subprocess
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.stt_backends import InMemoryAudioData
+
+SAMPLE_RATE = 16000
+
+def make_audio(seconds=1.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def test_flac_is_lossless():
+    """The FLAC handed to the recognizer decodes back to exactly the int16 samples."""
+    print("Testing in-process FLAC encoding...")
+    audio_data = InMemoryAudioData.from_float(make_audio(), SAMPLE_RATE)
+    flac = audio_data.get_flac_data(convert_width=2)
+    decoded, rate = sf.read(io.BytesIO(flac), dtype="int16")
+    assert rate == SAMPLE_RATE
+    assert np.array_equal(decoded, audio_data.samples)
+    assert len(flac) < len(audio_data.get_raw_data())
+    print(f"✓ {len(audio_data.get_raw_data())} PCM bytes -> {len(flac)} FLAC bytes")
+
+def test_no_subprocess():
+    """Encoding never starts the external flac binary."""
+    print("Testing that no encoder process is spawned...")
+    original = subprocess.Popen
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("flac subprocess spawned")
+
+    subprocess.Popen = forbidden
+    try:
+        InMemoryAudioData.from_float(make_audio(), SAMPLE_RATE).get_flac_data(convert_width=2)
+    finally:
+        subprocess.Popen = original
+    print("✓ No subprocess")
+
+def test_conversion_falls_back():
+    """A requested rate conversion is still handled by speech_recognition."""
+    print("Testing rate conversion fallback...")
+    audio_data = InMemoryAudioData.from_float(make_audio(), SAMPLE_RATE)
+    flac = audio_data.get_flac_data(convert_rate=8000, convert_width=2)
+    decoded, rate = sf.read(io.BytesIO(flac), dtype="int16")
+    assert rate == 8000
+    assert abs(len(decoded) - SAMPLE_RATE // 2) <= 1
+    print("✓ Converted by the parent class")
+
+if __name__ == "__main__":
+    test_flac_is_lossless()
+    test_no_subprocess()
+    test_conversion_falls_back()
+    print("All speech-to-text tests passed")
@@ -0,0 +1,131 @@
+"""
+Test script for trimming silence from utterances before speech recognition.
+"""
+
+import sys
+import os
+import time
+import numpy as np
+from threading import Thread
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.speech_trimmer import SpeechTrimmer, speech_spans, pause_points
+from audio.streaming_vad import VADEvent, StreamingVAD
+from audio.vad_backends import VADBackend
+from audio.audio_recorder import AudioRecorder
+from utils.config import PROCESSING_SAMPLE_RATE as SAMPLE_RATE, SILENCE_TIMEOUT
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def feed(recorder, audio):
+    """Push audio through the recorder's VAD worker as the audio callback would."""
+    recorder.stop_event.clear()
+    recorder.vad_thread = Thread(target=recorder._vad_worker, daemon=True)
+    recorder.vad_thread.start()
+    frame_size = recorder.streaming_vad.frame_size
+    for start in range(0, len(audio) - frame_size + 1, frame_size):
+        recorder.frame_queue.put(audio[start:start + frame_size])
+    while not recorder.frame_queue.empty():
+        time.sleep(0.01)
+
+def seconds(value):
+    return int(value * SAMPLE_RATE)
+
+def test_spans_from_events():
+    """Onset/offset pairs become spans; open speech runs to the end of the audio."""
+    print("Testing speech spans...")
+    events = [VADEvent("start", 1000 + seconds(1.0), 0.9), VADEvent("end", 1000 + seconds(2.0), 0.1),
+              VADEvent("start", 1000 + seconds(3.0), 0.9)]
+    spans = speech_spans(events, audio_start=1000, num_samples=seconds(4.0))
+    assert spans == [(seconds(1.0), seconds(2.0)), (seconds(3.0), seconds(4.0))]
+    # Speech already active when the recording began
+    assert speech_spans([VADEvent("end", seconds(1.0), 0.1)], 0, seconds(2.0)) == [(0, seconds(1.0))]
+    print("✓ Spans follow the VAD events")
+
+def test_trim_margins_and_pauses():
+    """Pre-roll and trailing silence shrink to the margins, a long pause to the pause limit."""
+    print("Testing trimming...")
+    trimmer = SpeechTrimmer(SAMPLE_RATE, margin_before=0.3, margin_after=0.3, max_pause=0.5)
+    audio = make_audio([(2.0, False), (1.0, True), (2.0, False), (0.5, True), (1.5, False)])
+    events = [VADEvent("start", seconds(2.0), 0.9), VADEvent("end", seconds(3.0), 0.1),
+              VADEvent("start", seconds(5.0), 0.9), VADEvent("end", seconds(5.5), 0.1)]
+    result = trimmer.trim(audio, events, audio_start=0)
+
+    assert len(result.audio) == seconds(2.6)  # 0.3 + 1.0 speech + 0.5 pause + 0.5 speech + 0.3
+    assert result.spans[0][0] == seconds(1.7)
+    assert result.bytes_saved == 2 * (len(audio) - len(result.audio))
+    # All the speech survives
+    assert np.sum(np.abs(result.audio) > 0.25) == np.sum(np.abs(audio) > 0.25)
+
+    # Short pauses are kept whole
+    events = [VADEvent("start", seconds(2.0), 0.9), VADEvent("end", seconds(3.0), 0.1),
+              VADEvent("start", seconds(3.3), 0.9), VADEvent("end", seconds(4.0), 0.1)]
+    assert len(trimmer.trim(audio, events, audio_start=0).spans) == 1
+    metrics = trimmer.get_metrics()
+    assert metrics["turns"] == 2 and metrics["bytes_saved_total"] > 0
+    print(f"✓ {len(audio) / SAMPLE_RATE:.1f}s trimmed to {len(result.audio) / SAMPLE_RATE:.1f}s, "
+          f"{result.bytes_saved / 1024:.0f}KB saved")
+
+def test_pause_positions_after_trimming():
+    """The middle of a shortened pause maps to the cut, positions in kept audio shift by the removed part."""
+    print("Testing pause positions...")
+    trimmer = SpeechTrimmer(SAMPLE_RATE, margin_before=0.3, margin_after=0.3, max_pause=0.5)
+    audio = make_audio([(2.0, False), (1.0, True), (2.0, False), (0.5, True), (1.5, False)])
+    events = [VADEvent("start", seconds(2.0), 0.9), VADEvent("end", seconds(3.0), 0.1),
+              VADEvent("start", seconds(5.0), 0.9), VADEvent("end", seconds(5.5), 0.1)]
+    pauses = pause_points(speech_spans(events, 0, len(audio)))
+    assert pauses == [seconds(4.0)]
+    result = trimmer.trim(audio, events, audio_start=0, record=False)
+    assert result.map_position(pauses[0]) == seconds(1.55)  # 0.3 margin + 1.0 speech + 0.25 of the pause
+    assert result.map_position(seconds(2.5)) == seconds(0.8)
+    assert trimmer.get_metrics()["turns"] == 0
+    print("✓ Pause mapped into the trimmed audio")
+
+def test_recorder_trims_utterances():
+    """Utterances from the recorder carry the trimmed audio and keep the full recording."""
+    print("Testing recorder trimming...")
+    recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()))
+    assert recorder.trimmer is not None
+    feed(recorder, make_audio([(2.5, False), (1.0, True), (SILENCE_TIMEOUT + 0.5, False)]))
+    utterance = recorder.get_utterance(timeout=2.0)
+    recorder.stop_event.set()
+    recorder.vad_thread.join(timeout=2.0)
+
+    assert utterance is not None and utterance.untrimmed_audio is not None
+    assert len(utterance.audio) < len(utterance.untrimmed_audio)
+    assert utterance.duration < 1.0 + 0.3 + 0.3 + 0.1
+    assert np.sum(np.abs(utterance.audio) > 0.25) == np.sum(np.abs(utterance.untrimmed_audio) > 0.25)
+    assert recorder.get_vad_metrics()["trim"]["bytes_saved_total"] > 0
+    print(f"✓ {len(utterance.untrimmed_audio) / SAMPLE_RATE:.2f}s recording sent as {utterance.duration:.2f}s")
+
+if __name__ == "__main__":
+    test_spans_from_events()
+    test_trim_margins_and_pauses()
+    test_pause_positions_after_trimming()
+    test_recorder_trims_utterances()
+    print("All speech trimmer tests passed")
@@ -0,0 +1,120 @@
+"""
+Test script for streaming speech recognition against the local stand-in server.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.streaming_stt import WebSocketSTTEngine, create_streaming_stt
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+from audio.audio_source import FileSource
+from audio.audio_recorder import AudioRecorder
+from utils.stt_stub_server import StubSTTServer, describe_audio
+from utils.config import SILENCE_TIMEOUT
+
+SAMPLE_RATE = 16000
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def test_session_partials_and_final():
+    """Partials arrive while audio is pushed; the final follows end() within a few hundred ms."""
+    print("Testing streaming session...")
+    server = StubSTTServer(port=0, partial_interval=0.5)
+    server.start()
+    try:
+        engine = WebSocketSTTEngine(server.url)
+        transcripts = []
+        session = engine.start_session(SAMPLE_RATE, on_transcript=transcripts.append)
+        audio = make_audio([(2.0, True)])
+        for start in range(0, len(audio), 512):
+            session.push(audio[start:start + 512])
+            time.sleep(0.001)
+        session.end()
+        text = session.result(timeout=2.0)
+    finally:
+        server.stop()
+
+    assert text == describe_audio(audio, SAMPLE_RATE)
+    partials = [t for t in transcripts if not t.is_final]
+    assert len(partials) >= 3 and transcripts[-1].is_final
+    assert session.final_latency < 0.3
+    metrics = engine.get_metrics()
+    assert metrics["finals"] == 1 and metrics["failures"] == 0
+    print(f"✓ {len(partials)} partials, final {session.final_latency * 1000:.0f}ms after end of speech")
+
+def test_unreachable_server():
+    """Without a server the session fails quickly and pushing audio is harmless."""
+    print("Testing unreachable server...")
+    engine = create_streaming_stt("websocket", url="ws://127.0.0.1:9", language="es")
+    session = engine.start_session(SAMPLE_RATE)
+    session.push(make_audio([(0.5, True)]))
+    session.end()
+    assert session.result(timeout=3.0) is None and session.failed
+    assert create_streaming_stt("none") is None
+    print("✓ result() is None, callers fall back to batch recognition")
+
+def test_recorder_streams_turns():
+    """The recorder streams each turn and attaches the finished session to the utterance."""
+    print("Testing recorder with streaming recognition...")
+    server = StubSTTServer(port=0)
+    server.start()
+    pause = SILENCE_TIMEOUT + 0.5
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "turns.wav")
+            sf.write(path, make_audio([(0.5, False), (1.5, True), (pause, False), (1.0, True)]), SAMPLE_RATE)
+            recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()),
+                                     source=FileSource(path, realtime=False),
+                                     streaming_stt=WebSocketSTTEngine(server.url))
+            recorder.start_listening()
+            assert recorder.wait_for_source(timeout=20.0)
+            utterances = [recorder.get_utterance(timeout=1.0), recorder.get_utterance(timeout=1.0)]
+            texts = [u.stt_session.result(timeout=2.0) for u in utterances]
+            recorder.stop()
+    finally:
+        server.stop()
+
+    assert all(text for text in texts)
+    # The recognizer heard the whole turn, pre-roll included
+    for utterance, text in zip(utterances, texts):
+        assert text.startswith(f"{utterance.stt_session.samples_pushed / SAMPLE_RATE:.2f}s")
+        assert utterance.stt_session.samples_pushed >= len(utterance.audio)
+    assert recorder.get_vad_metrics()["stt"]["finals"] == 2
+    print(f"✓ Transcripts: {texts}")
+
+if __name__ == "__main__":
+    test_session_partials_and_final()
+    test_unreachable_server()
+    test_recorder_streams_turns()
+    print("All streaming STT tests passed")
@@ -0,0 +1,140 @@
+"""
+Test script for the frame-level streaming VAD (no microphone required).
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.streaming_vad import StreamingVAD, SpeechStateTracker
+from audio.vad_backends import VADBackend
+from audio.energy_gate import EnergyGate
+
+SAMPLE_RATE = 16000
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+        self.calls = 0
+        self.resets = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        rms = float(np.sqrt(np.mean(frame ** 2)))
+        return 1.0 if rms > 0.05 else 0.0
+
+    def reset_states(self):
+        self.resets += 1
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def test_hysteresis():
+    """Probabilities between the two thresholds keep the current state."""
+    print("Testing speech state hysteresis...")
+    tracker = SpeechStateTracker(threshold=0.5, neg_threshold=0.35)
+
+    assert tracker.update(0.4, 0) is None
+    event = tracker.update(0.6, 512)
+    assert event.event_type == "start" and event.sample == 512
+    assert tracker.update(0.4, 1024) is None  # Still speech
+    event = tracker.update(0.2, 1536)
+    assert event.event_type == "end" and event.sample == 1536
+    print("✓ Hysteresis works")
+
+def test_onset_within_one_frame():
+    """Onset and offset are reported on the frame that crosses the threshold."""
+    print("Testing onset/offset latency...")
+    model = EnergyModel()
+    vad = StreamingVAD(model)
+    audio = make_audio([(1.0, False), (1.0, True), (1.0, False)])
+
+    events = vad.process(audio)
+    assert [e.event_type for e in events] == ["start", "end"]
+    assert abs(events[0].sample - SAMPLE_RATE) < vad.frame_size
+    assert abs(events[1].sample - 2 * SAMPLE_RATE) < vad.frame_size
+    assert model.calls == len(audio) // vad.frame_size
+    print(f"✓ Onset at {events[0].sample}, offset at {events[1].sample}")
+
+def test_arbitrary_block_sizes():
+    """Feeding odd-sized blocks gives the same events as one big block."""
+    print("Testing partial frame buffering...")
+    audio = make_audio([(0.5, False), (0.7, True), (0.5, False)])
+
+    reference = StreamingVAD(EnergyModel()).process(audio)
+
+    vad = StreamingVAD(EnergyModel())
+    events = []
+    for start in range(0, len(audio), 300):
+        events.extend(vad.process(audio[start:start + 300]))
+
+    assert [(e.event_type, e.sample) for e in events] == [(e.event_type, e.sample) for e in reference]
+    print("✓ Block size does not change detection")
+
+def test_energy_gate_skips_silence():
+    """The pre-gate skips quiet frames without moving onsets or offsets."""
+    print("Testing energy pre-gate...")
+    rng = np.random.default_rng(0)
+    audio = make_audio([(2.0, False), (1.0, True), (2.0, False), (0.5, True), (1.5, False)])
+    audio += (0.003 * rng.standard_normal(len(audio))).astype(np.float32)
+
+    reference_model = EnergyModel()
+    reference = StreamingVAD(reference_model).process(audio)
+
+    gated_model = EnergyModel()
+    gate = EnergyGate()
+    events = StreamingVAD(gated_model, energy_gate=gate).process(audio)
+
+    assert [(e.event_type, e.sample) for e in events] == [(e.event_type, e.sample) for e in reference]
+    assert gated_model.calls == reference_model.calls - gate.frames_skipped
+    assert gate.skip_ratio > 0.5
+    print(f"✓ Same events with {gate.skip_ratio:.0%} of frames skipped "
+          f"(noise floor {gate.noise_floor_db:.1f}dB)")
+
+def test_energy_gate_runs_around_transitions():
+    """Loud frames and the frames right after speech always reach the model."""
+    gate = EnergyGate(hangover_frames=3, warmup_frames=0)
+    quiet = np.full(512, 0.001, dtype=np.float32)
+    loud = np.full(512, 0.3, dtype=np.float32)
+
+    for _ in range(20):
+        if gate.should_run(quiet, in_speech=False):
+            gate.observe(0.0, 0.35)
+    assert not gate.should_run(quiet, in_speech=False)
+    assert gate.should_run(loud, in_speech=False)
+    gate.observe(0.9, 0.35)
+    assert gate.should_run(quiet, in_speech=True)
+    assert all(gate.should_run(quiet, in_speech=False) for _ in range(2))
+    assert not gate.should_run(quiet, in_speech=False)
+
+def test_reset():
+    """Reset clears the stream position and the model state."""
+    model = EnergyModel()
+    vad = StreamingVAD(model)
+    vad.process(make_audio([(0.2, True)]))
+    assert vad.is_speech
+    vad.reset()
+    assert not vad.is_speech and vad.position == 0
+    assert model.resets == 2
+
+if __name__ == "__main__":
+    test_hysteresis()
+    test_onset_within_one_frame()
+    test_arbitrary_block_sizes()
+    test_energy_gate_skips_silence()
+    test_energy_gate_runs_around_transitions()
+    test_reset()
+    print("All streaming VAD tests passed")
@@ -0,0 +1,153 @@
+"""
+Test script for the pluggable speech recognition backends.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import types
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.stt_backends import STTBackend, GoogleSTTBackend, WhisperSTTBackend, BatchingDecoder, create_stt_backend
+from audio.speech_to_text import SpeechToText
+
+SAMPLE_RATE = 16000
+
+class FakeBackend(STTBackend):
+    """Answers with the audio length, nothing for silence, and fails on NaN."""
+    name = "fake"
+    is_local = True
+
+    def __init__(self):
+        super().__init__("es")
+        self.calls = []
+
+    def transcribe(self, audio, sample_rate):
+        self.calls.append((len(audio), sample_rate))
+        if np.isnan(audio).any():
+            raise RuntimeError("model failure")
+        if not np.any(audio):
+            return None
+        return f"{len(audio) / sample_rate:.1f}"
+
+def test_speech_to_text_uses_backend():
+    """SpeechToText delegates to its backend and turns failures and silence into None."""
+    print("Testing SpeechToText with a backend...")
+    backend = FakeBackend()
+    stt = SpeechToText(backend=backend)
+    assert stt.convert(np.full(SAMPLE_RATE, 0.1, dtype=np.float32), sample_rate=SAMPLE_RATE) == "1.0"
+    assert stt.convert(np.zeros(SAMPLE_RATE, dtype=np.float32), sample_rate=SAMPLE_RATE) is None
+    assert stt.convert(np.full(SAMPLE_RATE, np.nan, dtype=np.float32), sample_rate=SAMPLE_RATE) is None
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stereo.wav")
+        sf.write(path, np.full((48000, 2), 0.1, dtype=np.float32), 48000)
+        assert stt.convert_audio_to_text(path) == "1.0"
+    assert backend.calls[-1] == (48000, 48000)
+    print("✓ Backend results passed through")
+
+def test_factory():
+    """Backends are created by name; unknown names are rejected."""
+    assert isinstance(create_stt_backend("google", language="es"), GoogleSTTBackend)
+    try:
+        create_stt_backend("nope")
+        assert False, "ValueError expected"
+    except ValueError:
+        pass
+    print("✓ Factory")
+
+def test_batching_decoder():
+    """Requests queued while a batch is decoding are decoded together in the next call."""
+    print("Testing batched decoding...")
+    batches = []
+
+    def decode_batch(requests):
+        batches.append(len(requests))
+        time.sleep(0.2)
+        return [f"{len(audio)}" for audio, _ in requests]
+
+    decoder = BatchingDecoder(decode_batch, max_batch=8)
+    first = decoder.submit(np.zeros(100, dtype=np.float32), SAMPLE_RATE)
+    time.sleep(0.05)
+    queued = [decoder.submit(np.zeros(200 + i, dtype=np.float32), SAMPLE_RATE) for i in range(3)]
+    assert first.result(timeout=2.0) == "100"
+    assert [f.result(timeout=2.0) for f in queued] == ["200", "201", "202"]
+    decoder.close()
+    assert batches == [1, 3]
+    assert decoder.metrics["requests"] == 4 and decoder.metrics["max_batch"] == 3
+    print(f"✓ Batches decoded: {batches}")
+
+def test_batching_decoder_errors():
+    """A failed batch fails every request in it, and the decoder keeps running."""
+    calls = []
+
+    def decode_batch(requests):
+        calls.append(len(requests))
+        if len(calls) == 1:
+            raise RuntimeError("model failure")
+        return ["ok"] * len(requests)
+
+    decoder = BatchingDecoder(decode_batch)
+    try:
+        decoder.decode(np.zeros(10, dtype=np.float32), SAMPLE_RATE)
+        assert False, "RuntimeError expected"
+    except RuntimeError:
+        pass
+    assert decoder.decode(np.zeros(10, dtype=np.float32), SAMPLE_RATE) == "ok"
+    decoder.close()
+    print("✓ Errors reach the callers")
+
+class FakePipeline:
+    """Stands in for faster-whisper's BatchedInferencePipeline: one segment per clip start given in `texts`."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append((audio, kwargs))
+        segments = []
+        for clip, parts in zip(kwargs["clip_timestamps"], self.texts):
+            for offset, text in parts:
+                segments.append(types.SimpleNamespace(start=clip["start"] + offset, text=text))
+        return iter(segments), None
+
+def test_whisper_batch_maps_segments_to_requests():
+    """Segments go back to the utterance whose clip they start in; a clip without speech gives None."""
+    backend = WhisperSTTBackend.__new__(WhisperSTTBackend)
+    backend.language = "es"
+    backend.beam_size = 1
+    backend.max_batch = 8
+    backend.pipeline = FakePipeline([
+        [(0.0, " Hola.")],
+        [(0.0, " Enciende "), (0.15, "la radio.")],
+        [],
+        [(0.0, " Gracias.")]
+    ])
+    requests = [
+        (np.zeros(8000, dtype=np.float32), SAMPLE_RATE),  # 0.5s
+        (np.zeros(14400, dtype=np.float32), 48000),  # 0.3s, resampled to 16kHz
+        (np.zeros(3200, dtype=np.float32), SAMPLE_RATE),  # 0.2s of silence
+        (np.zeros(6400, dtype=np.float32), SAMPLE_RATE)  # 0.4s
+    ]
+    assert backend._decode_batch(requests) == ["Hola.", "Enciende la radio.", None, "Gracias."]
+
+    (audio, kwargs), = backend.pipeline.calls
+    assert len(audio) == 8000 + 4800 + 3200 + 6400
+    assert kwargs["batch_size"] == 4 and kwargs["language"] == "es"
+    bounds = [(round(c["start"], 3), round(c["end"], 3)) for c in kwargs["clip_timestamps"]]
+    assert bounds == [(0.0, 0.5), (0.5, 0.8), (0.8, 1.0), (1.0, 1.4)], bounds
+    print("✓ Batched Whisper segments mapped back to their utterances")
+
+if __name__ == "__main__":
+    test_speech_to_text_uses_backend()
+    test_factory()
+    test_batching_decoder()
+    test_batching_decoder_errors()
+    test_whisper_batch_maps_segments_to_requests()
+    print("All STT backend tests passed")
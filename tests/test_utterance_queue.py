@@ -0,0 +1,91 @@
+"""
+Test script for the recorder's utterance hand-off queue (no microphone required).
+"""
+
+import sys
+import os
+import time
+from threading import Thread
+import numpy as np
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.audio_recorder import AudioRecorder
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+from utils.config import PROCESSING_SAMPLE_RATE as SAMPLE_RATE, SILENCE_TIMEOUT
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def make_audio(pattern):
+    """Build audio from (seconds, is_speech) pairs."""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+    return np.concatenate(parts)
+
+def feed(recorder, audio):
+    """Push audio through the recorder's VAD worker as the audio callback would."""
+    recorder.stop_event.clear()
+    recorder.vad_thread = Thread(target=recorder._vad_worker, daemon=True)
+    recorder.vad_thread.start()
+    frame_size = recorder.streaming_vad.frame_size
+    for start in range(0, len(audio) - frame_size + 1, frame_size):
+        recorder.frame_queue.put(audio[start:start + frame_size])
+    while not recorder.frame_queue.empty():
+        time.sleep(0.01)
+
+def test_utterances_are_queued():
+    """Several utterances are captured while none has been consumed yet."""
+    print("Testing utterance queue...")
+    recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()))
+    silence = SILENCE_TIMEOUT + 0.5
+    feed(recorder, make_audio([(0.5, False), (1.0, True), (silence, False), (0.8, True), (silence, False)]))
+
+    first = recorder.get_utterance(timeout=2.0)
+    second = recorder.get_utterance(timeout=2.0)
+    recorder.stop_event.set()
+    recorder.vad_thread.join(timeout=2.0)
+
+    assert first is not None and second is not None
+    assert recorder.get_utterance(timeout=0.1) is None
+    assert [e.event_type for e in first.vad_events] == ["start", "end"]
+    assert first.onset_sample < first.end_sample <= second.onset_sample
+    assert first.start_time <= first.detected_time <= first.end_time
+    assert abs(first.duration - len(first.audio) / SAMPLE_RATE) < 1e-9
+    # The second utterance's buffer is separate, so the first one's audio is intact
+    assert np.abs(first.audio).max() > 0.2
+    print(f"✓ Queued utterances of {first.duration:.2f}s and {second.duration:.2f}s")
+
+def test_compatible_wait_api():
+    """wait_for_speech/get_audio_data/reset_detection_event still work on top of the queue."""
+    recorder = AudioRecorder(streaming_vad=StreamingVAD(EnergyModel()))
+    feed(recorder, make_audio([(0.3, False), (1.0, True), (SILENCE_TIMEOUT + 0.5, False)]))
+
+    assert recorder.wait_for_speech(timeout=2.0)
+    assert recorder.get_audio_data() is not None
+    recorder.reset_detection_event()
+    assert recorder.get_audio_data() is None
+    assert not recorder.wait_for_speech(timeout=0.1)
+    recorder.stop_event.set()
+    recorder.vad_thread.join(timeout=2.0)
+
+if __name__ == "__main__":
+    test_utterances_are_queued()
+    test_compatible_wait_api()
+    print("All utterance queue tests passed")
@@ -0,0 +1,144 @@
+"""
+Test script for the endpointer and the offline VAD benchmark (no microphone required).
+"""
+
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+import soundfile as sf
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.endpointer import Endpointer, AdaptiveEndpointer
+from audio.vad_backends import VADBackend
+from utils.vad_benchmark import run_benchmark
+
+SAMPLE_RATE = 16000
+
+class EnergyModel(VADBackend):
+    """Stand-in for the Silero model: loud frames are speech."""
+    name = "energy"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+
+    def __call__(self, frame):
+        return 1.0 if float(np.sqrt(np.mean(frame ** 2))) > 0.05 else 0.0
+
+    def reset_states(self):
+        pass
+
+def write_labelled_wav(directory, name, pattern):
+    """Write a WAV file from (seconds, is_speech) pairs and its sidecar labels."""
+    parts = []
+    segments = []
+    position = 0.0
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append((0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+            segments.append([position, position + seconds])
+        else:
+            parts.append(np.zeros(n, dtype=np.float32))
+        position += seconds
+    sf.write(os.path.join(directory, name + ".wav"), np.concatenate(parts), SAMPLE_RATE)
+    with open(os.path.join(directory, name + ".json"), "w") as f:
+        json.dump({"segments": segments}, f)
+
+def test_endpointer_counts_samples():
+    """The utterance ends once more than the timeout of silence has been processed."""
+    print("Testing endpointer...")
+    endpointer = Endpointer(SAMPLE_RATE, silence_timeout=0.5)
+    assert endpointer.update(False, 512) is None
+    assert endpointer.update(True, 8000) == Endpointer.START
+    assert endpointer.update(True, 512) is None
+    assert endpointer.update(False, 8000) is None  # Exactly the timeout
+    assert endpointer.update(False, 512) == Endpointer.END
+    assert not endpointer.is_active
+    assert abs(endpointer.duration - (17024 / SAMPLE_RATE)) < 1e-9
+    print("✓ Endpointer ends utterances after the silence timeout")
+
+def test_benchmark_report():
+    """The benchmark reports latencies, false triggers and misses per file and in total."""
+    print("Testing VAD benchmark...")
+    with tempfile.TemporaryDirectory() as directory:
+        write_labelled_wav(directory, "two_phrases", [(1.0, False), (1.0, True), (2.0, False), (0.8, True), (2.0, False)])
+        write_labelled_wav(directory, "silence", [(3.0, False)])
+        # A label with no audible speech shows up as a missed segment
+        write_labelled_wav(directory, "missed", [(1.0, False), (1.0, True), (2.0, False)])
+        with open(os.path.join(directory, "missed.json"), "w") as f:
+            json.dump({"segments": [[0.2, 0.6], [1.0, 2.0]]}, f)
+
+        report = run_benchmark(directory, vad_backend=EnergyModel(), energy_gate=True,
+                               silence_timeout=1.0, endpointer_mode="fixed", min_phrase_duration=0.5)
+
+    summary = report["summary"]
+    assert summary["files"] == 3
+    assert summary["segments"] == 4
+    assert summary["utterances"] == 3
+    assert summary["false_triggers"] == 0
+    assert summary["missed_segments"] == 1
+    assert summary["clipped_onsets"] == 0
+    # Onset is reported within one block, end of speech after the silence timeout
+    assert summary["onset_latency"]["max"] < 0.07
+    assert 1.0 <= summary["eos_latency"]["median"] < 1.1
+    assert summary["cpu_per_audio_second"] < 1.0
+    assert summary["skip_ratio"] > 0.0
+    print(f"✓ Onset latency {summary['onset_latency']['median'] * 1000:.0f}ms, "
+          f"EOS latency {summary['eos_latency']['median'] * 1000:.0f}ms, "
+          f"CPU {summary['cpu_per_audio_second'] * 1000:.2f}ms per audio second")
+
+def test_adaptive_endpointer_learns_pauses():
+    """Pauses inside a turn set the hang-over; a hesitation or incomplete text extends it."""
+    print("Testing adaptive endpointer...")
+    endpointer = AdaptiveEndpointer(SAMPLE_RATE, silence_timeout=1.5)
+    endpointer.update(True, 512)
+    for _ in range(5):
+        for _ in range(20):
+            endpointer.update(True, 512, 0.9)
+        for _ in range(8):  # ~0.26s pause, then speech resumes
+            endpointer.update(False, 512, 0.02)
+    endpointer.update(True, 512, 0.9)
+    assert len(endpointer.pauses) == 5
+    assert endpointer.pause_estimate < 0.4
+
+    while endpointer.update(False, 512, 0.02) != Endpointer.END:
+        pass
+    hangover = endpointer.get_metrics()["hangover_last"]
+    assert 0.3 <= hangover < 0.6
+    assert endpointer.shortened_decisions == 1
+
+    # Incomplete text doubles down on waiting, bounded by the maximum
+    endpointer = AdaptiveEndpointer(SAMPLE_RATE, silence_timeout=1.5, completeness_hook=lambda: 0.0)
+    endpointer.update(True, 512)
+    while endpointer.update(False, 512, 0.02) != Endpointer.END:
+        pass
+    assert endpointer.hangovers[-1] > 0.8 and endpointer.completeness_calls == 1
+    print(f"✓ Hang-over {hangover:.2f}s after learning 0.26s pauses")
+
+def test_benchmark_adaptive_hangover():
+    """On multi-phrase turns the adaptive hang-over is well below the fixed timeout without splitting turns."""
+    print("Testing adaptive endpointing on the benchmark...")
+    with tempfile.TemporaryDirectory() as directory:
+        turn = [(0.6, True), (0.3, False), (0.5, True), (0.25, False), (0.7, True)]
+        write_labelled_wav(directory, "turns", [(0.5, False)] + (turn + [(2.5, False)]) * 6)
+        fixed = run_benchmark(directory, vad_backend=EnergyModel(), silence_timeout=1.5, endpointer_mode="fixed")
+        adaptive = run_benchmark(directory, vad_backend=EnergyModel(), silence_timeout=1.5, endpointer_mode="adaptive")
+
+    assert fixed["summary"]["utterances"] == adaptive["summary"]["utterances"] == 6
+    assert adaptive["summary"]["missed_segments"] == 0
+    assert fixed["summary"]["hangover"]["median"] > 1.5
+    assert adaptive["summary"]["hangover"]["median"] < 0.75
+    print(f"✓ Median hang-over {fixed['summary']['hangover']['median']:.2f}s fixed, "
+          f"{adaptive['summary']['hangover']['median']:.2f}s adaptive")
+
+if __name__ == "__main__":
+    test_endpointer_counts_samples()
+    test_benchmark_report()
+    test_adaptive_endpointer_learns_pauses()
+    test_benchmark_adaptive_hangover()
+    print("All VAD benchmark tests passed")
@@ -0,0 +1,121 @@
+"""
+Test script for the capture/inference split in AudioRecorder (frame queue, dropped frames, drain on stop).
+"""
+
+import sys
+import os
+import time
+import queue
+import numpy as np
+from threading import Event
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.audio_source import AudioSource
+from audio.audio_recorder import AudioRecorder
+from audio.streaming_vad import StreamingVAD
+from audio.vad_backends import VADBackend
+
+SAMPLE_RATE = 16000
+QUEUE_SIZE = 4
+INFERENCE_TIME = 0.02
+
+class GatedModel(VADBackend):
+    """Stand-in for the Silero model whose inference blocks until released, then takes INFERENCE_TIME."""
+    name = "gated"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE)
+        self.started = Event()
+        self.release = Event()
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5.0)
+        time.sleep(INFERENCE_TIME)
+        return 0.0
+
+    def reset_states(self):
+        pass
+
+class ManualSource(AudioSource):
+    """Paced source whose blocks are pushed by the test, like a microphone callback."""
+    name = "manual"
+
+    def __init__(self):
+        super().__init__(SAMPLE_RATE, paced=True)
+        self.callback = None
+        self.ready = Event()
+
+    def start(self, callback, blocksize):
+        self.callback = callback
+        self.ready.set()
+
+    def stop(self):
+        pass
+
+def make_recorder():
+    model = GatedModel()
+    source = ManualSource()
+    recorder = AudioRecorder(streaming_vad=StreamingVAD(model), source=source)
+    recorder.frame_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    recorder.start_listening()
+    assert source.ready.wait(2.0)
+    return recorder, model, source
+
+def test_callback_drops_instead_of_blocking():
+    print("Testing a callback faster than the VAD worker...")
+    recorder, model, source = make_recorder()
+    block = np.zeros(recorder.blocksize, dtype=np.float32)
+
+    # The worker takes the first block and blocks in inference
+    source.callback(block)
+    assert model.started.wait(2.0)
+
+    slowest = 0.0
+    for _ in range(QUEUE_SIZE + 3):
+        start = time.perf_counter()
+        source.callback(block)
+        slowest = max(slowest, time.perf_counter() - start)
+    assert slowest < 0.01, f"callback blocked for {slowest * 1000:.1f}ms"
+
+    metrics = recorder.get_vad_metrics()
+    assert metrics["dropped_frames"] == 3, metrics["dropped_frames"]
+    assert metrics["queue_depth"] == QUEUE_SIZE
+    assert metrics["frames_processed"] == 0
+
+    model.release.set()
+    recorder.stop()
+    print(f"✓ 3 blocks dropped, slowest callback {slowest * 1000:.2f}ms")
+    return recorder
+
+def test_worker_drains_queue_on_stop():
+    print("Testing the drain on stop...")
+    recorder, model, source = make_recorder()
+    block = np.zeros(recorder.blocksize, dtype=np.float32)
+    source.callback(block)
+    assert model.started.wait(2.0)
+    for _ in range(QUEUE_SIZE):
+        source.callback(block)
+
+    # Stop while every queued block is still waiting for inference
+    model.release.set()
+    recorder.stop()
+
+    metrics = recorder.get_vad_metrics()
+    assert metrics["frames_processed"] == QUEUE_SIZE + 1, metrics["frames_processed"]
+    assert metrics["queue_depth"] == 0 and recorder.frame_queue.unfinished_tasks == 0
+    assert metrics["max_queue_depth"] == QUEUE_SIZE
+    assert metrics["dropped_frames"] == 0
+    # Inference time is measured per block (at least INFERENCE_TIME per model call)
+    assert metrics["inference_ms_max"] >= INFERENCE_TIME * 1000
+    assert metrics["inference_ms_avg"] >= INFERENCE_TIME * 1000
+    print(f"✓ Drained {metrics['frames_processed']} blocks, inference avg {metrics['inference_ms_avg']:.1f}ms")
+
+if __name__ == "__main__":
+    test_callback_drops_instead_of_blocking()
+    test_worker_drains_queue_on_stop()
+    print("All VAD queue tests passed")
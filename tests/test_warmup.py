@@ -0,0 +1,161 @@
+"""
+Test script for the warm-up manager (startup and idle warm-ups, deferral during turns).
+"""
+
+import sys
+import os
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.warmup as warmup
+from utils.warmup import WarmupManager, create_warmup_manager
+from ai.local_llm_processor import LocalLLMProcessor
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_startup_and_idle_rounds():
+    """The first round runs at start with startup=True; later ones after `interval` idle seconds."""
+    calls = []
+    warmup.POLL_INTERVAL = 0.02
+    manager = WarmupManager(interval=0.3)
+    manager.add_target("llm", lambda startup: calls.append(("llm", startup)) or True)
+    manager.add_target("tts", lambda startup: calls.append(("tts", startup)) or True)
+    manager.start()
+    try:
+        assert wait_for(lambda: len(calls) >= 2)
+        assert calls[:2] == [("llm", True), ("tts", True)], calls
+        time.sleep(0.15)
+        assert len(calls) == 2, "warmed again before the interval"
+        assert wait_for(lambda: len(calls) >= 4)
+        assert calls[2:4] == [("llm", False), ("tts", False)], calls
+    finally:
+        manager.stop()
+    assert manager.get_metrics()["targets"]["tts"]["warmed"] >= 2
+    print("✓ Warmed at startup and again after the idle interval")
+
+def test_no_warmup_during_turn():
+    calls = []
+    speaking = {"value": True}
+    warmup.POLL_INTERVAL = 0.02
+    manager = WarmupManager(interval=0.2, is_busy=lambda: speaking["value"])
+    manager.add_target("llm", lambda startup: calls.append(startup) or True)
+    manager.start()
+    try:
+        time.sleep(0.2)
+        assert calls == [], "warmed while the user was speaking"
+        speaking["value"] = False
+        with manager.turn():
+            time.sleep(0.3)
+            assert calls == [], "warmed during a turn"
+        # The turn used the connections, so the next warm-up waits a full interval
+        time.sleep(0.1)
+        assert calls == []
+        assert wait_for(lambda: calls == [True])
+    finally:
+        manager.stop()
+    print("✓ No warm-up while speaking or answering")
+
+def test_round_interrupted_by_turn():
+    """A turn starting in the middle of a round defers the remaining targets until it ends."""
+    calls = []
+    manager = WarmupManager(interval=60.0)
+    turn = manager.turn()
+
+    def start_turn(startup):
+        calls.append("first")
+        turn.__enter__()
+        return True
+
+    manager.add_target("first", start_turn)
+    manager.add_target("second", lambda startup: calls.append(("second", startup)) or True)
+    assert not manager.warm()
+    assert calls == ["first"] and manager.get_metrics()["deferred"] == 1
+    assert manager.is_due(), "deferred targets are still due"
+    turn.__exit__(None, None, None)
+    assert manager.warm()
+    assert calls == ["first", ("second", True)]
+    assert not manager.is_due()
+    print("✓ Interrupted round finished after the turn")
+
+def test_failures_counted():
+    def broken(startup):
+        raise ConnectionError("down")
+
+    manager = WarmupManager()
+    manager.add_target("broken", broken)
+    manager.add_target("refused", lambda startup: False)
+    assert manager.warm()
+    targets = manager.get_metrics()["targets"]
+    assert targets["broken"]["failures"] == 1 and targets["refused"]["failures"] == 1
+    print("✓ Failed warm-ups counted")
+
+class OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply({"models": [{"name": "mistral:7b"}]})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        OllamaHandler.requests_seen.append((self.path, payload))
+        self._reply({"done": True})
+
+class FakeTTS:
+    api_key = "test-key"
+
+    def __init__(self):
+        self.calls = []
+
+    def warm_up(self, text="", connections=1):
+        self.calls.append((text, connections))
+        return True
+
+def test_factory_warms_ollama_and_tts():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OllamaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        local_llm = LocalLLMProcessor(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+        llm = type("LLM", (), {"openai_client": None, "anthropic_client": None, "local_llm_processor": local_llm,
+                               "deepseek_api_url": "https://api.deepseek.com/v1/chat/completions"})()
+        tts = FakeTTS()
+        manager = create_warmup_manager(llm, tts, tts_connections=3, tts_text="Hola")
+        manager.targets.pop("deepseek", None)  # Only present with a real DEEPSEEK_API_KEY
+        assert list(manager.targets) == ["local_llm", "elevenlabs"]
+        assert manager.warm() and manager.warm()
+        path, payload = OllamaHandler.requests_seen[-1]
+        assert path == "/api/generate" and "prompt" not in payload and payload["keep_alive"]
+        # Only the first round synthesizes speech; every round opens one connection per TTS worker
+        assert tts.calls == [("Hola", 3), ("", 3)], tts.calls
+    finally:
+        server.shutdown()
+    print("✓ Ollama model loaded with keep_alive and TTS connections opened")
+
+if __name__ == "__main__":
+    test_startup_and_idle_rounds()
+    test_no_warmup_during_turn()
+    test_round_interrupted_by_turn()
+    test_failures_counted()
+    test_factory_warms_ollama_and_tts()
+    print("All warm-up tests passed")
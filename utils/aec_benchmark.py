@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark the acoustic echo canceller: echo return loss enhancement (ERLE) and CPU cost.
+
+Runs on a synthetic echo scenario by default (speech-like reference, simulated
+room response and bulk delay, optional double talk), or on a real recording
+pair captured on the kiosk:
+
+    python utils/aec_benchmark.py
+    python utils/aec_benchmark.py --delay-ms 180 --double-talk
+    python utils/aec_benchmark.py --mic mic.wav --reference speaker.wav
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import numpy as np
+import soundfile as sf
+from typing import Dict, Optional
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import AEC_FILTER_MS, AEC_MAX_DELAY_MS
+from audio.echo_canceller import EchoCanceller
+from audio.resampler import resample
+
+SAMPLE_RATE = 16000
+
+def speech_like(seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Noise shaped like a speech spectrum and switched on and off at a syllable rate."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    freqs = np.fft.rfftfreq(n, 1.0 / sample_rate)
+    spectrum *= 1.0 / (1.0 + (freqs / 500.0) ** 2) ** 0.5 * (freqs > 80)
+    audio = np.fft.irfft(spectrum, n)
+    t = np.arange(n) / sample_rate
+    envelope = np.clip(np.sin(2 * np.pi * 3.0 * t + rng.uniform(0, np.pi)), 0, None) ** 0.5
+    envelope *= np.clip(np.sin(2 * np.pi * 0.25 * t) + 0.6, 0, 1)  # Phrases and pauses
+    audio *= envelope
+    return (0.5 * audio / (np.max(np.abs(audio)) + 1e-9)).astype(np.float32)
+
+def room_response(delay_ms: float, tail_ms: float = 120.0, gain: float = 0.6,
+                  sample_rate: int = SAMPLE_RATE, seed: int = 1) -> np.ndarray:
+    """Bulk delay followed by an exponentially decaying reverberation tail."""
+    rng = np.random.default_rng(seed)
+    delay = int(delay_ms / 1000.0 * sample_rate)
+    tail = int(tail_ms / 1000.0 * sample_rate)
+    decay = np.exp(-np.arange(tail) / (tail / 6.0))
+    rir = np.zeros(delay + tail, dtype=np.float32)
+    rir[delay] = 1.0
+    rir[delay + 1:] = 0.3 * rng.standard_normal(tail - 1) * decay[1:]
+    return (gain * rir / np.sqrt(np.sum(rir ** 2))).astype(np.float32)
+
+def simulate(seconds: float, delay_ms: float, double_talk: bool, noise_db: float = -70.0) -> Dict:
+    """Build a reference/microphone pair with a known echo path."""
+    reference = speech_like(seconds)
+    rir = room_response(delay_ms)
+    n_fft = 1 << int(np.ceil(np.log2(len(reference) + len(rir))))
+    echo = np.fft.irfft(np.fft.rfft(reference, n_fft) * np.fft.rfft(rir, n_fft), n_fft)[:len(reference)]
+    mic = echo + 10 ** (noise_db / 20.0) * np.random.default_rng(2).standard_normal(len(echo))
+    near_end = np.zeros_like(mic)
+    if double_talk:
+        # The user talks over the avatar during the last third
+        start = int(len(mic) * 2 / 3)
+        near_end[start:] = speech_like(seconds - start / SAMPLE_RATE, seed=3)
+        mic += near_end
+    return {"reference": reference, "mic": mic.astype(np.float32), "near_end": near_end}
+
+def run_canceller(mic: np.ndarray, reference: np.ndarray, block: int = 512,
+                  filter_ms: float = AEC_FILTER_MS, max_delay_ms: float = AEC_MAX_DELAY_MS) -> Dict:
+    """Feed the reference as playback progresses and the microphone in recorder-sized blocks."""
+    canceller = EchoCanceller(SAMPLE_RATE, filter_ms=filter_ms, max_delay_ms=max_delay_ms)
+    output = np.zeros_like(mic)
+    cpu_start = time.process_time()
+    for start in range(0, len(mic) - block + 1, block):
+        canceller.push_reference(reference[start:start + block])
+        output[start:start + block] = canceller.process(mic[start:start + block])
+    cpu_seconds = time.process_time() - cpu_start
+    return {"output": output, "cpu_seconds": cpu_seconds, "metrics": canceller.get_metrics()}
+
+def erle(mic: np.ndarray, output: np.ndarray, start: int = 0, end: Optional[int] = None) -> float:
+    """Echo return loss enhancement in dB over a span with echo only."""
+    mic_energy = float(np.sum(mic[start:end] ** 2)) + 1e-12
+    out_energy = float(np.sum(output[start:end] ** 2)) + 1e-12
+    return 10.0 * np.log10(mic_energy / out_energy)
+
+def main():
+    """Main function to run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Echo canceller ERLE and CPU benchmark")
+    parser.add_argument("--mic", help="Microphone recording (WAV) with the avatar's echo")
+    parser.add_argument("--reference", help="Audio sent to the loudspeaker during the recording (WAV)")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of the synthetic scenario")
+    parser.add_argument("--delay-ms", type=float, default=120.0, help="Synthetic bulk delay")
+    parser.add_argument("--double-talk", action="store_true", help="Add near-end speech to the synthetic scenario")
+    parser.add_argument("--filter-ms", type=float, default=AEC_FILTER_MS)
+    parser.add_argument("--max-delay-ms", type=float, default=AEC_MAX_DELAY_MS)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    if args.mic and args.reference:
+        mic, mic_rate = sf.read(args.mic, dtype="float32", always_2d=True)
+        reference, ref_rate = sf.read(args.reference, dtype="float32", always_2d=True)
+        mic = resample(mic.mean(axis=1), mic_rate, SAMPLE_RATE)
+        reference = resample(reference.mean(axis=1), ref_rate, SAMPLE_RATE)
+        scenario = {"mic": mic, "reference": reference, "near_end": None}
+        source = {"mic": args.mic, "reference": args.reference}
+    else:
+        scenario = simulate(args.seconds, args.delay_ms, args.double_talk)
+        source = {"synthetic": True, "delay_ms": args.delay_ms, "double_talk": args.double_talk}
+
+    result = run_canceller(scenario["mic"], scenario["reference"],
+                           filter_ms=args.filter_ms, max_delay_ms=args.max_delay_ms)
+    mic = scenario["mic"]
+    output = result["output"]
+    audio_seconds = len(mic) / SAMPLE_RATE
+
+    # ERLE over echo-only audio, after two seconds of convergence
+    converge = 2 * SAMPLE_RATE
+    echo_only_end = int(len(mic) * 2 / 3) if scenario["near_end"] is not None and np.any(scenario["near_end"]) else None
+    report = {
+        "source": source,
+        "config": {"filter_ms": args.filter_ms, "max_delay_ms": args.max_delay_ms},
+        "audio_seconds": audio_seconds,
+        "erle_db": erle(mic, output, converge, echo_only_end),
+        "erle_db_including_convergence": erle(mic, output, 0, echo_only_end),
+        "cpu_seconds": result["cpu_seconds"],
+        "cpu_ms_per_audio_second": 1000.0 * result["cpu_seconds"] / audio_seconds,
+        "canceller": result["metrics"]
+    }
+    if echo_only_end is not None:
+        # How much of the user's speech survives during double talk
+        near_end = scenario["near_end"][echo_only_end:]
+        residual = output[echo_only_end:] - near_end
+        report["double_talk_near_end_to_residual_db"] = 10.0 * np.log10(
+            (np.sum(near_end ** 2) + 1e-12) / (np.sum(residual ** 2) + 1e-12))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"📊 Report written to {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,15 @@ class Config:
         self.CHATGPT_MODEL = os.getenv("CHATGPT_MODEL", "gpt-4o-mini")
         self.CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet")
         self.DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+        self.LLM_RACE_WIDTH = int(os.getenv("LLM_RACE_WIDTH", "2"))  # Providers streamed at once with AI_PROVIDER=fastest; the first token wins (1 = one after another)
+        self.LLM_PROVIDER_COSTS = {name.strip(): float(cost) for name, cost in (
+            item.split(":") for item in os.getenv("LLM_PROVIDER_COSTS", "").split(",") if item.strip()
+        )}  # Relative cost per provider, e.g. "chatgpt:1,claude:3,deepseek:0.5,local_llm:0"; cheapest are raced first
+        self.LLM_ROUTER = os.getenv("LLM_ROUTER", "true").lower() == "true"  # Rank providers by observed latency/errors, with circuit breakers
+        self.LLM_ROUTER_STATE = os.getenv("LLM_ROUTER_STATE", "llm_router_stats.json")  # Provider statistics kept across restarts
+        self.LLM_ROUTER_FAILURES = int(os.getenv("LLM_ROUTER_FAILURES", "3"))  # Consecutive failures that open a provider's circuit
+        self.LLM_ROUTER_COOLDOWN = float(os.getenv("LLM_ROUTER_COOLDOWN", "30"))  # Seconds before a failing provider is probed (doubles per failed probe)
+        self.LLM_ROUTER_COST_WEIGHT = float(os.getenv("LLM_ROUTER_COST_WEIGHT", "0.25"))  # Ranking score = expected time to first audio * (1 + weight * cost); 0 ranks by latency alone
         
         # Local LLM Settings (Ollama)
         self.USE_LOCAL_LLM = os.getenv("USE_LOCAL_LLM", "false").lower() == "true"
@@ -30,6 +39,7 @@ class Config:
         self.LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "mistral:7b")
         self.LOCAL_LLM_TEMPERATURE = float(os.getenv("LOCAL_LLM_TEMPERATURE", "0.7"))
         self.LOCAL_LLM_MAX_TOKENS = int(os.getenv("LOCAL_LLM_MAX_TOKENS", "500"))
+        self.LOCAL_LLM_KEEP_ALIVE = os.getenv("LOCAL_LLM_KEEP_ALIVE", "10m")  # How long Ollama keeps the model loaded after a request
         
         self.SYSTEM_PROMPT = os.getenv("SYSTEM_PROMPT", "Eres un asistente de voz útil y amigable, contestas preguntas de la marca Hyundai. 1. Responde en español de manera natural y conversacional. 2. Muchas veces la informacion te va a llegar entrecortada, intenta completar la pregunta del usuario segun el contexto. 3. No le digas nunca que la pregunta esta incompleta, intenta completarla segun el contexto. 4. Siempre que puedas, intenta completar la pregunta del usuario segun el contexto.")
 
@@ -38,17 +48,59 @@ class Config:
 
         # Audio Settings
         self.AUDIO_DEVICE = int(os.getenv("AUDIO_DEVICE", "2")) if os.getenv("AUDIO_DEVICE") else None
-        self.SAMPLE_RATE = int(os.getenv("SAMPLE_RATE", "16000"))  # Silero VAD works best at 16kHz
+        self.SAMPLE_RATE = int(os.getenv("SAMPLE_RATE", "16000"))  # Capture rate of the input device
+        self.PROCESSING_SAMPLE_RATE = int(os.getenv("PROCESSING_SAMPLE_RATE", "16000"))  # Rate for AEC, VAD and STT (Silero needs 16kHz or 8kHz)
         self.TARGET_SAMPLE_RATE = int(os.getenv("TARGET_SAMPLE_RATE", "24000"))  # Target sample rate for TTS output
         self.CHANNELS = int(os.getenv("CHANNELS", "1"))
+        self.AUDIO_SOURCE = os.getenv("AUDIO_SOURCE", "device")  # "device", "file:<path>", "tcp://host:port", "unix://<path>" or "pipe:<path>"
+        self.AUDIO_SOURCE_REALTIME = os.getenv("AUDIO_SOURCE_REALTIME", "true").lower() == "true"  # Replay files at real-time speed
         self.MIN_PHRASE_DURATION = float(os.getenv("MIN_PHRASE_DURATION", "0.5"))
         
         # Silero VAD Settings
         self.SILENCE_TIMEOUT = float(os.getenv("SILENCE_TIMEOUT", "1.5"))  # Seconds of silence before stopping recording
         self.MIN_SPEECH_DURATION = float(os.getenv("MIN_SPEECH_DURATION", "0.3"))  # Minimum speech duration to consider valid
+        self.VAD_MODE = os.getenv("VAD_MODE", "streaming")  # "streaming" (per-frame, stateful) or "chunk" (1s blocks)
+        self.VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.5"))  # Speech probability for onsets
+        self.VAD_NEG_THRESHOLD = float(os.getenv("VAD_NEG_THRESHOLD", "0.35"))  # Speech probability for offsets (hysteresis)
+        self.VAD_QUEUE_SIZE = int(os.getenv("VAD_QUEUE_SIZE", "64"))  # Captured blocks buffered for the VAD worker before dropping
+        self.VAD_BACKEND = os.getenv("VAD_BACKEND", "torch")  # "torch" (TorchScript via torch.hub) or "onnx" (ONNX Runtime, no torch)
+        self.VAD_NUM_THREADS = int(os.getenv("VAD_NUM_THREADS", "1"))  # Inference threads for the VAD model
+        self.VAD_ONNX_MODEL_PATH = os.getenv("VAD_ONNX_MODEL_PATH", "")  # Optional path to silero_vad.onnx
+        self.VAD_ENERGY_GATE = os.getenv("VAD_ENERGY_GATE", "true").lower() == "true"  # Skip the model on frames clearly below the noise floor
+        self.VAD_GATE_MARGIN_DB = float(os.getenv("VAD_GATE_MARGIN_DB", "6.0"))  # Level above the noise floor that always runs the model
+        self.AEC_ENABLED = os.getenv("AEC_ENABLED", "true").lower() == "true"  # Cancel the avatar's own speech before VAD
+        self.AEC_FILTER_MS = float(os.getenv("AEC_FILTER_MS", "256"))  # Echo tail modelled by the adaptive filter
+        self.AEC_MAX_DELAY_MS = float(os.getenv("AEC_MAX_DELAY_MS", "500"))  # Largest speaker-to-microphone delay searched
+        self.ENDPOINTER_MODE = os.getenv("ENDPOINTER_MODE", "adaptive")  # "adaptive" (learned hang-over) or "fixed" (always SILENCE_TIMEOUT)
+        self.ENDPOINTER_MIN_HANGOVER = float(os.getenv("ENDPOINTER_MIN_HANGOVER", "0.3"))  # Shortest silence that ends a turn (adaptive)
+        self.ENDPOINTER_MAX_HANGOVER = float(os.getenv("ENDPOINTER_MAX_HANGOVER", str(self.SILENCE_TIMEOUT)))  # Longest silence before a turn ends (adaptive)
 
         # Audio File Paths
         self.TEMP_AUDIO_PATH = "temp_audio.wav"
+        self.ARCHIVE_UTTERANCES = os.getenv("ARCHIVE_UTTERANCES", "false").lower() == "true"  # Save every utterance as WAV in the background
+        self.ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "recordings")  # Directory for archived utterances
+        self.STT_TRIM = os.getenv("STT_TRIM", "true").lower() == "true"  # Upload only the speech spans found by the VAD
+        self.STT_TRIM_MARGIN_BEFORE = float(os.getenv("STT_TRIM_MARGIN_BEFORE", "0.3"))  # Seconds kept before the first onset
+        self.STT_TRIM_MARGIN_AFTER = float(os.getenv("STT_TRIM_MARGIN_AFTER", "0.3"))  # Seconds kept after the last offset
+        self.STT_TRIM_MAX_PAUSE = float(os.getenv("STT_TRIM_MAX_PAUSE", "0.5"))  # Longer pauses inside a turn are shortened to this
+        self.STREAMING_STT = os.getenv("STREAMING_STT", "none")  # "none" (recognize after the turn) or "websocket" (stream audio while the user speaks)
+        self.STREAMING_STT_URL = os.getenv("STREAMING_STT_URL", "ws://127.0.0.1:8765")  # Streaming recognition server
+        self.STREAMING_STT_FINAL_TIMEOUT = float(os.getenv("STREAMING_STT_FINAL_TIMEOUT", "1.0"))  # Seconds to wait for the final transcript before batch recognition
+        self.STT_SPECULATIVE = os.getenv("STT_SPECULATIVE", "false").lower() == "true"  # Start batch recognition at the VAD offset, during the hang-over
+        self.STT_SPECULATIVE_TIMEOUT = float(os.getenv("STT_SPECULATIVE_TIMEOUT", "2.0"))  # Seconds to wait for a speculative transcript after the turn before recognizing again
+        self.STT_SEGMENTED = os.getenv("STT_SEGMENTED", "true").lower() == "true"  # Recognize long turns as parallel segments cut at VAD pauses
+        self.STT_SEGMENT_MIN = float(os.getenv("STT_SEGMENT_MIN", "2.0"))  # Shortest segment in seconds
+        self.STT_MAX_PARALLEL = int(os.getenv("STT_MAX_PARALLEL", "4"))  # Segments recognized at the same time
+        self.STT_BACKEND = os.getenv("STT_BACKEND", "google")  # "google" (web API) or "whisper" (local CPU model, needs faster-whisper)
+        self.STT_WHISPER_MODEL = os.getenv("STT_WHISPER_MODEL", "small")  # Whisper model size or CTranslate2 model directory
+        self.STT_WHISPER_COMPUTE_TYPE = os.getenv("STT_WHISPER_COMPUTE_TYPE", "int8")  # Weight quantization for the local model
+        self.STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "4"))  # Threads the local model may use
+        self.STT_MAX_BATCH = int(os.getenv("STT_MAX_BATCH", "8"))  # Queued utterances/segments decoded together by the local model
+        self.STT_WARMUP = os.getenv("STT_WARMUP", "true").lower() == "true"  # Run a throw-away recognition at startup
+        self.STT_TIMEOUT = float(os.getenv("STT_TIMEOUT", "10.0"))  # Seconds before a recognition request is abandoned
+        self.STT_HEDGE_BACKEND = os.getenv("STT_HEDGE_BACKEND", "none")  # Backend that also gets slow requests ("none", "google" or "whisper")
+        self.STT_HEDGE_PERCENTILE = float(os.getenv("STT_HEDGE_PERCENTILE", "95"))  # Primary latency percentile after which a request is hedged
+        self.STT_HEDGE_MIN_DELAY = float(os.getenv("STT_HEDGE_MIN_DELAY", "0.2"))  # Shortest wait (seconds) before hedging
         self.RESPONSE_AUDIO_PATH = "response_audio.wav"
 
         # ElevenLabs Settings
@@ -80,6 +132,18 @@ class Config:
         self.STREAMING_MAX_WORKERS = int(os.getenv("STREAMING_MAX_WORKERS", "3"))
         self.STREAMING_MIN_CHUNK_SIZE = int(os.getenv("STREAMING_MIN_CHUNK_SIZE", "20"))
         self.STREAMING_MAX_CHUNK_SIZE = int(os.getenv("STREAMING_MAX_CHUNK_SIZE", "200"))
+        
+        # HTTP Transport Settings (shared keep-alive connections for DeepSeek, Ollama and ElevenLabs)
+        self.HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", str(self.STREAMING_MAX_WORKERS)))  # Kept-alive connections per host (one per TTS worker)
+        self.HTTP_MAX_HOSTS = int(os.getenv("HTTP_MAX_HOSTS", "10"))  # Hosts whose connection pools are kept
+        self.HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))  # Seconds to establish a connection
+        self.HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))  # Seconds without data before a response is abandoned
+        self.HTTP2 = os.getenv("HTTP2", "false").lower() == "true"  # HTTP/2 multiplexing through httpx (pip install "httpx[http2]")
+        
+        # Warm-up Settings (connections and models kept ready between turns)
+        self.WARMUP = os.getenv("WARMUP", "true").lower() == "true"  # Warm connections and the local model at startup and while idle
+        self.WARMUP_INTERVAL = float(os.getenv("WARMUP_INTERVAL", "45"))  # Idle seconds between warm-ups (below typical server keep-alive timeouts)
+        self.WARMUP_TTS_TEXT = os.getenv("WARMUP_TTS_TEXT", "Hola")  # Text of the tiny TTS request sent at startup (empty: no TTS request)
 
 # Create a global instance
 config = Config()
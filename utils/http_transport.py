@@ -0,0 +1,230 @@
+"""
+Module for the shared HTTP transport used by the LLM and TTS clients.
+
+Every request made with a bare requests.post opens a new TCP connection
+(and TLS session), which adds one or two round trips to every LLM turn and
+every TTS chunk. The transport keeps connections alive in per-host pools
+sized to the number of TTS workers, applies explicit connect/read timeouts
+and can optionally use HTTP/2 through httpx, so concurrent requests to one
+host share a single connection.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_MAX_HOSTS, HTTP2
+)
+
+logger = logging.getLogger(__name__)
+
+@contextmanager
+def _requests_errors():
+    """Re-raise httpx errors as the requests exceptions callers already handle."""
+    import httpx
+    try:
+        yield
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+
+class HTTPXResponse:
+    def __init__(self, response):
+        """
+        The parts of requests.Response the clients use, on top of an httpx response.
+
+        Lines are yielded as bytes and httpx errors are raised as their
+        requests counterparts, so callers work the same over both transports.
+
+        Args:
+            response: httpx.Response (possibly still streaming)
+        """
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        with _requests_errors():
+            return self._response.read()
+
+    @property
+    def text(self) -> str:
+        with _requests_errors():
+            self._response.read()
+        return self._response.text
+
+    def json(self):
+        with _requests_errors():
+            self._response.read()
+        return self._response.json()
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        with _requests_errors():
+            yield from self._response.iter_bytes(chunk_size)
+
+    def iter_lines(self) -> Iterator[bytes]:
+        with _requests_errors():
+            for line in self._response.iter_lines():
+                yield line.encode("utf-8")
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        self._response.close()
+
+class HTTPTransport:
+    def __init__(self, max_connections_per_host: int = 3, max_hosts: int = 10,
+                 connect_timeout: float = 3.05, read_timeout: float = 30.0, http2: bool = False):
+        """
+        Keep-alive HTTP connections shared by all clients.
+
+        Args:
+            max_connections_per_host: Connections kept alive per host (the number of requests
+                to one host that can run at the same time without opening a new connection)
+            max_hosts: Hosts whose connection pools are kept
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds without data before a response is abandoned
+            http2: Use HTTP/2 through httpx when it is installed (pip install "httpx[http2]")
+        """
+        self.max_connections_per_host = max_connections_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._httpx_requests: Dict[str, int] = {}
+        self._httpx_connections: Dict[str, set] = {}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_connections_per_host, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.httpx_client = None
+        if http2:
+            try:
+                import httpx
+                import h2  # noqa: F401  (httpx needs it for HTTP/2)
+                self.httpx_client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=max_connections_per_host * max_hosts,
+                                        max_keepalive_connections=max_connections_per_host * max_hosts)
+                )
+                logger.info("HTTP/2 transport enabled")
+            except ImportError:
+                logger.warning("HTTP2 is enabled but httpx[http2] is not installed, using HTTP/1.1 keep-alive")
+
+    def _timeout(self, timeout) -> tuple:
+        """(connect, read) timeout; a single number from the caller replaces the read timeout."""
+        if timeout is None:
+            return (self.connect_timeout, self.read_timeout)
+        if isinstance(timeout, tuple):
+            return timeout
+        return (self.connect_timeout, timeout)
+
+    def request(self, method: str, url: str, timeout=None, stream: bool = False, **kwargs):
+        """
+        Send a request over a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            timeout: Read timeout in seconds or a (connect, read) tuple (default: the transport's timeouts)
+            stream: Return before the body is read (iterate with iter_lines/iter_content, then close())
+            **kwargs: requests arguments (json, data, headers, params)
+
+        Returns:
+            requests.Response, or an HTTPXResponse with the same interface over HTTP/2
+        """
+        connect, read = self._timeout(timeout)
+        if self.httpx_client is not None:
+            return self._httpx_request(method, url, connect, read, stream, **kwargs)
+        return self.session.request(method, url, timeout=(connect, read), stream=stream, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def _httpx_request(self, method: str, url: str, connect: float, read: float, stream: bool,
+                       json=None, data=None, headers=None, params=None):
+        import httpx
+        request = self.httpx_client.build_request(method, url, json=json, content=data, headers=headers,
+                                                  params=params, timeout=httpx.Timeout(read, connect=connect))
+        with _requests_errors():
+            response = self.httpx_client.send(request, stream=True)
+        # HTTP/2 requests to a host share one connection; count the distinct ones seen per host
+        host = request.url.host
+        network_stream = response.extensions.get("network_stream")
+        with self._lock:
+            self._httpx_requests[host] = self._httpx_requests.get(host, 0) + 1
+            self._httpx_connections.setdefault(host, set()).add(id(network_stream))
+        if not stream:
+            with _requests_errors():
+                response.read()
+            response.close()
+        return HTTPXResponse(response)
+
+    def get_metrics(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get connection reuse per host.
+
+        Returns:
+            Dictionary per host with the requests sent, the connections opened and the
+            requests that reused an open connection
+        """
+        metrics = {}
+        for host, requests_sent, connections in self._pool_counts():
+            host_metrics = metrics.setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+            host_metrics["requests"] += requests_sent
+            host_metrics["connections"] += connections
+            host_metrics["reused"] += max(requests_sent - connections, 0)
+        return metrics
+
+    def _pool_counts(self):
+        if self.httpx_client is not None:
+            with self._lock:
+                for host, requests_sent in self._httpx_requests.items():
+                    yield host, requests_sent, len(self._httpx_connections[host])
+            return
+        # http:// and https:// share one adapter, so one pool manager holds every host
+        pools = self.session.get_adapter("https://").poolmanager.pools
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                # Evicted meanwhile
+                continue
+            yield pool.host, pool.num_requests, pool.num_connections
+
+    def close(self):
+        self.session.close()
+        if self.httpx_client is not None:
+            self.httpx_client.close()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HTTPTransport:
+    """The process-wide transport, created from the configuration on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HTTPTransport(max_connections_per_host=HTTP_MAX_CONNECTIONS_PER_HOST, max_hosts=HTTP_MAX_HOSTS,
+                                       connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+                                       http2=HTTP2)
+        return _transport
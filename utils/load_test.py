@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Script to load-test the capture/VAD/endpointing pipeline without a sound card.
+
+Runs several AudioRecorder instances side by side, each replaying a file
+through a FileSource, and reports throughput and latency as JSON:
+
+    python utils/load_test.py recordings/turns.wav --streams 8
+    python utils/load_test.py recordings/ --streams 4 --realtime --shared-vad
+
+The full assistant can be driven the same way with AUDIO_SOURCE, e.g.
+`AUDIO_SOURCE=file:recordings/turns.wav python main.py`.
+"""
+
+import sys
+import os
+import json
+import glob
+import time
+import argparse
+import logging
+import numpy as np
+from threading import Thread
+from typing import Dict, List, Optional
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import VAD_BACKEND, VAD_ONNX_MODEL_PATH, PROCESSING_SAMPLE_RATE
+from audio.audio_source import FileSource
+from audio.audio_recorder import AudioRecorder
+
+def _consume(recorder: AudioRecorder, results: List[Dict]):
+    """Take utterances as a pipeline would and note how long each one waited."""
+    while not recorder.stop_event.is_set() or not recorder.utterance_queue.empty():
+        utterance = recorder.get_utterance(timeout=0.1)
+        if utterance is None:
+            continue
+        results.append({
+            "duration": utterance.duration,
+            "queue_wait_ms": (time.time() - utterance.end_time) * 1000
+        })
+
+def _distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    array = np.asarray(values)
+    return {
+        "mean": float(np.mean(array)),
+        "median": float(np.median(array)),
+        "p90": float(np.percentile(array, 90)),
+        "max": float(np.max(array))
+    }
+
+def run_load_test(files: List[str], streams: int = 4, realtime: bool = False, shared_vad: bool = False,
+                  timeout: Optional[float] = None) -> Dict:
+    """
+    Replay files through several recorders at once.
+
+    Args:
+        files: Audio files, assigned to the streams round-robin
+        streams: Number of recorders running concurrently
+        realtime: Replay at real-time speed (latency test) instead of as fast as possible (throughput test)
+        shared_vad: Score all streams with one batched MultiStreamVAD (ONNX backend);
+            otherwise every recorder loads its own VAD_BACKEND model
+        timeout: Seconds to wait for the replay to finish
+
+    Returns:
+        Dictionary with the configuration, per-stream results and a summary
+    """
+    vad_service = None
+    if shared_vad:
+        from audio.vad_backends import create_vad_backend
+        from audio.multi_stream_vad import MultiStreamVAD
+        vad_service = MultiStreamVAD(
+            create_vad_backend("onnx", sample_rate=PROCESSING_SAMPLE_RATE, model_path=VAD_ONNX_MODEL_PATH or None),
+            max_streams=streams
+        )
+        vad_service.start()
+
+    recorders = []
+    for i in range(streams):
+        source = FileSource(files[i % len(files)], realtime=realtime)
+        streaming_vad = vad_service.add_stream(f"stream_{i}") if vad_service else None
+        recorders.append(AudioRecorder(streaming_vad=streaming_vad, source=source))
+
+    results = [[] for _ in recorders]
+    consumers = [Thread(target=_consume, args=(recorder, result), daemon=True)
+                 for recorder, result in zip(recorders, results)]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for recorder, consumer in zip(recorders, consumers):
+        recorder.start_listening()
+        consumer.start()
+
+    completed = [recorder.wait_for_source(timeout) for recorder in recorders]
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+    metrics = [recorder.get_vad_metrics() for recorder in recorders]
+    for recorder in recorders:
+        recorder.stop()
+    for consumer in consumers:
+        consumer.join(timeout=2.0)
+    if vad_service:
+        vad_service.stop()
+
+    per_stream = []
+    audio_seconds = 0.0
+    for recorder, result, done, stream_metrics in zip(recorders, results, completed, metrics):
+        seconds = recorder.stream_position / recorder.rate
+        audio_seconds += seconds
+        per_stream.append({
+            "file": recorder.source.path,
+            "completed": done,
+            "audio_seconds": seconds,
+            "utterances": len(result),
+            "dropped_frames": stream_metrics["dropped_frames"],
+            "max_queue_depth": stream_metrics["max_queue_depth"],
+            "inference_ms_avg": stream_metrics["inference_ms_avg"],
+            "inference_ms_max": stream_metrics["inference_ms_max"]
+        })
+
+    all_results = [r for result in results for r in result]
+    return {
+        "config": {
+            "streams": streams,
+            "realtime": realtime,
+            "shared_vad": shared_vad,
+            "backend": "onnx" if shared_vad else VAD_BACKEND
+        },
+        "streams": per_stream,
+        "summary": {
+            "wall_seconds": wall_seconds,
+            "audio_seconds": audio_seconds,
+            "realtime_factor": audio_seconds / wall_seconds if wall_seconds else 0.0,
+            "cpu_seconds": cpu_seconds,
+            "cpu_per_audio_second": cpu_seconds / audio_seconds if audio_seconds else 0.0,
+            "utterances": len(all_results),
+            "dropped_frames": sum(s["dropped_frames"] for s in per_stream),
+            "queue_wait_ms": _distribution([r["queue_wait_ms"] for r in all_results]),
+            "inference_ms_max": max((s["inference_ms_max"] for s in per_stream), default=0.0)
+        }
+    }
+
+def main():
+    """Main function to run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Headless load test of the capture/VAD pipeline")
+    parser.add_argument("input", help="Audio file or directory of WAV/FLAC files")
+    parser.add_argument("--streams", type=int, default=4, help="Recorders running concurrently")
+    parser.add_argument("--realtime", action="store_true", help="Replay at real-time speed instead of as fast as possible")
+    parser.add_argument("--shared-vad", action="store_true", help="Score all streams with one batched ONNX model")
+    parser.add_argument("--timeout", type=float, default=None, help="Give up after this many seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if os.path.isdir(args.input):
+        files = sorted(glob.glob(os.path.join(args.input, "*.wav")) + glob.glob(os.path.join(args.input, "*.flac")))
+    else:
+        files = [args.input]
+    if not files:
+        print(f"No audio files found in {args.input}")
+        sys.exit(1)
+
+    report = run_load_test(files, streams=args.streams, realtime=args.realtime,
+                           shared_vad=args.shared_vad, timeout=args.timeout)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"📊 Report written to {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script to measure the local per-utterance cost of preparing audio for speech recognition.
+
+Compares the old path (temporary WAV written and re-read through
+sr.AudioFile, FLAC from the external flac binary) with the in-memory path
+(numpy -> int16 -> InMemoryAudioData, FLAC encoded in-process). The network
+request itself is not included:
+
+    python utils/stt_benchmark.py
+    python utils/stt_benchmark.py --durations 1 3 8 --repeats 50 --output stt.json
+"""
+
+import sys
+import os
+import json
+import time
+import wave
+import tempfile
+import argparse
+import numpy as np
+import speech_recognition as sr
+from typing import Dict, List
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio.stt_backends import InMemoryAudioData
+
+SAMPLE_RATE = 16000
+
+def speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Noise with a syllable-rate envelope, roughly as compressible as speech."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    envelope = np.clip(np.sin(2 * np.pi * 3.0 * t), 0, None) ** 0.5
+    audio = np.convolve(rng.standard_normal(n), np.ones(8) / 8, mode="same") * envelope
+    return (0.3 * audio / np.max(np.abs(audio))).astype(np.float32)
+
+def file_path_flac(audio: np.ndarray, path: str) -> bytes:
+    """Previous path: temporary WAV, sr.AudioFile, external FLAC encoder."""
+    audio_int16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio_int16.tobytes())
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        audio_data = recognizer.record(source)
+    return audio_data.get_flac_data(convert_width=2)
+
+def in_memory_flac(audio: np.ndarray) -> bytes:
+    """Current path: no files, no subprocess."""
+    return InMemoryAudioData.from_float(audio, SAMPLE_RATE).get_flac_data(convert_width=2)
+
+def _time(function, repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": float(np.median(timings)), "p90_ms": float(np.percentile(timings, 90)),
+            "bytes": len(result)}
+
+def run_benchmark(durations: List[float], repeats: int = 20) -> Dict:
+    """
+    Time both paths for utterances of the given lengths.
+
+    Returns:
+        Dictionary with per-duration timings and FLAC sizes for both paths
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "temp_audio.wav")
+        for seconds in durations:
+            audio = speech_like(seconds)
+            before = _time(lambda: file_path_flac(audio, path), repeats)
+            after = _time(lambda: in_memory_flac(audio), repeats)
+            results.append({
+                "seconds": seconds,
+                "file_and_subprocess": before,
+                "in_memory": after,
+                "speedup": before["median_ms"] / after["median_ms"] if after["median_ms"] else 0.0
+            })
+    return {"sample_rate": SAMPLE_RATE, "repeats": repeats, "results": results}
+
+def main():
+    """Main function to run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Per-utterance STT preparation overhead")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 3.0, 8.0],
+                        help="Utterance lengths in seconds")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.durations, args.repeats)
+    for result in report["results"]:
+        print(f"{result['seconds']:.1f}s utterance: {result['file_and_subprocess']['median_ms']:.2f}ms -> "
+              f"{result['in_memory']['median_ms']:.2f}ms ({result['speedup']:.1f}x), "
+              f"FLAC {result['file_and_subprocess']['bytes']} -> {result['in_memory']['bytes']} bytes")
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"📊 Report written to {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
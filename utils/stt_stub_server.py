@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Script to run a local stand-in for a streaming speech recognition server.
+
+Speaks the WebSocket protocol of audio.streaming_stt: it sends a partial
+hypothesis for every `--partial-interval` seconds of audio received and the
+final transcript as soon as the client ends the stream. By default the
+"transcript" only describes the audio it got, which is enough to test
+timing end to end; with --google the final transcript comes from Google
+(batch) recognition of the streamed audio:
+
+    python utils/stt_stub_server.py --port 8765
+    STREAMING_STT=websocket STREAMING_STT_URL=ws://127.0.0.1:8765 python main.py
+"""
+
+import sys
+import os
+import json
+import logging
+import argparse
+import numpy as np
+from threading import Thread
+from typing import Callable, Optional
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+Recognizer = Callable[[np.ndarray, int], Optional[str]]
+
+def describe_audio(audio: np.ndarray, sample_rate: int) -> str:
+    """Placeholder recognizer: the length and level of the audio."""
+    seconds = len(audio) / sample_rate
+    rms = float(np.sqrt(np.mean(audio ** 2))) if len(audio) else 0.0
+    return f"{seconds:.2f}s rms={rms:.3f}"
+
+class StubSTTServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, recognize: Optional[Recognizer] = None,
+                 final_recognize: Optional[Recognizer] = None, partial_interval: float = 0.5):
+        """
+        Stand-in streaming recognition server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one, see `port` after start())
+            recognize: Function giving the partial hypothesis for the audio received so far
+            final_recognize: Function giving the final transcript (default: recognize)
+            partial_interval: Seconds of audio between partial hypotheses
+        """
+        self.host = host
+        self.port = port
+        self.recognize = recognize or describe_audio
+        self.final_recognize = final_recognize or self.recognize
+        self.partial_interval = partial_interval
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        from websockets.sync.server import serve
+
+        self._server = serve(self._handle, self.host, self.port)
+        self.port = self._server.socket.getsockname()[1]
+        self._thread = Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Stub STT server listening on {self.url}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=2.0)
+            self._server = None
+
+    def _handle(self, connection):
+        sample_rate = 16000
+        chunks = []
+        received = 0
+        next_partial = None
+        for message in connection:
+            if isinstance(message, str):
+                data = json.loads(message)
+                if data.get("type") == "start":
+                    sample_rate = int(data.get("sample_rate", sample_rate))
+                    next_partial = int(self.partial_interval * sample_rate)
+                elif data.get("type") == "end":
+                    audio = self._audio(chunks)
+                    text = self.final_recognize(audio, sample_rate) or ""
+                    connection.send(json.dumps({"type": "final", "text": text}))
+                    return
+                continue
+            chunks.append(message)
+            received += len(message) // 2
+            if next_partial and received >= next_partial:
+                next_partial += int(self.partial_interval * sample_rate)
+                partial = self.recognize(self._audio(chunks), sample_rate)
+                if partial:
+                    connection.send(json.dumps({"type": "partial", "text": partial}))
+
+    @staticmethod
+    def _audio(chunks) -> np.ndarray:
+        return np.frombuffer(b"".join(chunks), dtype="<i2").astype(np.float32) / 32768.0
+
+def main():
+    """Main function to run the stub server from the command line."""
+    parser = argparse.ArgumentParser(description="Local stand-in streaming STT server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--partial-interval", type=float, default=0.5, help="Seconds of audio between partials")
+    parser.add_argument("--google", action="store_true", help="Final transcripts from Google speech recognition")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    final_recognize = None
+    if args.google:
+        from audio.speech_to_text import SpeechToText
+        stt = SpeechToText()
+        final_recognize = lambda audio, rate: stt.convert(audio, sample_rate=rate)
+
+    server = StubSTTServer(args.host, args.port, final_recognize=final_recognize,
+                           partial_interval=args.partial_interval)
+    server.start()
+    print(f"Stub STT server running on {server.url} (Ctrl+C to stop)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark VAD detection and endpointing offline over a directory of labelled WAV files.
+
+Every WAV file needs a sidecar JSON file with the same name holding the
+reference speech segments in seconds:
+
+    {"segments": [[0.80, 2.35], [3.10, 4.02]]}
+
+Files are streamed through the same StreamingVAD/EnergyGate/Endpointer code the
+AudioRecorder uses, block by block and faster than real time.
+
+Usage:
+    python utils/vad_benchmark.py recordings/ --backend onnx --output results.json
+"""
+
+import sys
+import os
+import json
+import time
+import glob
+import argparse
+import logging
+import numpy as np
+import soundfile as sf
+from typing import Dict, List, Optional
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import (
+    SILENCE_TIMEOUT, MIN_PHRASE_DURATION, VAD_THRESHOLD, VAD_NEG_THRESHOLD,
+    VAD_BACKEND, VAD_NUM_THREADS, VAD_ONNX_MODEL_PATH, VAD_ENERGY_GATE, VAD_GATE_MARGIN_DB,
+    ENDPOINTER_MODE, ENDPOINTER_MIN_HANGOVER, ENDPOINTER_MAX_HANGOVER
+)
+from audio.streaming_vad import StreamingVAD
+from audio.energy_gate import EnergyGate
+from audio.endpointer import Endpointer, create_endpointer
+from audio.vad_backends import create_vad_backend
+from audio.resampler import resample
+
+logger = logging.getLogger(__name__)
+
+# Seconds of audio kept before the onset decision (AudioRecorder's PRE_BUFFER_SIZE)
+DEFAULT_PRE_ROLL = 2.0
+
+def load_labels(wav_path: str) -> List[List[float]]:
+    """Load the reference speech segments of a WAV file from its sidecar JSON."""
+    label_path = os.path.splitext(wav_path)[0] + ".json"
+    with open(label_path, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    return sorted([float(start), float(end)] for start, end in labels["segments"])
+
+def load_audio(wav_path: str, sample_rate: int) -> np.ndarray:
+    """Load a WAV file as mono float32 audio at the VAD sample rate."""
+    audio, file_rate = sf.read(wav_path, dtype="float32", always_2d=True)
+    # Same downmix and rate conversion as the recorder
+    audio = np.mean(audio, axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    return resample(audio, file_rate, sample_rate)
+
+def run_detection(audio: np.ndarray, vad: StreamingVAD, endpointer: Endpointer,
+                  min_phrase_duration: float) -> Dict:
+    """
+    Stream audio through the VAD and endpointer one frame-sized block at a time.
+
+    Returns:
+        Dictionary with the detected utterances (decision times in seconds),
+        utterances discarded as too short and the CPU time spent
+    """
+    rate = vad.sample_rate
+    vad.reset()
+    endpointer.reset()
+    utterances = []
+    discarded = 0
+    current = None
+
+    cpu_start = time.process_time()
+    for offset in range(0, len(audio) - vad.frame_size + 1, vad.frame_size):
+        block = audio[offset:offset + vad.frame_size]
+        events = vad.process(block)
+        # Same per-block decision as AudioRecorder._process_audio_frame
+        speech_detected = vad.is_speech or any(e.event_type == "start" for e in events)
+        action = endpointer.update(speech_detected, len(block), vad.last_probability)
+        block_end = (offset + len(block)) / rate
+
+        if action == Endpointer.START:
+            onset = next((e.sample for e in events if e.event_type == "start"), offset)
+            current = {"onset_sample": onset / rate, "start_decision": block_end}
+        elif action == Endpointer.END:
+            if endpointer.duration < min_phrase_duration:
+                discarded += 1
+            else:
+                current["end_decision"] = block_end
+                current["hangover"] = endpointer.hangovers[-1]
+                utterances.append(current)
+            current = None
+    cpu_seconds = time.process_time() - cpu_start
+
+    if current is not None and endpointer.duration >= min_phrase_duration:
+        # Still recording at the end of the file
+        current["end_decision"] = None
+        current["hangover"] = None
+        utterances.append(current)
+
+    return {"utterances": utterances, "discarded": discarded, "cpu_seconds": cpu_seconds}
+
+def score_file(segments: List[List[float]], detection: Dict, pre_roll: float) -> Dict:
+    """
+    Match detected utterances against the reference segments of one file.
+
+    A detected utterance covers every reference segment that overlaps the span from
+    its onset to its end decision. Utterances covering no segment are false
+    triggers; segments covered by no utterance are misses.
+    """
+    onset_latencies = []
+    eos_latencies = []
+    hangovers = [u["hangover"] for u in detection["utterances"] if u["hangover"] is not None]
+    false_triggers = 0
+    clipped_onsets = 0
+    covered = set()
+
+    for utterance in detection["utterances"]:
+        span_end = utterance["end_decision"] if utterance["end_decision"] is not None else float("inf")
+        matched = [i for i, (start, end) in enumerate(segments)
+                   if start < span_end and end > utterance["onset_sample"]]
+        if not matched:
+            false_triggers += 1
+            continue
+
+        first = segments[matched[0]]
+        last = segments[matched[-1]]
+        onset_latencies.append(utterance["start_decision"] - first[0])
+        # The recording starts with the pre-roll kept before the onset decision
+        if utterance["start_decision"] - pre_roll > first[0]:
+            clipped_onsets += 1
+        if utterance["end_decision"] is not None:
+            eos_latencies.append(utterance["end_decision"] - last[1])
+        covered.update(matched)
+
+    return {
+        "segments": len(segments),
+        "utterances": len(detection["utterances"]),
+        "discarded": detection["discarded"],
+        "false_triggers": false_triggers,
+        "missed_segments": len(segments) - len(covered),
+        "clipped_onsets": clipped_onsets,
+        "truncated_utterances": sum(1 for latency in eos_latencies if latency < 0),
+        "onset_latencies": onset_latencies,
+        "eos_latencies": eos_latencies,
+        "hangovers": hangovers
+    }
+
+def _distribution(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {
+        "mean": float(np.mean(values)),
+        "median": float(np.median(values)),
+        "p90": float(np.percentile(values, 90)),
+        "max": float(np.max(values))
+    }
+
+def run_benchmark(wav_dir: str, backend: str = VAD_BACKEND, sample_rate: int = 16000,
+                  threshold: float = VAD_THRESHOLD, neg_threshold: float = VAD_NEG_THRESHOLD,
+                  energy_gate: bool = VAD_ENERGY_GATE, gate_margin_db: float = VAD_GATE_MARGIN_DB,
+                  silence_timeout: float = SILENCE_TIMEOUT,
+                  endpointer_mode: str = ENDPOINTER_MODE,
+                  min_hangover: float = ENDPOINTER_MIN_HANGOVER,
+                  max_hangover: Optional[float] = None,
+                  min_phrase_duration: float = MIN_PHRASE_DURATION,
+                  pre_roll: float = DEFAULT_PRE_ROLL, vad_backend=None) -> Dict:
+    """
+    Run the benchmark over every labelled WAV file in a directory.
+
+    Args:
+        wav_dir: Directory with *.wav files and their *.json labels
+        backend: VAD backend name ("torch" or "onnx")
+        sample_rate: Sample rate the VAD runs at (other files are resampled)
+        threshold: Speech probability threshold for onsets
+        neg_threshold: Speech probability threshold for offsets
+        energy_gate: Whether to put the energy pre-gate in front of the model
+        gate_margin_db: Energy gate margin above the noise floor
+        silence_timeout: Seconds of silence that end an utterance (upper bound when adaptive)
+        endpointer_mode: "fixed" or "adaptive"
+        min_hangover: Shortest adaptive hang-over in seconds
+        max_hangover: Longest adaptive hang-over in seconds (default: silence_timeout)
+        min_phrase_duration: Utterances shorter than this are discarded
+        pre_roll: Seconds of audio kept before the onset decision
+        vad_backend: Already created VADBackend to use instead of `backend`
+
+    Returns:
+        Dictionary with the configuration, per-file results and a summary
+    """
+    if vad_backend is None:
+        vad_backend = create_vad_backend(
+            backend,
+            sample_rate=sample_rate,
+            num_threads=VAD_NUM_THREADS,
+            model_path=VAD_ONNX_MODEL_PATH or None
+        )
+    gate = EnergyGate(margin_db=gate_margin_db) if energy_gate else None
+    vad = StreamingVAD(vad_backend, threshold=threshold, neg_threshold=neg_threshold, energy_gate=gate)
+    endpointer_options = {}
+    if endpointer_mode == "adaptive":
+        endpointer_options = {"min_hangover": min_hangover, "max_hangover": max_hangover}
+    endpointer = create_endpointer(endpointer_mode, vad.sample_rate, silence_timeout, **endpointer_options)
+
+    files = []
+    totals = {key: 0 for key in ("segments", "utterances", "discarded", "false_triggers",
+                                 "missed_segments", "clipped_onsets", "truncated_utterances")}
+    onset_latencies = []
+    eos_latencies = []
+    hangovers = []
+    audio_seconds = 0.0
+    cpu_seconds = 0.0
+    gate_frames = 0
+    gate_skipped = 0
+
+    for wav_path in sorted(glob.glob(os.path.join(wav_dir, "*.wav"))):
+        try:
+            segments = load_labels(wav_path)
+            audio = load_audio(wav_path, vad.sample_rate)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping {wav_path}: {e}")
+            continue
+
+        detection = run_detection(audio, vad, endpointer, min_phrase_duration)
+        result = score_file(segments, detection, pre_roll)
+        duration = len(audio) / vad.sample_rate
+
+        for key in totals:
+            totals[key] += result[key]
+        onset_latencies.extend(result["onset_latencies"])
+        eos_latencies.extend(result["eos_latencies"])
+        hangovers.extend(result["hangovers"])
+        audio_seconds += duration
+        cpu_seconds += detection["cpu_seconds"]
+        if gate:
+            gate_frames += gate.frames_total
+            gate_skipped += gate.frames_skipped
+
+        result["file"] = os.path.basename(wav_path)
+        result["audio_seconds"] = duration
+        result["cpu_seconds"] = detection["cpu_seconds"]
+        files.append(result)
+
+    summary = dict(totals)
+    summary.update({
+        "files": len(files),
+        "audio_seconds": audio_seconds,
+        "cpu_seconds": cpu_seconds,
+        "cpu_per_audio_second": cpu_seconds / audio_seconds if audio_seconds else 0.0,
+        "onset_latency": _distribution(onset_latencies),
+        "eos_latency": _distribution(eos_latencies),
+        "hangover": _distribution(hangovers),
+        "endpointer": endpointer.get_metrics(),
+        "skip_ratio": gate_skipped / gate_frames if gate_frames else 0.0
+    })
+
+    return {
+        "config": {
+            "backend": vad_backend.name,
+            "sample_rate": vad.sample_rate,
+            "threshold": threshold,
+            "neg_threshold": neg_threshold,
+            "energy_gate": energy_gate,
+            "gate_margin_db": gate_margin_db,
+            "silence_timeout": silence_timeout,
+            "endpointer_mode": endpointer.mode,
+            "min_phrase_duration": min_phrase_duration,
+            "pre_roll": pre_roll
+        },
+        "files": files,
+        "summary": summary
+    }
+
+def main():
+    """Main function to run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Offline VAD/endpointing benchmark over labelled WAV files")
+    parser.add_argument("wav_dir", help="Directory with *.wav files and *.json segment labels")
+    parser.add_argument("--backend", default=VAD_BACKEND, choices=["torch", "onnx"])
+    parser.add_argument("--sample-rate", type=int, default=16000, choices=[8000, 16000])
+    parser.add_argument("--threshold", type=float, default=VAD_THRESHOLD)
+    parser.add_argument("--neg-threshold", type=float, default=VAD_NEG_THRESHOLD)
+    parser.add_argument("--energy-gate", dest="energy_gate", action="store_true", default=VAD_ENERGY_GATE)
+    parser.add_argument("--no-energy-gate", dest="energy_gate", action="store_false")
+    parser.add_argument("--gate-margin-db", type=float, default=VAD_GATE_MARGIN_DB)
+    parser.add_argument("--silence-timeout", type=float, default=SILENCE_TIMEOUT)
+    parser.add_argument("--endpointer", default=ENDPOINTER_MODE, choices=["fixed", "adaptive"])
+    parser.add_argument("--min-hangover", type=float, default=ENDPOINTER_MIN_HANGOVER)
+    parser.add_argument("--max-hangover", type=float, default=ENDPOINTER_MAX_HANGOVER)
+    parser.add_argument("--min-phrase-duration", type=float, default=MIN_PHRASE_DURATION)
+    parser.add_argument("--pre-roll", type=float, default=DEFAULT_PRE_ROLL)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    report = run_benchmark(
+        args.wav_dir,
+        backend=args.backend,
+        sample_rate=args.sample_rate,
+        threshold=args.threshold,
+        neg_threshold=args.neg_threshold,
+        energy_gate=args.energy_gate,
+        gate_margin_db=args.gate_margin_db,
+        silence_timeout=args.silence_timeout,
+        endpointer_mode=args.endpointer,
+        min_hangover=args.min_hangover,
+        max_hangover=args.max_hangover,
+        min_phrase_duration=args.min_phrase_duration,
+        pre_roll=args.pre_roll
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"📊 Report written to {args.output}")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Module for keeping connections and models warm between turns.
+
+The first turn after startup, or after a long pause, would otherwise pay for
+DNS lookups, TCP and TLS handshakes, loading the Ollama model into memory
+and opening the ElevenLabs connections. The warm-up manager does this at
+startup and again whenever the assistant has been idle for a while, and
+only while no turn is being recorded or answered.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.config import (
+    DEEPSEEK_API_KEY, LOCAL_LLM_MODEL, LOCAL_LLM_KEEP_ALIVE, WARMUP_INTERVAL, WARMUP_TTS_TEXT
+)
+from utils.http_transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0  # Seconds between checks of the warm-up thread
+
+class WarmupManager:
+    def __init__(self, interval: float = 45.0, is_busy: Optional[Callable[[], bool]] = None):
+        """
+        Initialize the warm-up manager.
+
+        Targets are warmed one after another by a background thread: once at
+        startup, then every time nothing has used them for `interval` seconds.
+        Before each target the manager checks that no turn is running, so a
+        warm-up request never delays a live one; an interrupted round is
+        finished after the turn.
+
+        Args:
+            interval: Idle seconds after the last turn or warm-up before the next warm-up
+                (keep it below the servers' keep-alive timeouts)
+            is_busy: Function returning True while a turn is starting (e.g. the user is
+                speaking); turns run inside turn() are always respected
+        """
+        self.interval = interval
+        self.is_busy = is_busy
+        self.targets: Dict[str, Callable[[bool], bool]] = {}
+        self._lock = threading.Lock()
+        self._turns = 0
+        self._last_activity = float("-inf")
+        self._pending = []
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.metrics = {
+            "rounds": 0,
+            "deferred": 0,
+            "targets": {}
+        }
+
+    def add_target(self, name: str, warm: Callable[[bool], bool]):
+        """
+        Register something to keep warm.
+
+        Args:
+            name: Target name used in logs and metrics
+            warm: Function called with startup=True in the first round; returns True if the
+                target answered (exceptions count as failures)
+        """
+        self.targets[name] = warm
+        self.metrics["targets"][name] = {"warmed": 0, "failures": 0, "last_ms": None}
+
+    def start(self):
+        """Start the warm-up thread; the first round runs right away."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="warmup")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Warming up {', '.join(self.targets) or 'nothing'} every {self.interval:.0f}s of idle time")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the warm-up thread (a request in flight finishes on its own)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @contextmanager
+    def turn(self):
+        """Mark a live turn: no warm-up request starts until it ends, and its connections count as warm."""
+        with self._lock:
+            self._turns += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._turns -= 1
+                self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            if self._turns:
+                return False
+        return not (self.is_busy and self.is_busy())
+
+    def is_due(self) -> bool:
+        """True if the targets have not been used for `interval` seconds (or never)."""
+        with self._lock:
+            return bool(self._pending) or time.monotonic() - self._last_activity >= self.interval
+
+    def warm(self) -> bool:
+        """
+        Warm the targets of the current round.
+
+        Returns:
+            True if the round finished, False if a turn started and the rest was deferred
+        """
+        with self._lock:
+            if not self._pending:
+                self._pending = list(self.targets)
+            startup = self.metrics["rounds"] == 0
+        while self._pending:
+            if not self.is_idle():
+                with self._lock:
+                    self.metrics["deferred"] += 1
+                return False
+            self._warm_target(self._pending.pop(0), startup)
+
+        with self._lock:
+            self.metrics["rounds"] += 1
+            self._last_activity = time.monotonic()
+        return True
+
+    def _warm_target(self, name: str, startup: bool):
+        start = time.perf_counter()
+        try:
+            warmed = self.targets[name](startup)
+        except Exception as e:
+            logger.debug(f"Warm-up of {name} failed: {e}")
+            warmed = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            target_metrics = self.metrics["targets"][name]
+            target_metrics["warmed" if warmed else "failures"] += 1
+            target_metrics["last_ms"] = elapsed_ms
+        if warmed:
+            logger.info(f"Warmed up {name} in {elapsed_ms:.0f}ms")
+        else:
+            logger.warning(f"Could not warm up {name}")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.is_due() and self.is_idle():
+                self.warm()
+            self._stop_event.wait(POLL_INTERVAL)
+
+    def get_metrics(self) -> Dict[str, object]:
+        """
+        Get warm-up counters.
+
+        Returns:
+            Dictionary with the finished rounds, the rounds deferred by a turn, and per
+            target the successful and failed warm-ups and the duration of the last one
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics["targets"] = {name: dict(counts) for name, counts in self.metrics["targets"].items()}
+        return metrics
+
+def create_warmup_manager(llm_processor, tts_processor=None, tts_connections: int = 1,
+                          is_busy: Optional[Callable[[], bool]] = None, interval: float = WARMUP_INTERVAL,
+                          tts_text: str = WARMUP_TTS_TEXT) -> WarmupManager:
+    """
+    Create a warm-up manager for the enabled providers.
+
+    Args:
+        llm_processor: StreamingLLMProcessor (or AIProcessor) whose configured providers are warmed
+        tts_processor: TextToSpeech whose ElevenLabs connections are warmed
+        tts_connections: ElevenLabs connections to keep open (one per streaming TTS worker)
+        is_busy: Function returning True while a turn is starting
+        interval: Idle seconds between warm-ups
+        tts_text: Text of the tiny TTS request sent in the first round (empty: none)
+    """
+    manager = WarmupManager(interval=interval, is_busy=is_busy)
+
+    # The SDK clients keep their own connection pools; listing models opens a connection without generating
+    if llm_processor.openai_client:
+        manager.add_target("chatgpt", lambda startup: bool(llm_processor.openai_client.models.list()))
+    if llm_processor.anthropic_client:
+        manager.add_target("claude", lambda startup: bool(llm_processor.anthropic_client.models.list(limit=1)))
+
+    if DEEPSEEK_API_KEY and DEEPSEEK_API_KEY != "your_deepseek_api_key_here":
+        parts = urlsplit(llm_processor.deepseek_api_url)
+        models_url = f"{parts.scheme}://{parts.netloc}/models"
+
+        def warm_deepseek(startup):
+            response = get_transport().get(models_url, headers={"Authorization": f"Bearer {DEEPSEEK_API_KEY}"})
+            return response.status_code == 200
+        manager.add_target("deepseek", warm_deepseek)
+
+    local_llm = llm_processor.local_llm_processor
+    if local_llm is not None and local_llm.is_available():
+        # Loads the model into memory and restarts its keep-alive timer
+        manager.add_target("local_llm", lambda startup: local_llm.load_model(LOCAL_LLM_MODEL, LOCAL_LLM_KEEP_ALIVE))
+
+    if tts_processor is not None and tts_processor.api_key and tts_processor.api_key != "your_elevenlabs_api_key_here":
+        # One tiny synthesis at startup; later rounds only refresh the connections, which costs no characters
+        manager.add_target("elevenlabs", lambda startup: tts_processor.warm_up(tts_text if startup else "",
+                                                                               connections=tts_connections))
+    return manager